@@ -1,3 +1,30 @@
-from .test_case_generator_agent import TestCaseGeneratorAgent
+"""
+Test case generators.
 
-__all__ = ["TestCaseGeneratorAgent"]
+The generators import claude_agent_sdk (and the direct-API one anthropic),
+which are slow to import, so they are loaded on first attribute access
+(PEP 562) instead of with the package.
+"""
+
+from typing import TYPE_CHECKING
+import importlib
+
+if TYPE_CHECKING:
+    from .fanout import FanOutGenerator
+    from .test_case_generator_agent import TestCaseGeneratorAgent
+
+_LAZY_ATTRIBUTES = {
+    "TestCaseGeneratorAgent": ".test_case_generator_agent",
+    "FanOutGenerator": ".fanout",
+}
+
+__all__ = ["TestCaseGeneratorAgent", "FanOutGenerator"]
+
+
+def __getattr__(name: str):
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,127 @@
+"""
+Lifecycle management for the process-wide test case generator agent.
+
+The agent (its in-process MCP tool server and ClaudeAgentOptions, or the
+direct-API generator and its HTTP connection pool) is built once, at startup
+or on first use, and shared by every request. It is rebuilt when the
+settings it depends on change, e.g. after a settings reload.
+
+The generator modules (and the SDKs they import) are only imported when
+the agent is first built, so importing this module is cheap.
+"""
+
+from typing import TYPE_CHECKING, Any, Optional
+import logging
+import sys
+import threading
+
+from .session_pool import AgentSessionPool
+
+if TYPE_CHECKING:
+    from .test_case_generator_agent import TestCaseGeneratorAgent
+
+logger = logging.getLogger(__name__)
+
+# Values of settings.generation_engine
+ENGINE_AGENT_SDK = "agent_sdk"
+ENGINE_DIRECT_API = "direct_api"
+
+_shared_agent: Optional["TestCaseGeneratorAgent"] = None
+_shared_agent_fingerprint: Optional[tuple] = None
+_shared_agent_lock = threading.Lock()
+
+
+def _agent_fingerprint(settings, jira_service: Any, session_pool: Optional[AgentSessionPool]) -> tuple:
+    return (
+        settings.generation_engine,
+        settings.anthropic_api_key,
+        settings.enable_jira_mcp,
+        id(jira_service),
+        id(session_pool),
+        settings.agent_record_dir,
+        settings.agent_replay_dir,
+        settings.agent_replay_speed,
+    )
+
+
+def _build_agent(settings, jira_service: Any, session_pool: Optional[AgentSessionPool]):
+    if settings.generation_engine == ENGINE_DIRECT_API:
+        from .test_case_generator_agent_simple import (
+            TestCaseGeneratorAgent as DirectApiGenerator,
+            get_shared_http_client,
+        )
+
+        return DirectApiGenerator(
+            api_key=settings.anthropic_api_key,
+            jira_service=jira_service,
+            jira_mcp_enabled=settings.enable_jira_mcp,
+            http_client=get_shared_http_client(settings),
+        )
+
+    from .recording import ReplayQuery, SessionRecorder
+    from .test_case_generator_agent import TestCaseGeneratorAgent
+
+    replay = None
+    if settings.agent_replay_dir:
+        replay = ReplayQuery.from_dir(settings.agent_replay_dir, speed=settings.agent_replay_speed)
+        logger.info(f"Replaying {len(replay.recordings)} recorded agent sessions from {settings.agent_replay_dir}")
+
+    return TestCaseGeneratorAgent(
+        api_key=settings.anthropic_api_key,
+        jira_service=jira_service,
+        jira_mcp_enabled=settings.enable_jira_mcp,
+        session_pool=session_pool,
+        recorder=SessionRecorder(settings.agent_record_dir) if settings.agent_record_dir else None,
+        replay=replay,
+    )
+
+
+def get_shared_agent(
+    settings,
+    jira_service: Any = None,
+    session_pool: Optional[AgentSessionPool] = None,
+) -> "TestCaseGeneratorAgent":
+    """
+    Return the process-wide agent, building it on first use or when its inputs changed.
+    """
+    global _shared_agent, _shared_agent_fingerprint
+    fingerprint = _agent_fingerprint(settings, jira_service, session_pool)
+    if _shared_agent is None or _shared_agent_fingerprint != fingerprint:
+        with _shared_agent_lock:
+            if _shared_agent is None or _shared_agent_fingerprint != fingerprint:
+                logger.info(f"Building shared test case generator ({settings.generation_engine})")
+                _shared_agent = _build_agent(settings, jira_service, session_pool)
+                _shared_agent_fingerprint = fingerprint
+    return _shared_agent
+
+
+def reset_shared_agent() -> None:
+    """
+    Drop the process-wide agent so the next request builds a new one.
+    """
+    global _shared_agent, _shared_agent_fingerprint
+    with _shared_agent_lock:
+        _shared_agent = None
+        _shared_agent_fingerprint = None
+
+
+async def close_shared_agent() -> None:
+    """
+    Drop the process-wide agent and close the direct-API HTTP pool if that engine was loaded.
+    """
+    reset_shared_agent()
+    # Checked in sys.modules so shutdown does not import anthropic just to close nothing
+    direct_api = sys.modules.get(f"{__package__}.test_case_generator_agent_simple")
+    if direct_api is not None:
+        await direct_api.close_shared_http_client()
+
+
+def preload_generator_modules(settings) -> None:
+    """
+    Import the generator module for the configured engine (and its SDK).
+    Blocking; the startup warm-up runs it on a worker thread.
+    """
+    if settings.generation_engine == ENGINE_DIRECT_API:
+        from . import test_case_generator_agent_simple  # noqa: F401
+    else:
+        from . import test_case_generator_agent  # noqa: F401
@@ -0,0 +1,294 @@
+"""
+Parallel fan-out of one generation over shards of its acceptance criteria.
+
+Stories with dozens of acceptance criteria make a single agent run slow and
+prone to hitting max_turns. FanOutGenerator wraps a generator, splits the
+criteria into shards of `shard_size`, runs the shards concurrently (at most
+`max_concurrency` at a time) and merges the results: near-duplicate test
+cases (by normalized title and steps) are dropped and ids are renumbered.
+It exposes the same interface as the generators it wraps.
+
+With an AdmissionController every shard run takes its own run slot, so a
+fanned-out request is charged for each agent run it starts.
+"""
+
+from contextlib import nullcontext
+from difflib import SequenceMatcher
+from typing import Any, AsyncIterator, Dict, List, Optional
+import asyncio
+import json
+import logging
+import re
+
+from .validation import MODE_AGENTIC
+from app.services.admission import LANE_INTERACTIVE, AdmissionController, AdmissionRejected
+
+logger = logging.getLogger(__name__)
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+_TRAILING_NUMBER = re.compile(r"\d+$")
+
+# Fields skills use for a test case identifier, e.g. "TC-001"
+_ID_FIELDS = ("test_case_id", "id")
+
+_SHARD_DONE = object()
+
+
+def shard_criteria(acceptance_criteria: List[str], shard_size: int) -> List[List[str]]:
+    """
+    Split acceptance criteria into consecutive shards of at most shard_size.
+    """
+    shard_size = max(1, shard_size)
+    return [
+        acceptance_criteria[i:i + shard_size]
+        for i in range(0, len(acceptance_criteria), shard_size)
+    ]
+
+
+def _fingerprint(shard: int, test_case: Dict) -> tuple:
+    return shard, json.dumps(test_case, sort_keys=True, default=str)
+
+
+def _normalize(value: Any) -> str:
+    if not isinstance(value, str):
+        value = json.dumps(value, sort_keys=True, default=str)
+    return _NON_WORD.sub(" ", value.lower()).strip()
+
+
+def _step_text(step: Any) -> str:
+    if isinstance(step, dict):
+        return _normalize(step.get("action") or step.get("step") or step)
+    return _normalize(step)
+
+
+def case_signature(test_case: Dict) -> str:
+    """
+    Normalized title and step actions, used to compare test cases.
+    """
+    steps = test_case.get("steps") or []
+    if not isinstance(steps, list):
+        steps = [steps]
+    return " | ".join([_normalize(test_case.get("title", ""))] + [_step_text(step) for step in steps])
+
+
+class MergedTestCases:
+    """
+    Accumulates test cases from several shards, dropping near-duplicates.
+    """
+
+    def __init__(self, similarity_threshold: float = 0.9):
+        self.similarity_threshold = similarity_threshold
+        self.test_cases: List[Dict] = []
+        self.duplicates = 0
+        self._signatures: List[str] = []
+
+    def add(self, test_case: Dict) -> Optional[Dict]:
+        """
+        Add a test case. Returns it renumbered, or None if it duplicates one already kept.
+        """
+        signature = case_signature(test_case)
+        if self._is_duplicate(signature):
+            self.duplicates += 1
+            return None
+
+        test_case = dict(test_case)
+        self._renumber(test_case, len(self.test_cases) + 1)
+        self.test_cases.append(test_case)
+        self._signatures.append(signature)
+        return test_case
+
+    def _is_duplicate(self, signature: str) -> bool:
+        for kept in self._signatures:
+            if kept == signature:
+                return True
+            matcher = SequenceMatcher(None, kept, signature, autojunk=False)
+            if matcher.quick_ratio() >= self.similarity_threshold and matcher.ratio() >= self.similarity_threshold:
+                return True
+        return False
+
+    @staticmethod
+    def _renumber(test_case: Dict, number: int) -> None:
+        for field in _ID_FIELDS:
+            value = test_case.get(field)
+            if isinstance(value, int):
+                test_case[field] = number
+            elif isinstance(value, str) and _TRAILING_NUMBER.search(value):
+                test_case[field] = _TRAILING_NUMBER.sub(
+                    lambda match: str(number).zfill(len(match.group())), value
+                )
+
+
+def _merge_validation(merged: Dict[str, Any], shard_validation: Optional[Dict]) -> None:
+    """
+    Fold one shard's validation summary into the merged one: counts are
+    summed and issue lists concatenated.
+    """
+    for key, value in (shard_validation or {}).items():
+        if isinstance(value, list):
+            merged.setdefault(key, []).extend(value)
+        elif isinstance(value, (int, float)):
+            merged[key] = merged.get(key, 0) + value
+
+
+class FanOutGenerator:
+    """
+    Runs a generator once per shard of acceptance criteria and merges the results.
+    """
+
+    def __init__(
+        self,
+        generator: Any,
+        shard_size: int,
+        max_concurrency: int = 4,
+        similarity_threshold: float = 0.9,
+        admission: Optional[AdmissionController] = None,
+        lane: str = LANE_INTERACTIVE,
+        bounded: bool = True,
+    ):
+        self.generator = generator
+        self.shard_size = max(1, shard_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.similarity_threshold = similarity_threshold
+        self.admission = admission
+        self.lane = lane
+        self.bounded = bounded
+        self.model = generator.model
+        self.ENGINE = generator.ENGINE
+        # Sharded results differ from single-run results, so they are cached separately
+        self.PROMPT_VERSION = f"{generator.PROMPT_VERSION}+shard{self.shard_size}"
+
+    async def generate_test_cases(self, **kwargs) -> Dict:
+        """
+        Generate test cases for all shards and return the merged result.
+        """
+        result: Dict = {}
+        async for event in self.stream_test_cases(**kwargs):
+            if event["event"] == "complete":
+                result = event["data"]
+        return result
+
+    async def stream_test_cases(
+        self,
+        title: str,
+        description: str,
+        acceptance_criteria: List[str],
+        test_types: List[str],
+        include_edge_cases: bool = True,
+        include_negative_tests: bool = True,
+        jira_issue_key: str = None,
+        mode: str = MODE_AGENTIC,
+    ) -> AsyncIterator[Dict]:
+        """
+        Same events as the wrapped generator. Test cases are emitted as any
+        shard produces them (duplicates suppressed); progress events carry a
+        "shard" index; "complete" holds the merged result.
+        """
+        shards = shard_criteria(acceptance_criteria, self.shard_size)
+        kwargs = {
+            "title": title,
+            "description": description,
+            "test_types": test_types,
+            "include_edge_cases": include_edge_cases,
+            "include_negative_tests": include_negative_tests,
+            "jira_issue_key": jira_issue_key,
+            "mode": mode,
+        }
+
+        if len(shards) <= 1:
+            async with self._run_slot():
+                async for event in self.generator.stream_test_cases(acceptance_criteria=acceptance_criteria, **kwargs):
+                    yield event
+            return
+
+        logger.info(f"Fanning out {len(acceptance_criteria)} criteria into {len(shards)} shards for: {title}")
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        events: "asyncio.Queue[Any]" = asyncio.Queue()
+
+        async def run_shard(index: int, criteria: List[str]) -> None:
+            async with semaphore:
+                try:
+                    async with self._run_slot():
+                        async for event in self.generator.stream_test_cases(acceptance_criteria=criteria, **kwargs):
+                            events.put_nowait((index, event))
+                except Exception as e:
+                    events.put_nowait((index, e))
+                finally:
+                    events.put_nowait((index, _SHARD_DONE))
+
+        tasks = [asyncio.create_task(run_shard(i, criteria)) for i, criteria in enumerate(shards)]
+        merger = MergedTestCases(self.similarity_threshold)
+        summaries: List[Optional[str]] = [None] * len(shards)
+        usage: Dict[str, int] = {}
+        validation: Dict[str, Any] = {}
+        streamed = set()
+        errors: List[str] = []
+        remaining = len(shards)
+
+        try:
+            while remaining:
+                index, event = await events.get()
+                if event is _SHARD_DONE:
+                    remaining -= 1
+                    continue
+                if isinstance(event, AdmissionRejected):
+                    raise event
+                if isinstance(event, Exception):
+                    raise Exception(f"Shard {index + 1}/{len(shards)} failed: {str(event)}")
+
+                if event["event"] == "test_case":
+                    streamed.add(_fingerprint(index, event["data"]))
+                    test_case = merger.add(event["data"])
+                    if test_case is not None:
+                        yield {"event": "test_case", "data": test_case}
+
+                elif event["event"] == "progress":
+                    yield {"event": "progress", "data": {**event["data"], "shard": index}}
+
+                elif event["event"] == "complete":
+                    shard_result = event["data"]
+                    # Pick up any cases the shard returned without streaming them
+                    for test_case in shard_result.get("test_cases", []):
+                        if _fingerprint(index, test_case) in streamed:
+                            continue
+                        added = merger.add(test_case)
+                        if added is not None:
+                            yield {"event": "test_case", "data": added}
+                    summaries[index] = shard_result.get("coverage_summary")
+                    for key, value in (shard_result.get("usage") or {}).items():
+                        usage[key] = usage.get(key, 0) + value
+                    _merge_validation(validation, shard_result.get("validation"))
+                    if shard_result.get("error"):
+                        errors.append(f"Shard {index + 1}: {shard_result['error']}")
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        logger.info(
+            f"Merged {len(merger.test_cases)} test cases from {len(shards)} shards "
+            f"({merger.duplicates} duplicates dropped)"
+        )
+        result = {
+            "test_cases": merger.test_cases,
+            "coverage_summary": "\n".join(summary for summary in summaries if summary),
+            "fanout": {
+                "shards": len(shards),
+                "shard_size": self.shard_size,
+                "duplicates_removed": merger.duplicates,
+            },
+        }
+        if usage:
+            result["usage"] = usage
+        if validation:
+            result["validation"] = validation
+        if errors:
+            result["error"] = "; ".join(errors)
+        yield {"event": "complete", "data": result}
+
+    def _run_slot(self):
+        """
+        Admission slot for one shard run (a no-op without a controller).
+        """
+        if self.admission is None:
+            return nullcontext()
+        return self.admission.slot(lane=self.lane, bounded=self.bounded)
@@ -0,0 +1,221 @@
+"""
+Record and replay Agent SDK sessions.
+
+With AGENT_RECORD_DIR set, every agent run's message stream is written to
+a JSONL file: a header line with the prompt and options, then one line per
+message with its offset in seconds from the start of the run.
+
+ReplayQuery loads those files and stands in for claude_agent_sdk.query().
+It serves the recorded session for the same prompt (or the next recording
+when there is no exact match), either at recorded speed or as fast as
+possible. This lets the non-LLM parts of the pipeline (prompt building,
+message handling, parsing, response assembly) be regression-tested and
+benchmarked on real traffic without calling the model.
+"""
+
+from claude_agent_sdk import (
+    AssistantMessage,
+    ResultMessage,
+    SystemMessage,
+    TextBlock,
+    ThinkingBlock,
+    ToolResultBlock,
+    ToolUseBlock,
+    UserMessage,
+)
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional
+import asyncio
+import dataclasses
+import glob
+import hashlib
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+RECORDING_FORMAT = 1
+
+_MESSAGE_TYPES = {cls.__name__: cls for cls in (AssistantMessage, UserMessage, SystemMessage, ResultMessage)}
+_BLOCK_TYPES = {cls.__name__: cls for cls in (TextBlock, ThinkingBlock, ToolUseBlock, ToolResultBlock)}
+
+
+def prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+def _options_summary(options: Any) -> Dict:
+    return {
+        "model": getattr(options, "model", None),
+        "max_turns": getattr(options, "max_turns", None),
+        "allowed_tools": list(getattr(options, "allowed_tools", None) or []),
+    }
+
+
+def message_to_dict(message: Any) -> Optional[Dict]:
+    """
+    Serialize an SDK message, keeping the class of each content block.
+    Returns None for message types that cannot be replayed.
+    """
+    if type(message).__name__ not in _MESSAGE_TYPES or not dataclasses.is_dataclass(message):
+        return None
+    data: Dict[str, Any] = {"type": type(message).__name__}
+    for field in dataclasses.fields(message):
+        value = getattr(message, field.name)
+        if field.name == "content" and isinstance(value, list):
+            value = [{"type": type(block).__name__, **dataclasses.asdict(block)} for block in value]
+        data[field.name] = value
+    return data
+
+
+def message_from_dict(data: Dict) -> Any:
+    """
+    Rebuild an SDK message from message_to_dict() output.
+    """
+    data = dict(data)
+    cls = _MESSAGE_TYPES[data.pop("type")]
+    if isinstance(data.get("content"), list):
+        blocks = []
+        for block in data["content"]:
+            block = dict(block)
+            blocks.append(_BLOCK_TYPES[block.pop("type")](**block))
+        data["content"] = blocks
+    known = {field.name for field in dataclasses.fields(cls)}
+    return cls(**{name: value for name, value in data.items() if name in known})
+
+
+class SessionRecorder:
+    """
+    Writes each recorded run to its own JSONL file in `record_dir`.
+    """
+
+    def __init__(self, record_dir: str):
+        self.record_dir = record_dir
+        os.makedirs(record_dir, exist_ok=True)
+
+    async def record(self, prompt: str, options: Any, messages: AsyncIterator[Any]) -> AsyncIterator[Any]:
+        """
+        Pass messages through unchanged, recording them. The file is written
+        when the run ends, including runs that fail or are abandoned.
+        """
+        started = time.monotonic()
+        header = {
+            "format": RECORDING_FORMAT,
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "prompt": prompt,
+            "prompt_sha256": prompt_hash(prompt),
+            "options": _options_summary(options),
+        }
+        lines: List[Dict] = []
+        outcome = "error"
+        try:
+            async for message in messages:
+                data = message_to_dict(message)
+                if data is not None:
+                    lines.append({"offset": round(time.monotonic() - started, 4), "message": data})
+                yield message
+            outcome = "completed"
+        except (GeneratorExit, asyncio.CancelledError):
+            outcome = "cancelled"
+            raise
+        finally:
+            header["outcome"] = outcome
+            header["duration_seconds"] = round(time.monotonic() - started, 4)
+            # Off the event loop: this runs once per request while recording is on
+            await asyncio.to_thread(self._write, header, lines)
+
+    def _write(self, header: Dict, lines: List[Dict]) -> None:
+        name = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{header['prompt_sha256'][:12]}-{uuid.uuid4().hex[:6]}.jsonl"
+        path = os.path.join(self.record_dir, name)
+        try:
+            with open(path, "w", encoding="utf-8") as recording:
+                recording.write(json.dumps(header, default=str) + "\n")
+                for line in lines:
+                    recording.write(json.dumps(line, default=str) + "\n")
+            logger.info(f"Recorded agent session ({len(lines)} messages) to {path}")
+        except Exception as e:
+            logger.warning(f"Failed to record agent session: {str(e)}")
+
+
+def load_recording(path: str) -> Dict:
+    """
+    Read a recording file into {"header": {...}, "messages": [(offset, data), ...]}.
+    """
+    with open(path, encoding="utf-8") as recording:
+        header = json.loads(recording.readline())
+        messages = [(line["offset"], line["message"]) for line in map(json.loads, recording) if line]
+    header["path"] = path
+    return {"header": header, "messages": messages}
+
+
+async def prompt_text(prompt: Any) -> str:
+    """
+    The text of a query() prompt: a string or an async iterable of user messages.
+    """
+    if isinstance(prompt, str):
+        return prompt
+    parts = []
+    async for message in prompt:
+        content = message.get("message", {}).get("content", "")
+        parts.append(content if isinstance(content, str) else json.dumps(content))
+    return "\n".join(parts)
+
+
+class ReplayQuery:
+    """
+    Drop-in for claude_agent_sdk.query(prompt=..., options=...) that serves recorded sessions.
+
+    `speed` scales the recorded timing (1.0 = as recorded, 2.0 = twice as fast);
+    None or 0 replays as fast as possible.
+    """
+
+    def __init__(self, recordings: List[Dict], speed: Optional[float] = 1.0):
+        if not recordings:
+            raise Exception("No agent session recordings to replay")
+        self.recordings = recordings
+        self.speed = speed
+        self._by_prompt = {recording["header"]["prompt_sha256"]: recording for recording in recordings}
+        # Recordings with and without tools, for prompts that were never recorded
+        self._cycles = {
+            with_tools: itertools.cycle(
+                [r for r in recordings if bool(r["header"]["options"]["allowed_tools"]) == with_tools] or recordings
+            )
+            for with_tools in (True, False)
+        }
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.exact_matches = 0
+
+    @classmethod
+    def from_dir(cls, record_dir: str, speed: Optional[float] = 1.0) -> "ReplayQuery":
+        paths = sorted(glob.glob(os.path.join(record_dir, "*.jsonl")))
+        recordings = [load_recording(path) for path in paths]
+        # Only replay runs that finished; abandoned runs have no result message
+        return cls([r for r in recordings if r["header"].get("outcome") == "completed"], speed=speed)
+
+    def select(self, prompt: str, options: Any = None) -> Dict:
+        """
+        The recording for this prompt, or the next one with matching tool use.
+        """
+        with self._lock:
+            self.calls += 1
+            recording = self._by_prompt.get(prompt_hash(prompt))
+            if recording is not None:
+                self.exact_matches += 1
+                return recording
+            return next(self._cycles[bool(getattr(options, "allowed_tools", None))])
+
+    async def __call__(self, prompt: Any, options: Any = None) -> AsyncIterator[Any]:
+        recording = self.select(await prompt_text(prompt), options)
+        started = time.monotonic()
+        for offset, data in recording["messages"]:
+            if self.speed:
+                delay = offset / self.speed - (time.monotonic() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            yield message_from_dict(data)
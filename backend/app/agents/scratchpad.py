@@ -0,0 +1,63 @@
+"""
+Server-side scratchpad for structured agent results.
+
+The structure_test_cases tool used to echo the full test case list back to
+the model, pushing every token through the context a second time. Instead
+the tool stores the result here and returns a short handle; the model
+replies with the handle and the generator resolves it after the run.
+"""
+
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+import copy
+import threading
+import time
+import uuid
+
+
+class ResultScratchpad:
+    """
+    Bounded, expiring store of structured results keyed by opaque handles.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl_seconds: float = 900.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, result: Dict) -> str:
+        handle = f"tc_{uuid.uuid4().hex[:12]}"
+        with self._lock:
+            self._entries[handle] = (self._clock(), copy.deepcopy(result))
+            self._expire()
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return handle
+
+    def pop(self, handle: str) -> Optional[Dict]:
+        """
+        Remove and return the result for a handle, or None if unknown or expired.
+        """
+        with self._lock:
+            self._expire()
+            entry = self._entries.pop(handle, None)
+        return entry[1] if entry is not None else None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _expire(self) -> None:
+        cutoff = self._clock() - self.ttl_seconds
+        while self._entries:
+            handle, (created_at, _) = next(iter(self._entries.items()))
+            if created_at >= cutoff:
+                break
+            del self._entries[handle]
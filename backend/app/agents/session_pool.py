@@ -0,0 +1,402 @@
+"""
+Warm pool of persistent Claude agent sessions.
+
+`query()` spawns a fresh Claude CLI process per call, which then loads
+project skills and starts the in-process MCP server before doing any work.
+The pool keeps connected `ClaudeSDKClient` sessions around and hands them
+out per request instead.
+
+The SDK requires a client to be used from the task that connected it, so
+every session is owned by a dedicated worker task. Requests hand their
+prompt to the worker and read the response messages back through a queue.
+Between requests the worker clears the conversation with `/clear`; after
+`max_uses` requests, or after any error, the session is shut down and
+replaced. A session that sat idle for longer than `probe_after` seconds is
+probed with a `/clear` round-trip before it is handed out again; one that
+does not answer within `probe_timeout` is retired instead of reused.
+"""
+
+from collections import deque
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Deque, Dict, Optional, Set
+import asyncio
+import logging
+import time
+
+if TYPE_CHECKING:
+    from claude_agent_sdk import ClaudeAgentOptions, ClaudeSDKClient
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+
+class AgentPoolExhausted(Exception):
+    """Raised when no session became available within the acquire timeout."""
+
+
+class _SessionWorker:
+    """
+    Owns one ClaudeSDKClient for its whole lifetime (connect to disconnect).
+    """
+
+    def __init__(self, pool: "AgentSessionPool", worker_id: int):
+        self.pool = pool
+        self.worker_id = worker_id
+        self.uses = 0
+        self.created_at = time.monotonic()
+        self.idle_since = self.created_at
+        self.healthy = True
+        self.ready: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.abandoned = asyncio.Event()
+        self._requests: "asyncio.Queue[Any]" = asyncio.Queue()
+        self.task = asyncio.create_task(self._run(), name=f"agent-session-{worker_id}")
+
+    def is_alive(self) -> bool:
+        return self.healthy and not self.task.done()
+
+    def submit(self, prompt: str, out: "asyncio.Queue[Any]") -> None:
+        self.abandoned.clear()
+        self._requests.put_nowait((prompt, out))
+
+    def stop(self) -> None:
+        self._requests.put_nowait(None)
+
+    async def probe(self) -> bool:
+        """
+        Ask the worker to check its session is still responsive.
+        """
+        result: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._requests.put_nowait((None, result))
+        done, _ = await asyncio.wait({result, self.task}, return_when=asyncio.FIRST_COMPLETED)
+        return result in done and result.result()
+
+    async def _run(self) -> None:
+        from claude_agent_sdk import ClaudeSDKClient
+
+        client = ClaudeSDKClient(options=self.pool.options_factory())
+        try:
+            try:
+                await client.connect()
+            except Exception as e:
+                self.ready.set_exception(e)
+                return
+            self.ready.set_result(True)
+            logger.info(f"Agent session {self.worker_id} connected")
+
+            while self.healthy:
+                request = await self._requests.get()
+                if request is None:
+                    break
+                prompt, out = request
+                if prompt is None:
+                    # Health probe before an idle session is reused
+                    healthy = await self._probe(client)
+                    out.set_result(healthy)
+                    if not healthy:
+                        break
+                    continue
+                self.uses += 1
+
+                await self._serve(client, prompt, out)
+                if not self.healthy or self.uses >= self.pool.max_uses:
+                    break
+
+                # Drop this request's conversation before the next one
+                try:
+                    await asyncio.wait_for(self._drain(client, "/clear"), timeout=self.pool.reset_timeout)
+                except Exception as e:
+                    logger.warning(f"Agent session {self.worker_id} failed to reset: {str(e)}")
+                    break
+
+                await self.pool._on_idle(self)
+        finally:
+            self.healthy = False
+            try:
+                await client.disconnect()
+            except Exception as e:
+                logger.debug(f"Agent session {self.worker_id} disconnect error: {str(e)}")
+            logger.info(f"Agent session {self.worker_id} closed after {self.uses} uses")
+            await self.pool._on_exit(self)
+
+    async def _serve(self, client: "ClaudeSDKClient", prompt: str, out: "asyncio.Queue[Any]") -> None:
+        try:
+            await client.query(prompt)
+            async for message in client.receive_response():
+                if self.abandoned.is_set():
+                    # Nobody is reading anymore; stop the run and retire the session
+                    await client.interrupt()
+                    self.healthy = False
+                    break
+                out.put_nowait(message)
+            out.put_nowait(_END)
+        except Exception as e:
+            self.healthy = False
+            out.put_nowait(e)
+
+    async def _probe(self, client: "ClaudeSDKClient") -> bool:
+        try:
+            await asyncio.wait_for(self._drain(client, "/clear"), timeout=self.pool.probe_timeout)
+            return True
+        except Exception as e:
+            logger.warning(f"Agent session {self.worker_id} failed its health probe: {str(e) or type(e).__name__}")
+            self.healthy = False
+            return False
+
+    async def _drain(self, client: "ClaudeSDKClient", prompt: str) -> None:
+        await client.query(prompt)
+        async for _ in client.receive_response():
+            pass
+
+
+class AgentSessionPool:
+    """
+    Bounded pool of warm agent sessions with per-session use limits.
+    """
+
+    def __init__(
+        self,
+        options_factory: Callable[[], "ClaudeAgentOptions"],
+        min_size: int = 1,
+        max_size: int = 4,
+        max_uses: int = 20,
+        acquire_timeout: float = 60.0,
+        reset_timeout: float = 30.0,
+        probe_after: float = 60.0,
+        probe_timeout: float = 5.0,
+    ):
+        self.options_factory = options_factory
+        self.min_size = min_size
+        self.max_size = max(max_size, min_size)
+        self.max_uses = max_uses
+        self.acquire_timeout = acquire_timeout
+        self.reset_timeout = reset_timeout
+        self.probe_after = probe_after
+        self.probe_timeout = probe_timeout
+
+        self._workers: Set[_SessionWorker] = set()
+        self._idle: Deque[_SessionWorker] = deque()
+        self._cond = asyncio.Condition()
+        self._next_id = 0
+        self._waiting = 0
+        self._closed = False
+        self._background: Set[asyncio.Task] = set()
+
+        self.sessions_created = 0
+        self.sessions_retired = 0
+        self.probes_failed = 0
+
+    async def start(self) -> None:
+        """
+        Pre-start `min_size` sessions.
+        """
+        await asyncio.gather(*[self._warm_one() for _ in range(self.min_size)])
+        logger.info(f"Agent session pool started ({len(self._idle)} warm sessions)")
+
+    async def run(self, prompt: str) -> AsyncIterator[Any]:
+        """
+        Run one prompt on a pooled session and yield its response messages.
+        """
+        worker = await self._acquire()
+        out: "asyncio.Queue[Any]" = asyncio.Queue()
+        worker.submit(prompt, out)
+        finished = False
+        try:
+            while True:
+                item = await out.get()
+                if item is _END:
+                    finished = True
+                    return
+                if isinstance(item, Exception):
+                    finished = True
+                    raise item
+                yield item
+        finally:
+            if not finished:
+                worker.abandoned.set()
+
+    async def close(self) -> None:
+        """
+        Shut down every session. Busy sessions stop after their current request.
+        """
+        async with self._cond:
+            self._closed = True
+            workers = list(self._workers)
+            self._idle.clear()
+            self._cond.notify_all()
+        for worker in workers:
+            worker.stop()
+        await asyncio.gather(*[worker.task for worker in workers], return_exceptions=True)
+
+    def stats(self) -> Dict:
+        return {
+            "size": len(self._workers),
+            "idle": len(self._idle),
+            "in_use": len(self._workers) - len(self._idle),
+            "waiting": self._waiting,
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "sessions_created": self.sessions_created,
+            "sessions_retired": self.sessions_retired,
+            "probes_failed": self.probes_failed,
+        }
+
+    async def _acquire(self) -> _SessionWorker:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.acquire_timeout
+
+        while True:
+            worker, is_new = await self._checkout(deadline)
+            if is_new:
+                # Connect outside the lock so other requests can use idle sessions meanwhile
+                await self._connected(worker)
+                return worker
+            if await self._usable(worker):
+                return worker
+
+    async def _checkout(self, deadline: float):
+        """
+        Take an idle session, or start a new one while below max_size.
+        Returns (worker, is_new).
+        """
+        loop = asyncio.get_running_loop()
+        async with self._cond:
+            while True:
+                if self._closed:
+                    raise AgentPoolExhausted("Agent session pool is closed")
+
+                while self._idle:
+                    worker = self._idle.popleft()
+                    if worker.is_alive():
+                        return worker, False
+
+                if len(self._workers) < self.max_size:
+                    return self._new_worker(), True
+
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise AgentPoolExhausted(
+                        f"No agent session available within {self.acquire_timeout}s"
+                    )
+                self._waiting += 1
+                try:
+                    await asyncio.wait_for(self._cond.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    pass
+                finally:
+                    self._waiting -= 1
+
+    async def _usable(self, worker: _SessionWorker) -> bool:
+        """
+        Probe a session that has been idle for a while before reusing it.
+        Sessions that fail the probe retire themselves.
+        """
+        if time.monotonic() - worker.idle_since < self.probe_after:
+            return True
+        try:
+            healthy = await worker.probe()
+        except BaseException:
+            # The caller went away mid-probe; the session's state is unknown
+            worker.stop()
+            raise
+        if not healthy:
+            self.probes_failed += 1
+        return healthy
+
+    async def _connected(self, worker: _SessionWorker) -> None:
+        """
+        Wait for a new worker to connect. If the caller is cancelled meanwhile the
+        worker is parked idle (or stopped) rather than holding a slot forever.
+        """
+        try:
+            # Shielded: cancelling the caller must not cancel the worker's own future
+            await asyncio.shield(worker.ready)
+        except BaseException:
+            ready = worker.ready
+            if ready.done() and not ready.cancelled() and ready.exception() is None:
+                await self._on_idle(worker)
+            else:
+                worker.stop()
+            raise
+
+    def _new_worker(self) -> _SessionWorker:
+        self._next_id += 1
+        worker = _SessionWorker(self, self._next_id)
+        self._workers.add(worker)
+        self.sessions_created += 1
+        return worker
+
+    async def _warm_one(self) -> None:
+        async with self._cond:
+            if self._closed or len(self._workers) >= self.max_size:
+                return
+            worker = self._new_worker()
+        try:
+            await self._connected(worker)
+        except Exception as e:
+            logger.warning(f"Failed to start agent session: {str(e)}")
+            return
+        await self._on_idle(worker)
+
+    async def _on_idle(self, worker: _SessionWorker) -> None:
+        async with self._cond:
+            if self._closed:
+                worker.stop()
+                return
+            worker.idle_since = time.monotonic()
+            self._idle.append(worker)
+            self._cond.notify()
+
+    async def _on_exit(self, worker: _SessionWorker) -> None:
+        async with self._cond:
+            self._workers.discard(worker)
+            if worker in self._idle:
+                self._idle.remove(worker)
+            self.sessions_retired += 1
+            self._cond.notify()
+            replenish = not self._closed and len(self._workers) < self.min_size
+
+        if replenish:
+            task = asyncio.create_task(self._warm_one())
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+
+
+# Process-wide session pool, started on first use or in the startup hook
+_shared_session_pool: Optional[AgentSessionPool] = None
+_shared_session_pool_lock = asyncio.Lock()
+
+
+async def get_shared_session_pool(
+    settings,
+    options_factory: Callable[[], "ClaudeAgentOptions"],
+) -> Optional[AgentSessionPool]:
+    """
+    Return the process-wide AgentSessionPool, or None when pooling is disabled.
+    """
+    global _shared_session_pool
+    if not settings.agent_pool_enabled:
+        return None
+    if _shared_session_pool is None:
+        async with _shared_session_pool_lock:
+            if _shared_session_pool is None:
+                pool = AgentSessionPool(
+                    options_factory=options_factory,
+                    min_size=settings.agent_pool_min_size,
+                    max_size=settings.agent_pool_max_size,
+                    max_uses=settings.agent_pool_max_uses,
+                    acquire_timeout=settings.agent_pool_acquire_timeout,
+                    probe_after=settings.agent_pool_probe_after,
+                )
+                await pool.start()
+                _shared_session_pool = pool
+    return _shared_session_pool
+
+
+async def close_shared_session_pool() -> None:
+    """
+    Shut down the process-wide AgentSessionPool, if one was started.
+    """
+    global _shared_session_pool
+    if _shared_session_pool is not None:
+        await _shared_session_pool.close()
+        _shared_session_pool = None
@@ -0,0 +1,271 @@
+"""
+Incremental parser for test case JSON embedded in agent output.
+
+The agent's text mixes narration, code fences and the JSON result. Instead
+of slicing from the first `{` to the last `}` once the run is over, the
+parser is fed text chunks as they arrive. It locates the `"test_cases"`
+array and returns each element the moment its object closes. Narration is
+never buffered, so memory stays bounded by the size of a single test case.
+"""
+
+from typing import Dict, List, Optional
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+_TEST_CASES_KEY = '"test_cases"'
+_SUMMARY_KEY = '"coverage_summary"'
+_KEYS = (_TEST_CASES_KEY, _SUMMARY_KEY)
+_TAIL_CHARS = max(len(key) for key in _KEYS) - 1
+
+# Parser states
+_SCAN = "scan"  # looking for a key in prose or JSON
+_AFTER_KEY = "after_key"  # expecting ':'
+_BEFORE_VALUE = "before_value"  # expecting '[' (test_cases) or '"' (coverage_summary)
+_IN_ARRAY = "in_array"  # between elements of the test_cases array
+_IN_ELEMENT = "in_element"  # inside one test case object
+_IN_SUMMARY = "in_summary"  # inside the coverage_summary string
+
+
+class StreamingTestCaseParser:
+    """
+    Push parser that extracts test cases from streamed agent text.
+
+    Usage:
+        parser = StreamingTestCaseParser()
+        for chunk in chunks:
+            for test_case in parser.feed(chunk):
+                ...
+        result = parser.result()
+    """
+
+    def __init__(self, max_element_chars: int = 256_000, max_summary_chars: int = 16_000):
+        self.max_element_chars = max_element_chars
+        self.max_summary_chars = max_summary_chars
+
+        self.test_cases: List[Dict] = []
+        self.coverage_summary: Optional[str] = None
+        self.found_test_cases = False
+        self.errors: List[str] = []
+
+        self._state = _SCAN
+        self._key: Optional[str] = None
+        self._pending = ""
+        self._seen = set()
+
+        # Current element / summary string
+        self._parts: List[str] = []
+        self._size = 0
+        self._overflow = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> List[Dict]:
+        """
+        Consume a chunk of text and return the test cases completed by it.
+        """
+        completed: List[Dict] = []
+        text = self._pending + chunk
+        self._pending = ""
+        i = 0
+        length = len(text)
+
+        while i < length:
+            state = self._state
+
+            if state == _SCAN:
+                i = self._scan_for_key(text, i)
+                if i < 0:
+                    break
+
+            elif state == _AFTER_KEY:
+                c = text[i]
+                if c.isspace():
+                    i += 1
+                elif c == ":":
+                    self._state = _BEFORE_VALUE
+                    i += 1
+                else:
+                    self._state = _SCAN
+
+            elif state == _BEFORE_VALUE:
+                c = text[i]
+                if c.isspace():
+                    i += 1
+                elif c == "[" and self._key == _TEST_CASES_KEY:
+                    self.found_test_cases = True
+                    self._state = _IN_ARRAY
+                    i += 1
+                elif c == '"' and self._key == _SUMMARY_KEY:
+                    self._start_value()
+                    self._state = _IN_SUMMARY
+                    i += 1
+                else:
+                    self._state = _SCAN
+
+            elif state == _IN_ARRAY:
+                c = text[i]
+                if c.isspace() or c == ",":
+                    i += 1
+                elif c == "{":
+                    self._start_value()
+                    self._state = _IN_ELEMENT
+                elif c == "]":
+                    self._state = _SCAN
+                    i += 1
+                else:
+                    # Not an array of objects; go back to looking for keys
+                    self._state = _SCAN
+
+            elif state == _IN_ELEMENT:
+                i, done = self._consume_element(text, i)
+                if done:
+                    test_case = self._finish_element()
+                    if test_case is not None:
+                        completed.append(test_case)
+                    self._state = _IN_ARRAY
+
+            elif state == _IN_SUMMARY:
+                i, done = self._consume_string(text, i)
+                if done:
+                    self._finish_summary()
+                    self._state = _SCAN
+
+        return completed
+
+    def result(self) -> Dict:
+        """
+        The parsed result so far, in the shape generate_test_cases returns.
+        """
+        return {
+            "test_cases": list(self.test_cases),
+            "coverage_summary": self.coverage_summary or "",
+        }
+
+    def _scan_for_key(self, text: str, start: int) -> int:
+        best = -1
+        best_key = None
+        for key in _KEYS:
+            pos = text.find(key, start)
+            if pos != -1 and (best == -1 or pos < best):
+                best, best_key = pos, key
+
+        if best == -1:
+            # Keep just enough text to match a key split across chunks
+            self._pending = text[max(start, len(text) - _TAIL_CHARS):]
+            return -1
+
+        self._key = best_key
+        self._state = _AFTER_KEY
+        return best + len(best_key)
+
+    def _start_value(self) -> None:
+        self._parts = []
+        self._size = 0
+        self._overflow = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def _append(self, piece: str, limit: int) -> None:
+        if self._overflow:
+            return
+        self._size += len(piece)
+        if self._size > limit:
+            # Drop the value but keep tracking structure until it closes
+            self._overflow = True
+            self._parts = []
+        else:
+            self._parts.append(piece)
+
+    def _consume_element(self, text: str, start: int):
+        depth = self._depth
+        in_string = self._in_string
+        escape = self._escape
+        done = False
+        i = start
+
+        while i < len(text):
+            c = text[i]
+            i += 1
+            if in_string:
+                if escape:
+                    escape = False
+                elif c == "\\":
+                    escape = True
+                elif c == '"':
+                    in_string = False
+            elif c == '"':
+                in_string = True
+            elif c == "{" or c == "[":
+                depth += 1
+            elif c == "}" or c == "]":
+                depth -= 1
+                if depth == 0:
+                    done = True
+                    break
+
+        self._depth = depth
+        self._in_string = in_string
+        self._escape = escape
+        self._append(text[start:i], self.max_element_chars)
+        return i, done
+
+    def _consume_string(self, text: str, start: int):
+        escape = self._escape
+        i = start
+
+        while i < len(text):
+            c = text[i]
+            if escape:
+                escape = False
+            elif c == "\\":
+                escape = True
+            elif c == '"':
+                self._escape = False
+                self._append(text[start:i], self.max_summary_chars)
+                return i + 1, True
+            i += 1
+
+        self._escape = escape
+        self._append(text[start:i], self.max_summary_chars)
+        return i, False
+
+    def _finish_element(self) -> Optional[Dict]:
+        if self._overflow:
+            self.errors.append(f"Test case exceeded {self.max_element_chars} characters")
+            return None
+
+        raw = "".join(self._parts)
+        self._parts = []
+        try:
+            test_case = json.loads(raw)
+        except json.JSONDecodeError as e:
+            logger.warning(f"Skipping unparseable test case: {str(e)}")
+            self.errors.append(str(e))
+            return None
+
+        if not isinstance(test_case, dict):
+            return None
+
+        # The agent sometimes repeats its JSON (draft, then final); emit each case once
+        fingerprint = json.dumps(test_case, sort_keys=True)
+        if fingerprint in self._seen:
+            return None
+        self._seen.add(fingerprint)
+
+        self.test_cases.append(test_case)
+        return test_case
+
+    def _finish_summary(self) -> None:
+        raw = "".join(self._parts)
+        self._parts = []
+        if self._overflow:
+            self.errors.append(f"coverage_summary exceeded {self.max_summary_chars} characters")
+            return
+        try:
+            self.coverage_summary = json.loads(f'"{raw}"')
+        except json.JSONDecodeError as e:
+            self.errors.append(str(e))
@@ -2,23 +2,115 @@
 Simplified Test Case Generator using Claude API directly (fallback)
 """
 
-from anthropic import Anthropic
-from typing import List, Dict
-import json
+from anthropic import AsyncAnthropic
+from contextlib import aclosing
+from typing import AsyncIterator, List, Dict, Optional
+from .streaming_parser import StreamingTestCaseParser
+from .validation import MODE_AGENTIC, MODE_FAST, validated_events
+from app.services import tracing
+from app.services.metrics import PARSE_FAILURES, PROMPT_BUILD_SECONDS, AgentRunMetrics
+import asyncio
+import httpx
 import logging
-import os
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
 
+def create_http_client(
+    max_connections: int = 20,
+    max_keepalive_connections: int = 10,
+    keepalive_expiry: float = 30.0,
+    http2: bool = True,
+) -> httpx.AsyncClient:
+    """
+    Build the pooled HTTP client used for Anthropic API calls.
+    HTTP/2 is used only when the optional `h2` package is installed.
+    """
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.info("h2 not installed; using HTTP/1.1 for the Anthropic API")
+            http2 = False
+
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        ),
+        http2=http2,
+        timeout=httpx.Timeout(600.0, connect=10.0),
+    )
+
+
+# Process-wide HTTP connection pool, shared by every generator instance
+_shared_http_client: Optional[httpx.AsyncClient] = None
+_shared_http_client_lock = threading.Lock()
+
+
+def get_shared_http_client(settings) -> httpx.AsyncClient:
+    """
+    Return the process-wide Anthropic HTTP client, creating it on first use.
+    """
+    global _shared_http_client
+    if _shared_http_client is None:
+        with _shared_http_client_lock:
+            if _shared_http_client is None:
+                _shared_http_client = create_http_client(
+                    max_connections=settings.anthropic_max_connections,
+                    max_keepalive_connections=settings.anthropic_max_keepalive_connections,
+                    keepalive_expiry=settings.anthropic_keepalive_expiry,
+                    http2=settings.anthropic_http2,
+                )
+    return _shared_http_client
+
+
+async def close_shared_http_client() -> None:
+    """
+    Close the process-wide Anthropic HTTP client, if one was created.
+    """
+    global _shared_http_client
+    if _shared_http_client is not None:
+        await _shared_http_client.aclose()
+        _shared_http_client = None
+
+
+def _usage_summary(usage) -> Dict[str, int]:
+    """
+    Token counts from a Message, including prompt cache reads/writes.
+    """
+    return {
+        "input_tokens": usage.input_tokens,
+        "output_tokens": usage.output_tokens,
+        # Only present on SDK versions that know about prompt caching
+        "cache_creation_input_tokens": getattr(usage, "cache_creation_input_tokens", None) or 0,
+        "cache_read_input_tokens": getattr(usage, "cache_read_input_tokens", None) or 0,
+    }
+
+
 class TestCaseGeneratorAgent:
     """
     Simplified test case generator using direct Anthropic API.
     This is a fallback while we debug the Claude Agent SDK integration.
     """
 
-    def __init__(self, api_key: str, jira_service=None, jira_mcp_enabled: bool = False):
-        self.client = Anthropic(api_key=api_key)
+    # Bump when the prompts change so cached results are not reused
+    PROMPT_VERSION = "2"
+    # Label for metrics and traces
+    ENGINE = "direct_api"
+
+    def __init__(
+        self,
+        api_key: str,
+        jira_service=None,
+        jira_mcp_enabled: bool = False,
+        http_client: Optional[httpx.AsyncClient] = None,
+    ):
+        # Async client so concurrent generations overlap instead of blocking the event loop
+        self.client = AsyncAnthropic(api_key=api_key, http_client=http_client or create_http_client())
         self.model = "claude-sonnet-4-5-20250929"
         self.jira_service = jira_service
 
@@ -31,31 +123,26 @@ class TestCaseGeneratorAgent:
         include_edge_cases: bool = True,
         include_negative_tests: bool = True,
         jira_issue_key: str = None,
+        mode: str = MODE_AGENTIC,
     ) -> Dict:
         """
         Generate test cases using Claude (direct API for now).
         """
-        prompt = self._build_prompt(
-            title=title,
-            description=description,
-            acceptance_criteria=acceptance_criteria,
-            test_types=test_types,
-            include_edge_cases=include_edge_cases,
-            include_negative_tests=include_negative_tests,
-        )
-
         try:
-            logger.info(f"Generating test cases for: {title}")
+            result: Dict = {}
+            async for event in self.stream_test_cases(
+                title=title,
+                description=description,
+                acceptance_criteria=acceptance_criteria,
+                test_types=test_types,
+                include_edge_cases=include_edge_cases,
+                include_negative_tests=include_negative_tests,
+                jira_issue_key=jira_issue_key,
+                mode=mode,
+            ):
+                if event["event"] == "complete":
+                    result = event["data"]
 
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=16000,
-                temperature=0.7,
-                system=self._get_system_prompt(),
-                messages=[{"role": "user", "content": prompt}]
-            )
-
-            result = self._parse_response(response.content[0].text)
             logger.info(f"Generated {len(result.get('test_cases', []))} test cases")
             return result
 
@@ -63,6 +150,147 @@ class TestCaseGeneratorAgent:
             logger.error(f"Error generating test cases: {str(e)}")
             raise Exception(f"Failed to generate test cases: {str(e)}")
 
+    async def stream_test_cases(
+        self,
+        title: str,
+        description: str,
+        acceptance_criteria: List[str],
+        test_types: List[str],
+        include_edge_cases: bool = True,
+        include_negative_tests: bool = True,
+        jira_issue_key: str = None,
+        mode: str = MODE_AGENTIC,
+    ) -> AsyncIterator[Dict]:
+        """
+        Stream the completion and yield events as tokens arrive.
+
+        Same event shape as the Agent SDK generator: "test_case" for each test
+        case as soon as its JSON object closes, "progress" with token usage once
+        the message is done, then "complete" with the parsed result. Closing the
+        iterator early closes the HTTP stream, so abandoned generations stop.
+        In fast mode the test cases are validated and repaired locally, and
+        only failing cases are sent back to the model.
+        """
+        prompt_span = tracing.current_span().child("prompt_build", engine=self.ENGINE)
+        with PROMPT_BUILD_SECONDS.time(engine=self.ENGINE):
+            prompt = self._build_prompt(
+                title=title,
+                description=description,
+                acceptance_criteria=acceptance_criteria,
+                test_types=test_types,
+                include_edge_cases=include_edge_cases,
+                include_negative_tests=include_negative_tests,
+            )
+        prompt_span.end()
+
+        logger.info(f"Generating test cases for: {title}")
+        events = self._message_events(prompt)
+        if mode == MODE_FAST:
+            events = validated_events(
+                events,
+                default_type=test_types[0] if test_types else None,
+                reask=self._reask,
+            )
+
+        async with aclosing(events):
+            async for event in events:
+                yield event
+
+    async def _message_events(self, prompt: str) -> AsyncIterator[Dict]:
+        """
+        Stream one completion as test_case/progress/complete events.
+        """
+        parser = StreamingTestCaseParser()
+        run_metrics = AgentRunMetrics(self.ENGINE)
+        run_span = tracing.current_span().child("agent_run", engine=self.ENGINE)
+
+        try:
+            turn_started = time.time_ns()
+            turn_span = run_span.child("assistant_turn", start_ns=turn_started)
+            first_token_ns = None
+            async with self.client.messages.stream(
+                model=self.model,
+                max_tokens=16000,
+                temperature=0.7,
+                system=self._get_system_blocks(),
+                messages=[{"role": "user", "content": prompt}]
+            ) as stream:
+                async for text in stream.text_stream:
+                    run_metrics.message()
+                    if first_token_ns is None:
+                        first_token_ns = time.time_ns()
+                    for test_case in parser.feed(text):
+                        yield {"event": "test_case", "data": test_case}
+                final_message = await stream.get_final_message()
+
+            usage = _usage_summary(final_message.usage)
+            turn_span.set(stop_reason=final_message.stop_reason, usage=usage)
+            if first_token_ns is not None:
+                turn_span.set(time_to_first_token_ms=round((first_token_ns - turn_started) / 1_000_000, 1))
+            turn_span.end()
+            yield {
+                "event": "progress",
+                "data": {
+                    "message_type": "Message",
+                    "stop_reason": final_message.stop_reason,
+                    **usage,
+                },
+            }
+            run_metrics.turns = 1
+            run_span.set(num_turns=1, usage=usage)
+            parse_span = run_span.child("parse")
+            try:
+                result = self._parser_result(parser)
+            except ValueError as e:
+                PARSE_FAILURES.inc(engine=self.ENGINE, reason="no_json")
+                run_metrics.finish("parse_error")
+                parse_span.fail(e)
+                parse_span.end()
+                raise
+            parse_span.set(test_cases=len(result.get("test_cases", [])), parse_error="error" in result)
+            parse_span.end()
+            result["usage"] = usage
+            run_metrics.finish(result=result)
+            run_span.end()
+            yield {"event": "complete", "data": result}
+        except (GeneratorExit, asyncio.CancelledError):
+            run_metrics.finish("cancelled")
+            run_span.set(cancelled=True)
+            raise
+        except Exception as e:
+            run_metrics.finish("error")
+            run_span.fail(e)
+            raise
+        finally:
+            turn_span.end()
+            run_span.end()
+
+    async def _reask(self, prompt: str) -> str:
+        """
+        Fast-mode follow-up for test cases that failed local validation.
+        """
+        message = await self.client.messages.create(
+            model=self.model,
+            max_tokens=16000,
+            temperature=0,
+            system=self._get_system_blocks(),
+            messages=[{"role": "user", "content": prompt}]
+        )
+        return "".join(block.text for block in message.content if getattr(block, "text", None))
+
+    def _get_system_blocks(self) -> List[Dict]:
+        """
+        The system prompt as a single cache-marked block. It is below the
+        1024-token minimum cacheable prefix, so nothing is cached until it grows.
+        """
+        return [
+            {
+                "type": "text",
+                "text": self._get_system_prompt(),
+                "cache_control": {"type": "ephemeral"},
+            }
+        ]
+
     def _get_system_prompt(self) -> str:
         return """You are an expert QA engineer and test case designer. Your role is to generate comprehensive, well-structured test cases based on feature descriptions and acceptance criteria.
 
@@ -94,7 +322,16 @@ Always return your response as a valid JSON object with the following structure:
     }
   ],
   "coverage_summary": "Summary of what scenarios are covered"
-}"""
+}
+
+When given a feature, analyze it and its acceptance criteria carefully, then generate a complete set of test cases that ensure thorough coverage. Consider:
+1. Happy path scenarios
+2. Boundary conditions
+3. Error handling
+4. Data validation
+5. User workflows
+
+Generate at least 5 test cases."""
 
     def _build_prompt(
         self,
@@ -123,35 +360,27 @@ Always return your response as a valid JSON object with the following structure:
 - Include edge cases: {"Yes" if include_edge_cases else "No"}
 - Include negative test scenarios: {"Yes" if include_negative_tests else "No"}
 
-Please analyze the feature and acceptance criteria carefully, then generate a complete set of test cases that ensure thorough coverage. Consider:
-1. Happy path scenarios
-2. Boundary conditions
-3. Error handling
-4. Data validation
-5. User workflows
-
-Return the test cases in the JSON format specified in your system prompt. Generate at least 5 test cases."""
+Return the test cases in the JSON format specified in your system prompt."""
 
         return prompt
 
     def _parse_response(self, response_text: str) -> Dict:
         """Parse Claude's response and extract test cases."""
-        try:
-            start_idx = response_text.find('{')
-            end_idx = response_text.rfind('}') + 1
-
-            if start_idx == -1 or end_idx == 0:
-                raise ValueError("No JSON found in response")
+        parser = StreamingTestCaseParser()
+        parser.feed(response_text)
+        return self._parser_result(parser)
 
-            json_str = response_text[start_idx:end_idx]
-            result = json.loads(json_str)
+    def _parser_result(self, parser: StreamingTestCaseParser) -> Dict:
+        """Turn a fed StreamingTestCaseParser into the result dict."""
+        if not parser.found_test_cases:
+            raise ValueError("No JSON found in response")
 
-            return result
-
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse JSON response: {str(e)}")
+        if not parser.test_cases and parser.errors:
+            logger.error(f"Failed to parse JSON response: {parser.errors[0]}")
             return {
                 "test_cases": [],
                 "coverage_summary": "Failed to parse response",
-                "error": str(e)
+                "error": parser.errors[0]
             }
+
+        return parser.result()
@@ -0,0 +1,233 @@
+"""
+Local validation and repair of generated test cases ("fast" mode).
+
+In the agentic mode the model checks each test case through an MCP tool
+call, and every call costs a model turn. In fast mode the model only
+generates; the checks run here instead. Each test case is repaired where
+that is mechanical (enum spelling, step numbering, string-vs-list fields)
+and validated against the TestCase/TestStep models. Only the cases that
+still fail are sent back to the model, in a single targeted re-ask.
+"""
+
+from pydantic import ValidationError
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+import json
+import logging
+
+from app.models import TestCase, TestCasePriority, TestCaseType
+from .streaming_parser import StreamingTestCaseParser
+
+logger = logging.getLogger(__name__)
+
+MODE_AGENTIC = "agentic"
+MODE_FAST = "fast"
+
+# Spellings the model uses for the TestCaseType / TestCasePriority values
+_TYPE_ALIASES = {
+    "end-to-end": "e2e",
+    "end to end": "e2e",
+    "endtoend": "e2e",
+    "functionality": "functional",
+    "integration test": "integration",
+    "unit test": "unit",
+    "rest": "api",
+    "api test": "api",
+}
+_PRIORITY_ALIASES = {
+    "critical": "high",
+    "highest": "high",
+    "p0": "high",
+    "p1": "high",
+    "normal": "medium",
+    "moderate": "medium",
+    "p2": "medium",
+    "lowest": "low",
+    "minor": "low",
+    "p3": "low",
+}
+_TYPES = {t.value for t in TestCaseType}
+_PRIORITIES = {p.value for p in TestCasePriority}
+
+
+def _normalize_enum(value: Any, allowed: set, aliases: Dict[str, str], default: Optional[str]) -> Any:
+    if not isinstance(value, str) or not value.strip():
+        return default if default is not None else value
+    key = value.strip().lower()
+    if key in allowed:
+        return key
+    return aliases.get(key, value)
+
+
+def _as_list(value: Any) -> List:
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    return [value]
+
+
+def _repair_step(step: Any, number: int) -> Any:
+    if isinstance(step, str):
+        action, _, expected = step.partition("->")
+        step = {"action": action.strip(), "expected_result": expected.strip()}
+    if not isinstance(step, dict):
+        return step
+    step = dict(step)
+    step["step_number"] = number
+    if "action" not in step and "step" in step:
+        step["action"] = step.pop("step")
+    if "expected_result" not in step and "expected" in step:
+        step["expected_result"] = step.pop("expected")
+    return step
+
+
+def repair_test_case(test_case: Dict, default_type: Optional[str] = None) -> Dict:
+    """
+    Apply mechanical fixes: enum normalization, step renumbering, list fields.
+    """
+    repaired = dict(test_case)
+    repaired["type"] = _normalize_enum(repaired.get("type"), _TYPES, _TYPE_ALIASES, default_type)
+    repaired["priority"] = _normalize_enum(repaired.get("priority"), _PRIORITIES, _PRIORITY_ALIASES, "medium")
+    repaired["preconditions"] = _as_list(repaired.get("preconditions"))
+    repaired["tags"] = _as_list(repaired.get("tags"))
+    repaired["steps"] = [
+        _repair_step(step, number) for number, step in enumerate(_as_list(repaired.get("steps")), start=1)
+    ]
+    if not repaired.get("expected_outcome") and repaired["steps"]:
+        last_step = repaired["steps"][-1]
+        if isinstance(last_step, dict) and last_step.get("expected_result"):
+            repaired["expected_outcome"] = last_step["expected_result"]
+    return repaired
+
+
+def validate_test_case(test_case: Dict) -> List[str]:
+    """
+    Check a test case against the TestCase model. Returns the problems found.
+    """
+    errors: List[str] = []
+    try:
+        TestCase.model_validate(test_case)
+    except ValidationError as e:
+        for error in e.errors():
+            location = ".".join(str(part) for part in error["loc"])
+            errors.append(f"{location}: {error['msg']}")
+    if not test_case.get("steps"):
+        errors.append("steps: at least one step is required")
+    for field in ("title", "description", "expected_outcome"):
+        value = test_case.get(field)
+        if isinstance(value, str) and not value.strip():
+            errors.append(f"{field}: must not be empty")
+    return errors
+
+
+def check_test_case(test_case: Any, default_type: Optional[str] = None) -> Tuple[Any, List[str]]:
+    """
+    Repair then validate a test case. Returns (repaired test case, errors).
+    """
+    if not isinstance(test_case, dict):
+        return test_case, ["test case must be a JSON object"]
+    repaired = repair_test_case(test_case, default_type)
+    errors = validate_test_case(repaired)
+    if errors:
+        return repaired, errors
+    # Drop unknown fields and coerce values to the model's types
+    return TestCase.model_validate(repaired).model_dump(mode="json"), []
+
+
+def build_reask_prompt(failures: List[Tuple[Dict, List[str]]]) -> str:
+    """
+    Prompt asking the model to fix only the test cases that failed validation.
+    """
+    cases = "\n\n".join(
+        f"Test case {index}:\n{json.dumps(test_case, default=str)}\nProblems:\n"
+        + "\n".join(f"- {error}" for error in errors)
+        for index, (test_case, errors) in enumerate(failures, start=1)
+    )
+    return f"""The following test cases failed validation. Fix the listed problems without changing what each test case covers.
+
+{cases}
+
+Return ONLY a JSON object of the form {{"test_cases": [...]}} with the {len(failures)} corrected test cases, in the same order."""
+
+
+def _parse_test_cases(text: str) -> List[Dict]:
+    parser = StreamingTestCaseParser()
+    parser.feed(text)
+    return parser.test_cases
+
+
+async def validated_events(
+    events: AsyncIterator[Dict],
+    default_type: Optional[str],
+    reask: Optional[Callable[[str], Awaitable[str]]] = None,
+) -> AsyncIterator[Dict]:
+    """
+    Wrap a generator's event stream with local validation.
+
+    Valid (or repaired) test cases are emitted as they arrive; failing ones
+    are held back and, if `reask` is given, sent back to the model once.
+    The "complete" result only contains valid test cases, plus a
+    "validation" summary.
+    """
+    valid: List[Dict] = []
+    failures: List[Tuple[Dict, List[str]]] = []
+    seen = set()
+    stats = {"checked": 0, "repaired": 0, "reasked": 0, "fixed_by_reask": 0, "dropped": 0}
+
+    def check(test_case: Any) -> Optional[Dict]:
+        fingerprint = json.dumps(test_case, sort_keys=True, default=str)
+        if fingerprint in seen:
+            return None
+        seen.add(fingerprint)
+        stats["checked"] += 1
+        repaired, errors = check_test_case(test_case, default_type)
+        if errors:
+            failures.append((repaired, errors))
+            return None
+        if repaired != test_case:
+            stats["repaired"] += 1
+        valid.append(repaired)
+        return repaired
+
+    result: Dict = {}
+    async for event in events:
+        if event["event"] == "test_case":
+            test_case = check(event["data"])
+            if test_case is not None:
+                yield {"event": "test_case", "data": test_case}
+        elif event["event"] == "complete":
+            result = event["data"]
+            for test_case in result.get("test_cases", []):
+                checked = check(test_case)
+                if checked is not None:
+                    yield {"event": "test_case", "data": checked}
+        else:
+            yield event
+
+    if failures and reask is not None:
+        stats["reasked"] = len(failures)
+        logger.info(f"Re-asking for {len(failures)} test cases that failed validation")
+        try:
+            retried = _parse_test_cases(await reask(build_reask_prompt(failures)))
+        except Exception as e:
+            logger.warning(f"Re-ask failed: {str(e)}")
+            retried = []
+        remaining = []
+        for test_case in retried:
+            repaired, errors = check_test_case(test_case, default_type)
+            if errors:
+                remaining.append((repaired, errors))
+            else:
+                stats["fixed_by_reask"] += 1
+                valid.append(repaired)
+                yield {"event": "test_case", "data": repaired}
+        failures = remaining + failures[len(retried):]
+
+    stats["dropped"] = len(failures)
+    if failures:
+        logger.warning(f"Dropped {len(failures)} test cases that failed validation")
+
+    final = {key: value for key, value in result.items() if key != "test_cases"}
+    final["test_cases"] = valid
+    final["validation"] = {**stats, "errors": [errors for _, errors in failures]}
+    yield {"event": "complete", "data": final}
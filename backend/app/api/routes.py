@@ -1,36 +1,138 @@
-from fastapi import APIRouter, HTTPException, Depends
+from contextlib import aclosing, contextmanager, nullcontext
+from fastapi import APIRouter, HTTPException, Depends, Header, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
 from app.models import (
+    GenerationOptions,
     TestCaseGenerationRequest,
     TestCaseGenerationResponse,
+    BatchTestCaseGenerationRequest,
+    BatchTestCaseGenerationResponse,
+    BatchItemResult,
+    CachePolicy,
+    RequestPriority,
+    JobStatus,
+    JobSubmitResponse,
+    JobStatusResponse,
+    ManualInput,
     TestCase,
     TestStep,
     TestCasePriority,
     HealthResponse,
 )
-from app.services import JiraService
-from app.agents import TestCaseGeneratorAgent
+from app.services import (
+    AdmissionRejected,
+    JiraService,
+    JobQueue,
+    get_shared_admission_controller,
+    get_shared_jira_service,
+    get_shared_job_queue,
+    get_shared_result_cache,
+    make_cache_key,
+    normalize_issue_key,
+)
+from app.services import tracing
+from app.services.metrics import GENERATION_REQUESTS, JIRA_FETCH_SECONDS, REQUESTS_IN_FLIGHT
+from app.services.single_flight import SingleFlight
+from app.agents.agent_provider import get_shared_agent
+from app.agents.fanout import FanOutGenerator
+from app.agents.session_pool import AgentSessionPool, get_shared_session_pool
 from app.config import get_settings, Settings
+import asyncio
+import hmac
+import json
 import logging
+import time
+
+if TYPE_CHECKING:
+    # Imported lazily at runtime: the generator pulls in claude_agent_sdk
+    from app.agents import TestCaseGeneratorAgent
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+T = TypeVar("T")
+
+# In-flight agent runs keyed by result cache key
+_generation_flights = SingleFlight()
+
 
 def get_jira_service(settings: Settings = Depends(get_settings)) -> JiraService:
-    return JiraService(
-        jira_url=settings.jira_url,
-        email=settings.jira_email,
-        api_token=settings.jira_api_token,
-    )
+    return get_shared_jira_service(settings)
 
 
-def get_agent(settings: Settings = Depends(get_settings), jira_service: JiraService = Depends(get_jira_service)) -> TestCaseGeneratorAgent:
-    return TestCaseGeneratorAgent(
-        api_key=settings.anthropic_api_key,
+async def get_session_pool(settings: Settings = Depends(get_settings)) -> Optional[AgentSessionPool]:
+    if not settings.agent_pool_enabled:
+        return None
+    from app.agents.test_case_generator_agent import create_agent_options
+
+    return await get_shared_session_pool(settings, options_factory=create_agent_options)
+
+
+async def get_agent(
+    settings: Settings = Depends(get_settings),
+    jira_service: JiraService = Depends(get_jira_service),
+    session_pool: Optional[AgentSessionPool] = Depends(get_session_pool),
+) -> "TestCaseGeneratorAgent":
+    return get_shared_agent(settings, jira_service=jira_service, session_pool=session_pool)
+
+
+async def run_generation_job(payload: Dict, report_progress: Callable[[str], None]) -> Dict:
+    """
+    Job queue handler: run one queued TestCaseGenerationRequest.
+    """
+    settings = get_settings()
+    jira_service = get_jira_service(settings)
+    agent = await get_agent(
+        settings=settings,
         jira_service=jira_service,
-        jira_mcp_enabled=settings.enable_jira_mcp
+        session_pool=await get_session_pool(settings),
     )
+    request = TestCaseGenerationRequest(**payload)
+
+    with _request_metrics("job"), tracing.trace("generation_job", endpoint="job"):
+        report_progress("resolving_input")
+        resolved = await _resolve_input(request, jira_service)
+
+        report_progress("generating")
+        # Job workers already bound concurrency, so jobs wait for a run slot instead of being rejected
+        return await _run_generation(agent, request, bounded=False, default_priority=RequestPriority.BULK, **resolved)
+
+
+async def get_job_queue(settings: Settings = Depends(get_settings)) -> JobQueue:
+    return await get_shared_job_queue(settings, handler=run_generation_job)
+
+
+def require_admin_token(
+    x_admin_token: Optional[str] = Header(default=None),
+    settings: Settings = Depends(get_settings),
+) -> None:
+    """
+    Admin endpoints are disabled unless ADMIN_TOKEN is set; then every call
+    must send it in the X-Admin-Token header.
+    """
+    if not settings.admin_token:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled; set ADMIN_TOKEN to enable them")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode(), settings.admin_token.encode()):
+        raise HTTPException(status_code=401, detail="Invalid or missing X-Admin-Token")
+
+
+@router.post("/admin/reload-settings", dependencies=[Depends(require_admin_token)])
+async def reload_settings():
+    """
+    Re-read settings from the environment/.env and rebuild the shared JIRA
+    client and agent if their settings changed. Agent pool sizing still
+    requires a restart.
+    """
+    get_settings.cache_clear()
+    settings = get_settings()
+    jira_service = get_jira_service(settings)
+    agent = await get_agent(settings, jira_service, await get_session_pool(settings))
+    await asyncio.to_thread(tracing.configure, settings.tracing_enabled, settings.trace_export_path)
+    logger.info("Settings reloaded")
+    return {"status": "reloaded", "model": agent.model}
 
 
 @router.get("/health", response_model=HealthResponse)
@@ -43,80 +145,603 @@ async def health_check():
     )
 
 
+async def _resolve_input(request: TestCaseGenerationRequest, jira_service: JiraService) -> Dict:
+    """
+    Resolve the feature title, description and acceptance criteria from JIRA or manual input.
+    """
+    if request.jira_issue:
+        # Fetch from JIRA
+        logger.info(f"Fetching JIRA issue: {request.jira_issue.issue_key}")
+        jira_details = await _timed_jira_fetch(
+            "issue", jira_service.get_issue_details_async(request.jira_issue.issue_key)
+        )
+        return _input_from_jira(jira_details)
+
+    if request.manual_input:
+        # Use manual input
+        logger.info("Using manual input for test case generation")
+        return _input_from_manual(request.manual_input)
+
+    raise HTTPException(
+        status_code=400,
+        detail="Either jira_issue or manual_input must be provided"
+    )
+
+
+async def _timed_jira_fetch(operation: str, fetch: Awaitable[T]) -> T:
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        with tracing.span("jira_fetch", operation=operation):
+            result = await fetch
+        outcome = "success"
+        return result
+    finally:
+        JIRA_FETCH_SECONDS.observe(time.perf_counter() - started, operation=operation, outcome=outcome)
+
+
+@contextmanager
+def _request_metrics(endpoint: str) -> Iterator[Dict[str, str]]:
+    """
+    Track a generation request as in flight and count it by outcome.
+    Set "outcome" in the yielded dict to report something other than success.
+    """
+    outcome = "error"
+    status: Dict[str, str] = {}
+    with REQUESTS_IN_FLIGHT.track(endpoint=endpoint):
+        try:
+            yield status
+            outcome = status.get("outcome", "success")
+        except AdmissionRejected:
+            outcome = "rejected"
+            raise
+        except HTTPException as e:
+            if e.status_code == 429:
+                outcome = "rejected"
+            elif e.status_code < 500:
+                outcome = "client_error"
+            raise
+        finally:
+            GENERATION_REQUESTS.inc(endpoint=endpoint, outcome=outcome)
+
+
+def _input_from_jira(jira_details: Dict) -> Dict:
+    return {
+        "title": jira_details["summary"],
+        "description": jira_details["description"],
+        "acceptance_criteria": jira_details["acceptance_criteria"],
+        "issue_key": jira_details["key"],
+    }
+
+
+def _input_from_manual(manual_input: ManualInput) -> Dict:
+    return {
+        "title": manual_input.title,
+        "description": manual_input.description,
+        "acceptance_criteria": manual_input.acceptance_criteria,
+        "issue_key": None,
+    }
+
+
+async def _run_generation(
+    agent: "TestCaseGeneratorAgent",
+    options: GenerationOptions,
+    title: str,
+    description: str,
+    acceptance_criteria: List[str],
+    issue_key: Optional[str],
+    bounded: bool = True,
+    default_priority: RequestPriority = RequestPriority.INTERACTIVE,
+) -> Dict:
+    """
+    Run the agent for one resolved input and assemble the API response.
+    Identical inputs are served from the result cache unless the request opts out.
+    Agent runs go through admission control in the request's priority lane
+    (default_priority when it sets none); `bounded=False` waits for a slot
+    instead of being rejected when the queue is full.
+    """
+    lane = (options.priority or default_priority).value
+    agent = _with_fanout(agent, options, acceptance_criteria, lane=lane, bounded=bounded)
+    cache_key = _cache_key(agent, options, title, description, acceptance_criteria, issue_key)
+    result, cache_info = await _cache_lookup(options, cache_key)
+    if result is not None:
+        logger.info(f"Result cache hit for: {title}")
+        return _build_response(options, title, issue_key, result, {"cache": cache_info, "coalesced": False})
+
+    # Generate test cases using the agentic loop (async)
+    async def run_agent() -> Tuple[Dict, Optional[str]]:
+        leader_trace = tracing.current_trace()
+        async with _request_slot(agent, lane, bounded):
+            logger.info(f"Starting agentic loop for: {title}")
+            result = await agent.generate_test_cases(
+                title=title,
+                description=description,
+                acceptance_criteria=acceptance_criteria,
+                test_types=[t.value for t in options.test_types],
+                include_edge_cases=options.include_edge_cases,
+                include_negative_tests=options.include_negative_tests,
+                jira_issue_key=issue_key,
+                mode=options.mode.value,
+            )
+        # Stored by the shared run, so the result is cached even if the request that started it is gone
+        await _cache_store(options, cache_key, result)
+        return result, leader_trace.trace_id if leader_trace is not None else None
+
+    # Concurrent requests with the same effective input share one agent run
+    (result, leader_trace_id), coalesced = await _generation_flights.do(cache_key, run_agent)
+    current_trace = tracing.current_trace()
+    if coalesced and current_trace is not None:
+        # The agent and JIRA spans of a joined run live in the leader's trace
+        current_trace.root.set(coalesced=True, leader_trace_id=leader_trace_id)
+
+    response = _build_response(options, title, issue_key, result, {"cache": cache_info, "coalesced": coalesced})
+    logger.info(f"Successfully generated {len(response['test_cases'])} test cases")
+    return response
+
+
+def _with_fanout(
+    agent: "TestCaseGeneratorAgent",
+    options: GenerationOptions,
+    acceptance_criteria: List[str],
+    lane: str = RequestPriority.INTERACTIVE.value,
+    bounded: bool = True,
+):
+    """
+    Wrap the agent in a FanOutGenerator when the request asks for sharding
+    and has more acceptance criteria than fit in one shard. Each shard run
+    then takes its own admission slot in `lane`.
+    """
+    if not options.shard_size or len(acceptance_criteria) <= options.shard_size:
+        return agent
+    settings = get_settings()
+    return FanOutGenerator(
+        agent,
+        shard_size=options.shard_size,
+        max_concurrency=settings.fanout_max_concurrency,
+        similarity_threshold=settings.fanout_similarity_threshold,
+        admission=get_shared_admission_controller(settings),
+        lane=lane,
+        bounded=bounded,
+    )
+
+
+def _request_slot(agent: "TestCaseGeneratorAgent", lane: str, bounded: bool):
+    """
+    Admission slot for a whole generation run. Fanned-out runs take one per
+    shard inside FanOutGenerator instead, so they get none here.
+    """
+    if isinstance(agent, FanOutGenerator):
+        return nullcontext()
+    return get_shared_admission_controller(get_settings()).slot(lane=lane, bounded=bounded)
+
+
+def _cache_key(
+    agent: "TestCaseGeneratorAgent",
+    options: GenerationOptions,
+    title: str,
+    description: str,
+    acceptance_criteria: List[str],
+    issue_key: Optional[str],
+) -> str:
+    # The issue key is part of the prompt (it drives project-specific skills)
+    return make_cache_key(
+        title=title,
+        description=description,
+        acceptance_criteria=acceptance_criteria,
+        test_types=[t.value for t in options.test_types],
+        include_edge_cases=options.include_edge_cases,
+        include_negative_tests=options.include_negative_tests,
+        model=agent.model,
+        prompt_version=agent.PROMPT_VERSION,
+        issue_key=issue_key,
+        mode=options.mode.value,
+    )
+
+
+async def _cache_lookup(options: GenerationOptions, cache_key: str) -> Tuple[Optional[Dict], Dict]:
+    """
+    Look up a cached result according to the request's cache policy.
+    Returns (result or None, cache info for generation_metadata).
+    """
+    cache_info = {"key": cache_key[:16]}
+    result_cache = get_shared_result_cache(get_settings())
+    if result_cache is None:
+        return None, {**cache_info, "status": "disabled"}
+    if options.cache_policy == CachePolicy.BYPASS:
+        return None, {**cache_info, "status": "bypass"}
+    if options.cache_policy == CachePolicy.REFRESH:
+        return None, {**cache_info, "status": "refresh"}
+
+    result, tier = await result_cache.get(cache_key)
+    if result is None:
+        return None, {**cache_info, "status": "miss"}
+    return result, {**cache_info, "status": "hit", "tier": tier}
+
+
+async def _cache_store(options: GenerationOptions, cache_key: str, result: Dict) -> None:
+    """
+    Cache a successful result. Empty or unparseable results are never cached.
+    """
+    result_cache = get_shared_result_cache(get_settings())
+    if result_cache is None or options.cache_policy == CachePolicy.BYPASS:
+        return
+    if result.get("test_cases") and "error" not in result:
+        # Token usage belongs to the run that produced the result, not to later cache hits
+        cached = {key: value for key, value in result.items() if key != "usage"}
+        await result_cache.put(cache_key, cached)
+
+
+def _build_response(
+    options: GenerationOptions,
+    title: str,
+    issue_key: Optional[str],
+    result: Dict,
+    extra_metadata: Optional[Dict] = None,
+) -> Dict:
+    """
+    Assemble the API response from the agent's parsed result.
+    """
+    # Return raw test cases as-is to preserve skill-specific formats
+    # Skills may return different structures (PP format, XSP format, etc.)
+
+    test_cases_raw = result.get("test_cases", [])
+
+    response = {
+        "issue_key": issue_key,
+        "feature_title": title,
+        "test_cases": test_cases_raw,  # Raw format from agent/skill
+        "coverage_summary": result.get("coverage_summary", ""),
+        "generation_metadata": {
+            "test_types_requested": [t.value for t in options.test_types],
+            "include_edge_cases": options.include_edge_cases,
+            "include_negative_tests": options.include_negative_tests,
+            "mode": options.mode.value,
+            "total_test_cases_generated": len(test_cases_raw),
+        }
+    }
+    if result.get("usage"):
+        response["generation_metadata"]["usage"] = result["usage"]
+    if result.get("fanout"):
+        response["generation_metadata"]["fanout"] = result["fanout"]
+    if result.get("validation"):
+        response["generation_metadata"]["validation"] = result["validation"]
+    if extra_metadata:
+        response["generation_metadata"].update(extra_metadata)
+    current_trace = tracing.current_trace()
+    if current_trace is not None:
+        response["generation_metadata"]["trace_id"] = current_trace.trace_id
+        response["generation_metadata"]["timings"] = current_trace.timings()
+    return response
+
+
+def _too_busy(error: AdmissionRejected) -> HTTPException:
+    return HTTPException(
+        status_code=429,
+        detail=str(error),
+        headers={"Retry-After": str(int(error.retry_after))},
+    )
+
+
+def _format_sse(event: Dict) -> str:
+    return f"event: {event['event']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+
+
 @router.post("/generate-test-cases")
 async def generate_test_cases(
     request: TestCaseGenerationRequest,
+    response: Response,
     jira_service: JiraService = Depends(get_jira_service),
-    agent: TestCaseGeneratorAgent = Depends(get_agent),
+    agent: "TestCaseGeneratorAgent" = Depends(get_agent),
 ):
     """
     Generate test cases from JIRA issue or manual input using Claude Agent SDK.
     The agent will autonomously run an agentic loop to generate comprehensive test cases.
     """
+    with _request_metrics("generate"), tracing.trace("generate_test_cases", endpoint="generate") as trace:
+        try:
+            resolved = await _resolve_input(request, jira_service)
+            result = await _run_generation(agent, request, **resolved)
+            response.headers["Server-Timing"] = trace.server_timing()
+            return result
+
+        except HTTPException:
+            raise
+        except AdmissionRejected as e:
+            logger.warning(f"Rejected generate_test_cases: {str(e)}")
+            raise _too_busy(e)
+        except Exception as e:
+            logger.error(f"Error in generate_test_cases: {str(e)}")
+            raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/generate-test-cases/stream")
+async def generate_test_cases_stream(
+    request: TestCaseGenerationRequest,
+    http_request: Request,
+    jira_service: JiraService = Depends(get_jira_service),
+    agent: "TestCaseGeneratorAgent" = Depends(get_agent),
+):
+    """
+    Generate test cases and stream progress as Server-Sent Events.
+
+    Emits `progress` events while the agent works, a `test_case` event for each
+    test case as soon as it is parsed, then a `complete` event carrying the same
+    body /generate-test-cases returns (or an `error` event).
+    """
+    # The trace outlives this handler: event_source finishes it once the stream ends
+    trace = tracing.start_trace("generate_test_cases_stream", endpoint="stream")
     try:
-        # Determine input source
-        if request.jira_issue:
-            # Fetch from JIRA
-            logger.info(f"Fetching JIRA issue: {request.jira_issue.issue_key}")
-            jira_details = jira_service.get_issue_details(request.jira_issue.issue_key)
-
-            title = jira_details["summary"]
-            description = jira_details["description"]
-            acceptance_criteria = jira_details["acceptance_criteria"]
-            issue_key = jira_details["key"]
-
-        elif request.manual_input:
-            # Use manual input
-            logger.info("Using manual input for test case generation")
-            title = request.manual_input.title
-            description = request.manual_input.description
-            acceptance_criteria = request.manual_input.acceptance_criteria
-            issue_key = None
+        with tracing.activate(trace.root):
+            resolved = await _resolve_input(request, jira_service)
+
+            lane = (request.priority or RequestPriority.INTERACTIVE).value
+            agent = _with_fanout(agent, request, resolved["acceptance_criteria"], lane=lane)
+            cache_key = _cache_key(
+                agent,
+                request,
+                resolved["title"],
+                resolved["description"],
+                resolved["acceptance_criteria"],
+                resolved["issue_key"],
+            )
+            cached, cache_info = await _cache_lookup(request, cache_key)
+
+            # Take the run slot before the response starts so overload is still a plain 429.
+            # A fanned-out run takes one slot per shard as the shards start instead.
+            admission = get_shared_admission_controller(get_settings())
+            holds_slot = cached is None and not isinstance(agent, FanOutGenerator)
+            if holds_slot:
+                try:
+                    await admission.acquire(lane=lane)
+                except AdmissionRejected as e:
+                    logger.warning(f"Rejected generate_test_cases_stream: {str(e)}")
+                    GENERATION_REQUESTS.inc(endpoint="stream", outcome="rejected")
+                    raise _too_busy(e)
+    except HTTPException as e:
+        trace.root.fail(e)
+        tracing.finish_trace(trace)
+        raise
+    except Exception as e:
+        logger.error(f"Error in generate_test_cases_stream: {str(e)}")
+        trace.root.fail(e)
+        tracing.finish_trace(trace)
+        raise HTTPException(status_code=500, detail=str(e))
+
+    # In flight from here until finish_stream, whether or not the body is ever read
+    REQUESTS_IN_FLIGHT.inc(endpoint="stream")
+    finished = False
+
+    def finish_stream(outcome: str = "disconnected", run_seconds: Optional[float] = None) -> None:
+        """
+        Release the run slot and close the trace, once. event_source calls this when
+        the stream ends; the response's background task covers a body never iterated.
+        """
+        nonlocal finished
+        if finished:
+            return
+        finished = True
+        REQUESTS_IN_FLIGHT.dec(endpoint="stream")
+        GENERATION_REQUESTS.inc(endpoint="stream", outcome=outcome)
+        if holds_slot:
+            admission.release(run_seconds)
+        trace.root.set(outcome=outcome)
+        tracing.finish_trace(trace)
+
+    async def cached_events():
+        for test_case in cached.get("test_cases", []):
+            yield {"event": "test_case", "data": test_case}
+        yield {"event": "complete", "data": cached}
 
+    async def event_source():
+        started = time.monotonic()
+        if cached is not None:
+            events = cached_events()
         else:
-            raise HTTPException(
-                status_code=400,
-                detail="Either jira_issue or manual_input must be provided"
+            events = agent.stream_test_cases(
+                title=resolved["title"],
+                description=resolved["description"],
+                acceptance_criteria=resolved["acceptance_criteria"],
+                test_types=[t.value for t in request.test_types],
+                include_edge_cases=request.include_edge_cases,
+                include_negative_tests=request.include_negative_tests,
+                jira_issue_key=resolved["issue_key"],
+                mode=request.mode.value,
             )
+        outcome = "error"
+        try:
+            with tracing.activate(trace.root):
+                async with aclosing(events):
+                    async for event in events:
+                        if await http_request.is_disconnected():
+                            logger.info("Client disconnected; stopping agent stream")
+                            outcome = "disconnected"
+                            return
+                        if event["event"] == "complete":
+                            if cached is None:
+                                await _cache_store(request, cache_key, event["data"])
+                            event = {
+                                "event": "complete",
+                                "data": _build_response(
+                                    request, resolved["title"], resolved["issue_key"], event["data"], {"cache": cache_info}
+                                ),
+                            }
+                            outcome = "success"
+                        yield _format_sse(event)
+        except Exception as e:
+            logger.error(f"Error in generate_test_cases_stream: {str(e)}")
+            trace.root.fail(e)
+            yield _format_sse({"event": "error", "data": {"detail": str(e)}})
+        finally:
+            finish_stream(outcome, time.monotonic() - started)
+
+    # Headers go out before the agent runs, so Server-Timing covers input resolution only;
+    # the complete event carries the full breakdown in generation_metadata.timings
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+            "Server-Timing": trace.server_timing(),
+        },
+        background=BackgroundTask(finish_stream),
+    )
+
+
+@router.post("/generate-test-cases/batch", response_model=BatchTestCaseGenerationResponse)
+async def generate_test_cases_batch(
+    request: BatchTestCaseGenerationRequest,
+    settings: Settings = Depends(get_settings),
+    jira_service: JiraService = Depends(get_jira_service),
+    agent: "TestCaseGeneratorAgent" = Depends(get_agent),
+):
+    """
+    Generate test cases for many JIRA issues and/or manual inputs in one call.
+    Items run concurrently up to BATCH_MAX_PARALLELISM; a failing item is
+    reported in its own result and does not fail the batch.
+    """
+    item_count = len(request.jira_issue_keys) + len(request.manual_inputs)
+    if item_count == 0:
+        raise HTTPException(
+            status_code=400,
+            detail="At least one of jira_issue_keys or manual_inputs must be provided"
+        )
+    if item_count > settings.batch_max_items:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch has {item_count} items; the maximum is {settings.batch_max_items}"
+        )
+    invalid_keys = []
+    for issue_key in request.jira_issue_keys:
+        try:
+            normalize_issue_key(issue_key)
+        except ValueError:
+            invalid_keys.append(issue_key)
+    if invalid_keys:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid JIRA issue keys: {', '.join(repr(key) for key in invalid_keys)}"
+        )
+
+    # Fetch every JIRA issue up front with bulk JQL searches
+    jira_details: Dict[str, Dict] = {}
+    jira_error: Optional[str] = None
+    if request.jira_issue_keys:
+        try:
+            jira_details = await _timed_jira_fetch("bulk", jira_service.get_issues_details_async(request.jira_issue_keys))
+        except Exception as e:
+            logger.error(f"Error fetching JIRA issues for batch: {str(e)}")
+            jira_error = str(e)
+
+    items: List[BatchItemResult] = []
+    inputs: List[Optional[Dict]] = []
+    for issue_key in request.jira_issue_keys:
+        details = jira_details.get(issue_key.strip().upper())
+        items.append(BatchItemResult(index=len(items), issue_key=issue_key, status="pending"))
+        if details is None:
+            items[-1].status = "error"
+            items[-1].error = jira_error or f"Failed to fetch JIRA issue: {issue_key}"
+            inputs.append(None)
+        else:
+            inputs.append(_input_from_jira(details))
+    for manual_input in request.manual_inputs:
+        items.append(BatchItemResult(index=len(items), feature_title=manual_input.title, status="pending"))
+        inputs.append(_input_from_manual(manual_input))
+
+    semaphore = asyncio.Semaphore(settings.batch_max_parallelism)
+
+    async def run_item(item: BatchItemResult, resolved: Dict) -> None:
+        item.feature_title = resolved["title"]
+        async with semaphore:
+            try:
+                # Each item is its own generation request with its own trace
+                with tracing.trace("batch_item", endpoint="batch", index=item.index):
+                    # The batch is already bounded by BATCH_MAX_PARALLELISM, so items queue for a slot
+                    item.result = await _run_generation(
+                        agent, request, bounded=False, default_priority=RequestPriority.BULK, **resolved
+                    )
+                item.status = "success"
+            except Exception as e:
+                logger.error(f"Batch item {item.index} failed: {str(e)}")
+                item.status = "error"
+                item.error = str(e)
+
+    with _request_metrics("batch") as status:
+        await asyncio.gather(*[
+            run_item(item, resolved)
+            for item, resolved in zip(items, inputs)
+            if resolved is not None
+        ])
+        # run_item reports failures per item, so the batch outcome comes from the items
+        succeeded = sum(1 for item in items if item.status == "success")
+        if succeeded == 0:
+            status["outcome"] = "error"
+        elif succeeded < len(items):
+            status["outcome"] = "partial"
+
+    return BatchTestCaseGenerationResponse(
+        total=len(items),
+        succeeded=succeeded,
+        failed=len(items) - succeeded,
+        results=items,
+    )
 
-        # Generate test cases using the agentic loop (async)
-        logger.info(f"Starting agentic loop for: {title}")
-        test_types = [t.value for t in request.test_types]
-
-        result = await agent.generate_test_cases(
-            title=title,
-            description=description,
-            acceptance_criteria=acceptance_criteria,
-            test_types=test_types,
-            include_edge_cases=request.include_edge_cases,
-            include_negative_tests=request.include_negative_tests,
-            jira_issue_key=issue_key,
+
+@router.post("/jobs", response_model=JobSubmitResponse, status_code=202)
+async def submit_generation_job(
+    request: TestCaseGenerationRequest,
+    job_queue: JobQueue = Depends(get_job_queue),
+):
+    """
+    Queue a test case generation request and return immediately with a job id.
+    Poll GET /jobs/{job_id} for progress and GET /jobs/{job_id}/result for the output.
+    """
+    if not request.jira_issue and not request.manual_input:
+        raise HTTPException(
+            status_code=400,
+            detail="Either jira_issue or manual_input must be provided"
         )
 
-        # Return raw test cases as-is to preserve skill-specific formats
-        # Skills may return different structures (PP format, XSP format, etc.)
-
-        test_cases_raw = result.get("test_cases", [])
-
-        response = {
-            "issue_key": issue_key,
-            "feature_title": title,
-            "test_cases": test_cases_raw,  # Raw format from agent/skill
-            "coverage_summary": result.get("coverage_summary", ""),
-            "generation_metadata": {
-                "test_types_requested": test_types,
-                "include_edge_cases": request.include_edge_cases,
-                "include_negative_tests": request.include_negative_tests,
-                "total_test_cases_generated": len(test_cases_raw),
-            }
-        }
+    job = await job_queue.submit(request.model_dump(mode="json"))
+    logger.info(f"Queued generation job {job['job_id']}")
+    return JobSubmitResponse(
+        job_id=job["job_id"],
+        status=job["status"],
+        status_url=f"/api/v1/jobs/{job['job_id']}",
+        result_url=f"/api/v1/jobs/{job['job_id']}/result",
+    )
 
-        logger.info(f"Successfully generated {len(test_cases_raw)} test cases")
-        return response
 
-    except Exception as e:
-        logger.error(f"Error in generate_test_cases: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_generation_job(
+    job_id: str,
+    job_queue: JobQueue = Depends(get_job_queue),
+):
+    """
+    Job status and progress.
+    """
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return JobStatusResponse(**job)
+
+
+@router.get("/jobs/{job_id}/result")
+async def get_generation_job_result(
+    job_id: str,
+    job_queue: JobQueue = Depends(get_job_queue),
+):
+    """
+    Result of a finished job. Returns 409 while the job is still queued or running.
+    """
+    job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    if job["status"] == JobStatus.FAILED:
+        raise HTTPException(status_code=500, detail=job["error"])
+    if job["status"] != JobStatus.SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']}")
+    return job["result"]
 
 
 @router.get("/jira/issue/{issue_key}")
@@ -128,8 +753,26 @@ async def get_jira_issue(
     Fetch JIRA issue details (for debugging/testing).
     """
     try:
-        details = jira_service.get_issue_details(issue_key)
+        details = await _timed_jira_fetch("issue", jira_service.get_issue_details_async(issue_key))
         return details
     except Exception as e:
         logger.error(f"Error fetching JIRA issue: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/jira/cache/stats")
+async def get_jira_cache_stats(
+    jira_service: JiraService = Depends(get_jira_service),
+):
+    """
+    JIRA issue cache hit/miss counters.
+    """
+    return jira_service.cache_stats()
+
+
+@router.get("/admission/stats")
+async def get_admission_stats(settings: Settings = Depends(get_settings)):
+    """
+    Agent run slots in use, queue depth, rejections and queue wait percentiles.
+    """
+    return get_shared_admission_controller(settings).stats()
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
 
 
 class Settings(BaseSettings):
@@ -10,6 +11,74 @@ class Settings(BaseSettings):
     service_port: int = 8000
     log_level: str = "INFO"
     enable_jira_mcp: bool = False  # Use JIRA MCP server instead of direct API
+    admin_token: Optional[str] = None  # Required in X-Admin-Token for /admin endpoints; unset disables them
+
+    generation_engine: str = "agent_sdk"  # agent_sdk (Claude Agent SDK loop) or direct_api (Messages API)
+
+    # Anthropic HTTP connection pool (direct_api engine)
+    anthropic_max_connections: int = 20
+    anthropic_max_keepalive_connections: int = 10
+    anthropic_keepalive_expiry: float = 30.0  # Seconds an idle connection is kept open
+    anthropic_http2: bool = True  # Used only when the h2 package is installed
+
+    # JIRA client connection pool
+    jira_pool_size: int = 10  # Max pooled HTTP connections shared by all requests
+    jira_keep_alive: bool = True  # Reuse connections between requests
+    jira_timeout: float = 30.0  # Per-request timeout in seconds
+    jira_max_workers: int = 10  # Threads used to run blocking JIRA calls off the event loop
+
+    # JIRA issue cache
+    jira_cache_enabled: bool = True
+    jira_cache_max_entries: int = 512  # LRU capacity
+    jira_cache_ttl_seconds: float = 300.0  # Served without revalidation while younger than this
+
+    # Import SDKs and build shared clients in the background after startup (otherwise on first use)
+    warm_up_on_startup: bool = True
+
+    # Warm pool of persistent agent sessions (instead of one CLI process per request)
+    agent_pool_enabled: bool = False
+    agent_pool_min_size: int = 1  # Sessions kept warm
+    agent_pool_max_size: int = 4  # Hard cap on concurrent CLI processes
+    agent_pool_max_uses: int = 20  # Requests served before a session is recycled
+    agent_pool_acquire_timeout: float = 60.0  # Seconds to wait for a free session
+    agent_pool_probe_after: float = 60.0  # Idle seconds after which a session is probed before reuse
+
+    # Agent session record/replay (agent_sdk engine)
+    agent_record_dir: Optional[str] = None  # Write every agent run's message stream here as JSONL
+    agent_replay_dir: Optional[str] = None  # Serve recorded sessions from here instead of calling the model
+    agent_replay_speed: float = 1.0  # 1.0 replays at recorded speed; 0 replays as fast as possible
+
+    # Generation result cache
+    result_cache_enabled: bool = True
+    result_cache_max_entries: int = 256  # In-memory LRU capacity
+    result_cache_ttl_seconds: float = 86400.0
+    result_cache_db_path: Optional[str] = None  # Set to enable the SQLite tier, e.g. data/results.db
+    result_cache_max_disk_entries: int = 10000  # SQLite tier capacity; oldest entries are pruned first
+
+    # Admission control for agent runs
+    admission_max_concurrent: int = 8  # Agent runs allowed at once across all requests
+    admission_max_queue: int = 32  # Requests allowed to wait for a run slot; beyond this they get 429
+    admission_max_wait_seconds: float = 30.0  # Longest a request waits for a run slot before 429
+    admission_interactive_weight: int = 4  # Share of freed slots given to the interactive lane...
+    admission_bulk_weight: int = 1  # ...relative to the bulk lane (batch, jobs, CI)
+
+    # Batch generation
+    batch_max_parallelism: int = 4  # Concurrent agent runs per batch request
+    batch_max_items: int = 100
+
+    # Fan-out over acceptance criteria shards (requests opt in with shard_size)
+    fanout_max_concurrency: int = 4  # Concurrent shard runs per request
+    fanout_similarity_threshold: float = 0.9  # Title/steps similarity above which test cases count as duplicates
+
+    # Request tracing (spans are always recorded for timings; this controls the file export)
+    tracing_enabled: bool = False
+    trace_export_path: str = "data/traces.jsonl"  # JSONL file, one span per line with OTLP field names
+
+    # Background generation jobs
+    job_db_path: str = "data/jobs.db"  # SQLite file holding queued/finished jobs
+    job_workers: int = 2  # Concurrent background agent runs
+    job_retention_hours: float = 24.0  # Finished jobs older than this are purged at startup
+    job_max_attempts: int = 3  # Jobs interrupted this many times are failed instead of resumed
 
     class Config:
         env_file = ".env"
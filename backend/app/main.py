@@ -1,8 +1,24 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.api import router
+from app.api.routes import get_agent, get_job_queue, get_session_pool
+from app.agents.agent_provider import close_shared_agent, preload_generator_modules
+from app.agents.session_pool import close_shared_session_pool
 from app.config import get_settings
+from app.services import (
+    metrics,
+    tracing,
+    get_shared_jira_service,
+    close_shared_jira_service,
+    close_shared_job_queue,
+    close_shared_result_cache,
+    get_shared_result_cache,
+)
+from typing import Set
+import asyncio
 import logging
+import time
 
 # Configure logging
 logging.basicConfig(
@@ -37,11 +53,89 @@ async def startup_event():
     settings = get_settings()
     logger.info(f"Starting Test Case Generator Service on port {settings.service_port}")
     logger.info(f"Log level: {settings.log_level}")
+    tracing.configure(settings.tracing_enabled, settings.trace_export_path)
+
+    # Heavy SDK imports and client setup happen after startup returns, so the
+    # server is already answering /health while it warms up. Without warm-up
+    # everything is built on first use.
+    if settings.warm_up_on_startup:
+        task = asyncio.create_task(_warm_up(settings))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+    else:
+        # Start background job workers and resume any work queued before a restart
+        await get_job_queue(settings)
+
+
+# Strong references to startup tasks so they are not garbage collected mid-run
+_background_tasks: Set[asyncio.Task] = set()
+
+
+async def _warm_up(settings) -> None:
+    started = time.perf_counter()
+
+    # Import the generator and JIRA SDKs on a worker thread; the event loop keeps serving
+    try:
+        await asyncio.to_thread(preload_generator_modules, settings)
+    except Exception as e:
+        logger.warning(f"Could not preload generator modules: {str(e)}")
+
+    # Create the pooled JIRA client once; request handlers share it
+    jira_service = None
+    try:
+        jira_service = await asyncio.to_thread(get_shared_jira_service, settings)
+    except Exception as e:
+        logger.warning(f"JIRA client not initialized at startup: {str(e)}")
+
+    # Open and prune the on-disk result cache before the first lookup needs it
+    result_cache = get_shared_result_cache(settings)
+    if result_cache is not None:
+        await result_cache.open()
+
+    # Pre-start warm agent sessions (no-op unless AGENT_POOL_ENABLED)
+    session_pool = None
+    try:
+        session_pool = await get_session_pool(settings)
+    except Exception as e:
+        logger.warning(f"Agent session pool not started: {str(e)}")
+
+    # Build the shared agent and its MCP tool server once
+    if jira_service is not None:
+        try:
+            await get_agent(settings, jira_service, session_pool)
+        except Exception as e:
+            logger.warning(f"Agent not built during warm-up: {str(e)}")
+
+    # Job workers start last: a job resumed from before a restart would
+    # otherwise import the agent SDK on the event loop
+    try:
+        await get_job_queue(settings)
+    except Exception as e:
+        logger.error(f"Job queue not started: {str(e)}")
+
+    logger.info(f"Warm-up finished in {time.perf_counter() - started:.2f}s")
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Shutting down Test Case Generator Service")
+    for task in list(_background_tasks):
+        task.cancel()
+    await close_shared_job_queue()
+    await close_shared_session_pool()
+    await close_shared_agent()
+    close_shared_jira_service()
+    close_shared_result_cache()
+    # Flushes spans still queued for the JSONL exporter
+    await asyncio.to_thread(tracing.configure, False)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    Prometheus text exposition of the service metrics.
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 
 @app.get("/")
@@ -53,7 +147,13 @@ async def root():
         "endpoints": {
             "health": "/api/v1/health",
             "generate_test_cases": "/api/v1/generate-test-cases",
+            "generate_test_cases_stream": "/api/v1/generate-test-cases/stream",
+            "generate_test_cases_batch": "/api/v1/generate-test-cases/batch",
+            "submit_job": "/api/v1/jobs",
+            "job_status": "/api/v1/jobs/{job_id}",
+            "job_result": "/api/v1/jobs/{job_id}/result",
             "get_jira_issue": "/api/v1/jira/issue/{issue_key}",
+            "metrics": "/metrics",
             "docs": "/docs",
         }
     }
@@ -1,22 +1,42 @@
 from .schemas import (
+    GenerationOptions,
     TestCaseGenerationRequest,
     TestCaseGenerationResponse,
+    BatchTestCaseGenerationRequest,
+    BatchTestCaseGenerationResponse,
+    BatchItemResult,
+    JobStatus,
+    JobSubmitResponse,
+    JobStatusResponse,
     TestCase,
     TestStep,
     TestCaseType,
     TestCasePriority,
+    CachePolicy,
+    RequestPriority,
+    GenerationMode,
     JiraIssueInput,
     ManualInput,
     HealthResponse,
 )
 
 __all__ = [
+    "GenerationOptions",
     "TestCaseGenerationRequest",
     "TestCaseGenerationResponse",
+    "BatchTestCaseGenerationRequest",
+    "BatchTestCaseGenerationResponse",
+    "BatchItemResult",
+    "JobStatus",
+    "JobSubmitResponse",
+    "JobStatusResponse",
     "TestCase",
     "TestStep",
     "TestCaseType",
     "TestCasePriority",
+    "CachePolicy",
+    "RequestPriority",
+    "GenerationMode",
     "JiraIssueInput",
     "ManualInput",
     "HealthResponse",
@@ -17,6 +17,22 @@ class TestCasePriority(str, Enum):
     LOW = "low"
 
 
+class CachePolicy(str, Enum):
+    USE = "use"  # Serve from the result cache when possible
+    REFRESH = "refresh"  # Skip the lookup but store the new result
+    BYPASS = "bypass"  # Neither read nor write the cache
+
+
+class GenerationMode(str, Enum):
+    AGENTIC = "agentic"  # Agent loop with validation tools and skills
+    FAST = "fast"  # Single generation turn, validated and repaired locally
+
+
+class RequestPriority(str, Enum):
+    INTERACTIVE = "interactive"  # A person is waiting on the result
+    BULK = "bulk"  # Batch, CI and background generation
+
+
 class JiraIssueInput(BaseModel):
     issue_key: str = Field(..., description="JIRA issue key (e.g., PROJ-123)")
 
@@ -27,15 +43,34 @@ class ManualInput(BaseModel):
     acceptance_criteria: List[str] = Field(..., description="List of acceptance criteria")
 
 
-class TestCaseGenerationRequest(BaseModel):
-    jira_issue: Optional[JiraIssueInput] = None
-    manual_input: Optional[ManualInput] = None
+class GenerationOptions(BaseModel):
     test_types: List[TestCaseType] = Field(
         default=[TestCaseType.FUNCTIONAL],
         description="Types of test cases to generate"
     )
     include_edge_cases: bool = Field(default=True, description="Include edge case scenarios")
     include_negative_tests: bool = Field(default=True, description="Include negative test scenarios")
+    cache_policy: CachePolicy = Field(default=CachePolicy.USE, description="Result cache behavior")
+    shard_size: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Split acceptance criteria into shards of this size and generate them in parallel"
+    )
+    mode: GenerationMode = Field(default=GenerationMode.AGENTIC, description="Generation mode")
+    priority: Optional[RequestPriority] = Field(
+        default=None,
+        description="Scheduling lane; defaults to interactive for direct requests and bulk for batch and jobs"
+    )
+
+
+class TestCaseGenerationRequest(GenerationOptions):
+    jira_issue: Optional[JiraIssueInput] = None
+    manual_input: Optional[ManualInput] = None
+
+
+class BatchTestCaseGenerationRequest(GenerationOptions):
+    jira_issue_keys: List[str] = Field(default_factory=list, description="JIRA issue keys to generate for")
+    manual_inputs: List[ManualInput] = Field(default_factory=list, description="Manual inputs to generate for")
 
 
 class TestStep(BaseModel):
@@ -63,6 +98,48 @@ class TestCaseGenerationResponse(BaseModel):
     generation_metadata: dict
 
 
+class BatchItemResult(BaseModel):
+    index: int
+    issue_key: Optional[str] = None
+    feature_title: Optional[str] = None
+    status: str = Field(..., description="success or error")
+    result: Optional[dict] = None
+    error: Optional[str] = None
+
+
+class BatchTestCaseGenerationResponse(BaseModel):
+    total: int
+    succeeded: int
+    failed: int
+    results: List[BatchItemResult]
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class JobSubmitResponse(BaseModel):
+    job_id: str
+    status: JobStatus
+    status_url: str
+    result_url: str
+
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: JobStatus
+    progress: Optional[str] = None
+    error: Optional[str] = None
+    attempts: int = 0
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    queue_depth: int = 0
+
+
 class HealthResponse(BaseModel):
     status: str
     service: str
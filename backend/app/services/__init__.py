@@ -1,3 +1,29 @@
-from .jira_service import JiraService
+from .jira_service import JiraService, get_shared_jira_service, close_shared_jira_service, normalize_issue_key
+from .issue_cache import IssueCache
+from .job_queue import JobQueue, get_shared_job_queue, close_shared_job_queue
+from .result_cache import ResultCache, make_cache_key, get_shared_result_cache, close_shared_result_cache
+from .admission import (
+    AdmissionController,
+    AdmissionRejected,
+    get_shared_admission_controller,
+    reset_shared_admission_controller,
+)
 
-__all__ = ["JiraService"]
+__all__ = [
+    "JiraService",
+    "get_shared_jira_service",
+    "close_shared_jira_service",
+    "normalize_issue_key",
+    "IssueCache",
+    "JobQueue",
+    "get_shared_job_queue",
+    "close_shared_job_queue",
+    "ResultCache",
+    "make_cache_key",
+    "get_shared_result_cache",
+    "close_shared_result_cache",
+    "AdmissionController",
+    "AdmissionRejected",
+    "get_shared_admission_controller",
+    "reset_shared_admission_controller",
+]
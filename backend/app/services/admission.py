@@ -0,0 +1,279 @@
+"""
+Admission control for agent runs.
+
+Every agent run holds one of `max_concurrent` slots. Requests arriving while
+all slots are busy wait in a queue for their priority lane ("interactive" or
+"bulk"). Freed slots are shared between lanes by weight (stride scheduling),
+so interactive requests overtake bulk work without starving it. Bounded
+waiters (direct HTTP requests) are limited to `max_queue` waiting at once and
+`max_wait` seconds each; beyond that they are rejected straight away with an
+AdmissionRejected carrying a Retry-After estimate, so overload turns into
+fast 429s instead of unbounded CLI subprocesses and upstream calls.
+"""
+
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Optional
+import asyncio
+import logging
+import math
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+LANE_INTERACTIVE = "interactive"
+LANE_BULK = "bulk"
+
+DEFAULT_LANE_WEIGHTS = {LANE_INTERACTIVE: 4, LANE_BULK: 1}
+
+# Number of recent queue waits kept per lane for the percentile stats
+_WAIT_SAMPLES = 1000
+
+
+class AdmissionRejected(Exception):
+    """Raised when a run cannot be admitted; retry_after is in seconds."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _percentile(sorted_values, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(math.ceil(fraction * len(sorted_values))) - 1)
+    return sorted_values[max(index, 0)]
+
+
+def _wait_stats(waits) -> Dict:
+    waits = sorted(waits)
+    return {
+        "p50": round(_percentile(waits, 0.50), 3),
+        "p95": round(_percentile(waits, 0.95), 3),
+        "p99": round(_percentile(waits, 0.99), 3),
+        "max": round(waits[-1], 3) if waits else 0.0,
+    }
+
+
+class _Waiter:
+    def __init__(self, future: asyncio.Future, bounded: bool):
+        self.future = future
+        self.bounded = bounded
+
+
+class _Lane:
+    def __init__(self, name: str, weight: int):
+        self.name = name
+        self.weight = max(1, weight)
+        self.waiters: Deque[_Waiter] = deque()
+        self.waits: Deque[float] = deque(maxlen=_WAIT_SAMPLES)
+        # Stride scheduling position; the lane with the lowest pass is served next
+        self.pass_value = 0.0
+        self.admitted = 0
+
+    def stats(self) -> Dict:
+        return {
+            "weight": self.weight,
+            "queued": len(self.waiters),
+            "admitted": self.admitted,
+            "wait_seconds": _wait_stats(self.waits),
+        }
+
+
+class AdmissionController:
+    """
+    Global concurrency limit with weighted priority lanes and a bounded,
+    time-limited wait queue.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 8,
+        max_queue: int = 32,
+        max_wait: float = 30.0,
+        lane_weights: Optional[Dict[str, int]] = None,
+    ):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self.max_wait = max_wait
+
+        self._lanes: Dict[str, _Lane] = {
+            name: _Lane(name, weight)
+            for name, weight in (lane_weights or DEFAULT_LANE_WEIGHTS).items()
+        }
+        self._running = 0
+        self._virtual_time = 0.0
+        # Smoothed run duration, used to estimate Retry-After
+        self._avg_run_seconds: Optional[float] = None
+
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+
+    @asynccontextmanager
+    async def slot(self, lane: str = LANE_INTERACTIVE, bounded: bool = True) -> AsyncIterator[None]:
+        """
+        Hold a run slot for the duration of the block.
+        """
+        await self.acquire(lane=lane, bounded=bounded)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(time.monotonic() - started)
+
+    async def acquire(self, lane: str = LANE_INTERACTIVE, bounded: bool = True) -> None:
+        """
+        Take a run slot, waiting in the lane's queue if needed. Unbounded
+        callers (background work that is already rate limited) skip the
+        queue size and wait limits.
+        """
+        queue = self._lane(lane)
+        if self._running < self.max_concurrent and not self._queued():
+            self._running += 1
+            queue.admitted += 1
+            queue.waits.append(0.0)
+            return
+
+        if bounded and self._bounded_waiting() >= self.max_queue:
+            self.rejected_queue_full += 1
+            raise AdmissionRejected(
+                f"Generation queue is full ({self._queued()} waiting)",
+                retry_after=self.retry_after(),
+            )
+
+        if not queue.waiters:
+            # A lane that was idle does not get credit for the time it was idle
+            queue.pass_value = max(queue.pass_value, self._virtual_time)
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), bounded)
+        queue.waiters.append(waiter)
+        queued_at = time.monotonic()
+        try:
+            if bounded:
+                await asyncio.wait_for(asyncio.shield(waiter.future), timeout=self.max_wait)
+            else:
+                await waiter.future
+        except asyncio.TimeoutError:
+            if not self._abandon(queue, waiter):
+                queue.waits.append(time.monotonic() - queued_at)
+                return
+            self.rejected_timeout += 1
+            raise AdmissionRejected(
+                f"No generation capacity within {self.max_wait}s",
+                retry_after=self.retry_after(),
+            )
+        except asyncio.CancelledError:
+            if not self._abandon(queue, waiter):
+                # The slot was handed over just as we were cancelled; pass it on
+                self.release()
+            raise
+        queue.waits.append(time.monotonic() - queued_at)
+
+    def release(self, run_seconds: Optional[float] = None) -> None:
+        """
+        Return a slot and hand it to the next waiter by lane weight.
+        """
+        if run_seconds is not None:
+            if self._avg_run_seconds is None:
+                self._avg_run_seconds = run_seconds
+            else:
+                self._avg_run_seconds = 0.8 * self._avg_run_seconds + 0.2 * run_seconds
+
+        self._running -= 1
+        while True:
+            lanes = [lane for lane in self._lanes.values() if lane.waiters]
+            if not lanes:
+                return
+            lane = min(lanes, key=lambda candidate: (candidate.pass_value, -candidate.weight))
+            waiter = lane.waiters.popleft()
+            if waiter.future.done():
+                continue
+            self._virtual_time = lane.pass_value
+            lane.pass_value += 1.0 / lane.weight
+            lane.admitted += 1
+            self._running += 1
+            waiter.future.set_result(True)
+            return
+
+    def retry_after(self) -> float:
+        """
+        Rough seconds until a slot frees up for a new request.
+        """
+        avg_run = self._avg_run_seconds or 30.0
+        rounds = (self._queued() + 1) / self.max_concurrent
+        return max(1.0, math.ceil(avg_run * rounds))
+
+    def stats(self) -> Dict:
+        all_waits = [wait for lane in self._lanes.values() for wait in lane.waits]
+        return {
+            "running": self._running,
+            "queued": self._queued(),
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "max_wait_seconds": self.max_wait,
+            "admitted": sum(lane.admitted for lane in self._lanes.values()),
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "wait_seconds": _wait_stats(all_waits),
+            "avg_run_seconds": round(self._avg_run_seconds, 3) if self._avg_run_seconds else None,
+            "lanes": {name: lane.stats() for name, lane in self._lanes.items()},
+        }
+
+    def _lane(self, name: str) -> _Lane:
+        lane = self._lanes.get(name)
+        if lane is None:
+            raise ValueError(f"Unknown priority lane: {name}")
+        return lane
+
+    def _queued(self) -> int:
+        return sum(len(lane.waiters) for lane in self._lanes.values())
+
+    def _bounded_waiting(self) -> int:
+        return sum(1 for lane in self._lanes.values() for waiter in lane.waiters if waiter.bounded)
+
+    def _abandon(self, lane: _Lane, waiter: _Waiter) -> bool:
+        """
+        Withdraw a waiter. Returns False if it had already been given a slot.
+        """
+        if waiter.future.done() and not waiter.future.cancelled():
+            return False
+        waiter.future.cancel()
+        try:
+            lane.waiters.remove(waiter)
+        except ValueError:
+            pass
+        return True
+
+
+# Process-wide admission controller
+_shared_admission_controller: Optional[AdmissionController] = None
+_shared_admission_controller_lock = threading.Lock()
+
+
+def get_shared_admission_controller(settings) -> AdmissionController:
+    """
+    Return the process-wide AdmissionController.
+    """
+    global _shared_admission_controller
+    if _shared_admission_controller is None:
+        with _shared_admission_controller_lock:
+            if _shared_admission_controller is None:
+                _shared_admission_controller = AdmissionController(
+                    max_concurrent=settings.admission_max_concurrent,
+                    max_queue=settings.admission_max_queue,
+                    max_wait=settings.admission_max_wait_seconds,
+                    lane_weights={
+                        LANE_INTERACTIVE: settings.admission_interactive_weight,
+                        LANE_BULK: settings.admission_bulk_weight,
+                    },
+                )
+    return _shared_admission_controller
+
+
+def reset_shared_admission_controller() -> None:
+    """
+    Drop the process-wide AdmissionController so the next call builds one from current settings.
+    """
+    global _shared_admission_controller
+    with _shared_admission_controller_lock:
+        _shared_admission_controller = None
@@ -0,0 +1,109 @@
+"""
+In-memory LRU cache for JIRA issue details with TTL and revalidation.
+
+Entries younger than the TTL are served directly. Older entries are kept
+around so the caller can revalidate them against the issue's `updated`
+timestamp instead of refetching the whole issue.
+"""
+
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+import copy
+import threading
+import time
+
+
+class IssueCache:
+    """
+    Thread-safe LRU cache keyed by JIRA issue key.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 512,
+        ttl_seconds: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.refreshes = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _normalize_key(issue_key: str) -> str:
+        return issue_key.strip().upper()
+
+    def lookup(self, issue_key: str) -> Tuple[Optional[Dict], bool]:
+        """
+        Return (details, fresh). `fresh` is False when the entry is past its TTL
+        and must be revalidated before use. Returns (None, False) on a miss.
+        """
+        key = self._normalize_key(issue_key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, False
+
+            stored_at, details = entry
+            self._entries.move_to_end(key)
+            fresh = (self._clock() - stored_at) < self.ttl_seconds
+            if fresh:
+                self.hits += 1
+            return copy.deepcopy(details), fresh
+
+    def mark_revalidated(self, issue_key: str) -> None:
+        """
+        Restart the TTL of an entry confirmed unchanged upstream.
+        """
+        key = self._normalize_key(issue_key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries[key] = (self._clock(), entry[1])
+                self.revalidations += 1
+
+    def put(self, issue_key: str, details: Dict, refreshed: bool = False) -> None:
+        """
+        Store issue details, evicting the least recently used entry when full.
+        """
+        key = self._normalize_key(issue_key)
+        with self._lock:
+            self._entries[key] = (self._clock(), copy.deepcopy(details))
+            self._entries.move_to_end(key)
+            if refreshed:
+                self.refreshes += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, issue_key: str) -> None:
+        with self._lock:
+            self._entries.pop(self._normalize_key(issue_key), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses + self.revalidations + self.refreshes
+            return {
+                "enabled": True,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidations": self.revalidations,
+                "refreshes": self.refreshes,
+                "evictions": self.evictions,
+                "hit_ratio": round((self.hits + self.revalidations) / lookups, 4) if lookups else 0.0,
+            }
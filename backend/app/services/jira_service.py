@@ -1,40 +1,287 @@
-from jira import JIRA
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from .issue_cache import IssueCache
+from typing import Any, Callable, Dict, List, Optional
+import asyncio
 import logging
+import re
+import threading
 
 logger = logging.getLogger(__name__)
 
+# Fields read by _issue_to_details / _extract_acceptance_criteria
+ISSUE_FIELDS = [
+    "summary",
+    "description",
+    "issuetype",
+    "status",
+    "priority",
+    "updated",
+    "customfield_10100",
+]
+
+# JIRA Cloud caps search pages at 100 issues
+SEARCH_PAGE_SIZE = 100
+
+# Issue keys are interpolated into JQL, so anything not shaped like PROJ-123 is rejected
+ISSUE_KEY_PATTERN = re.compile(r"^[A-Z][A-Z0-9_]*-\d+$")
+
+# jira.JIRA, imported on first use: the jira package (and requests/oauthlib
+# under it) is slow to import and not needed to start serving
+JIRA = None
+
+
+def _jira_client_class():
+    global JIRA
+    if JIRA is None:
+        from jira import JIRA as jira_client_class
+        JIRA = jira_client_class
+    return JIRA
+
+
+def normalize_issue_key(issue_key: str) -> str:
+    """
+    Upper-case an issue key, raising ValueError unless it looks like PROJ-123.
+    """
+    key = issue_key.strip().upper()
+    if not ISSUE_KEY_PATTERN.match(key):
+        raise ValueError(f"Invalid JIRA issue key: {issue_key!r}")
+    return key
+
 
 class JiraService:
-    def __init__(self, jira_url: str, email: str, api_token: str):
-        self.jira_client = JIRA(
+    def __init__(
+        self,
+        jira_url: str,
+        email: str,
+        api_token: str,
+        pool_size: int = 10,
+        keep_alive: bool = True,
+        timeout: Optional[float] = None,
+        max_workers: int = 10,
+        cache: Optional[IssueCache] = None,
+    ):
+        # Skip the serverInfo probe; the first real call validates the credentials
+        self.jira_client = _jira_client_class()(
             server=jira_url,
-            basic_auth=(email, api_token)
+            basic_auth=(email, api_token),
+            get_server_info=False,
+            timeout=timeout,
         )
+        self._configure_session(pool_size=pool_size, keep_alive=keep_alive)
+
+        # Bounded pool for blocking JIRA calls made from async handlers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="jira")
+
+        self.cache = cache
+
+    def _configure_session(self, pool_size: int, keep_alive: bool) -> None:
+        """
+        Size the underlying requests connection pool so concurrent handlers
+        can share one client without opening a new connection per call.
+        """
+        from requests.adapters import HTTPAdapter
+
+        session = self.jira_client._session
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers["Connection"] = "keep-alive" if keep_alive else "close"
+
+    def close(self, wait: bool = False) -> None:
+        """
+        Close the underlying HTTP session and release pooled connections.
+        With wait=True, calls already running on the thread pool finish first.
+        """
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+        try:
+            self.jira_client.close()
+        except Exception as e:
+            logger.warning(f"Error closing JIRA client: {str(e)}")
+
+    async def _run_in_executor(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run a blocking JIRA call on the bounded thread pool so the event loop keeps serving.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def get_issue_details_async(self, issue_key: str) -> Dict:
+        """
+        Non-blocking variant of get_issue_details for async request handlers.
+        """
+        return await self._run_in_executor(self.get_issue_details, issue_key)
 
     def get_issue_details(self, issue_key: str) -> Dict:
+        """
+        Fetch issue details, served from the cache when possible.
+
+        Entries past their TTL are revalidated by fetching only the issue's
+        `updated` field; the full issue is refetched only when it changed.
+        """
+        if self.cache is None:
+            return self._fetch_issue_details(issue_key)
+
+        cached, fresh = self.cache.lookup(issue_key)
+        if cached is not None and fresh:
+            return cached
+
+        if cached is not None:
+            try:
+                if self._fetch_updated(issue_key) == cached.get("updated"):
+                    self.cache.mark_revalidated(issue_key)
+                    return cached
+            except Exception as e:
+                logger.warning(f"Revalidation failed for JIRA issue {issue_key}: {str(e)}")
+
+        details = self._fetch_issue_details(issue_key)
+        self.cache.put(issue_key, details, refreshed=cached is not None)
+        return details
+
+    def cache_stats(self) -> Dict:
+        """
+        Hit/miss counters for the issue cache.
+        """
+        if self.cache is None:
+            return {"enabled": False}
+        return self.cache.stats()
+
+    def _fetch_updated(self, issue_key: str) -> Optional[str]:
+        """
+        Fetch only the `updated` timestamp of an issue (cheap revalidation probe).
+        """
+        issue = self.jira_client.issue(issue_key, fields="updated")
+        return getattr(issue.fields, "updated", None)
+
+    def _fetch_issue_details(self, issue_key: str) -> Dict:
         """
         Fetch issue details from JIRA including description and acceptance criteria.
         """
         try:
-            issue = self.jira_client.issue(issue_key)
-
-            # Extract acceptance criteria from description or custom field
-            acceptance_criteria = self._extract_acceptance_criteria(issue)
-
-            return {
-                "key": issue.key,
-                "summary": issue.fields.summary,
-                "description": issue.fields.description or "",
-                "acceptance_criteria": acceptance_criteria,
-                "issue_type": issue.fields.issuetype.name,
-                "status": issue.fields.status.name,
-                "priority": issue.fields.priority.name if issue.fields.priority else "Medium",
-            }
+            issue = self.jira_client.issue(issue_key, fields=",".join(ISSUE_FIELDS))
+            return self._issue_to_details(issue)
         except Exception as e:
             logger.error(f"Error fetching JIRA issue {issue_key}: {str(e)}")
             raise Exception(f"Failed to fetch JIRA issue: {str(e)}")
 
+    def _issue_to_details(self, issue) -> Dict:
+        """
+        Convert a jira Issue into the details dict returned by this service.
+        """
+        # Extract acceptance criteria from description or custom field
+        acceptance_criteria = self._extract_acceptance_criteria(issue)
+
+        return {
+            "key": issue.key,
+            "summary": issue.fields.summary,
+            "description": issue.fields.description or "",
+            "acceptance_criteria": acceptance_criteria,
+            "issue_type": issue.fields.issuetype.name,
+            "status": issue.fields.status.name,
+            "priority": issue.fields.priority.name if issue.fields.priority else "Medium",
+            "updated": getattr(issue.fields, "updated", None),
+        }
+
+    def get_issues_details(self, issue_keys: List[str]) -> Dict[str, Dict]:
+        """
+        Fetch details for many issues with paginated JQL searches instead of one call per key.
+
+        Returns a dict keyed by the requested issue key (upper-cased). Keys that
+        could not be fetched are omitted; callers should treat them as errors.
+        Raises ValueError if any key is malformed.
+        """
+        keys = list(dict.fromkeys(normalize_issue_key(key) for key in issue_keys if key and key.strip()))
+        results: Dict[str, Dict] = {}
+
+        # Fresh cache hits never touch JIRA; stale entries are refetched in bulk
+        to_fetch = []
+        for key in keys:
+            if self.cache is not None:
+                cached, fresh = self.cache.lookup(key)
+                if cached is not None and fresh:
+                    results[key] = cached
+                    continue
+            to_fetch.append(key)
+
+        for start in range(0, len(to_fetch), SEARCH_PAGE_SIZE):
+            chunk = to_fetch[start:start + SEARCH_PAGE_SIZE]
+            try:
+                fetched = self.search_issue_details(f"key in ({', '.join(chunk)})")
+            except Exception as e:
+                # JIRA rejects the whole query if any key is unknown; fall back per key
+                logger.warning(f"Bulk JIRA fetch failed, falling back to single fetches: {str(e)}")
+                fetched = []
+                for key in chunk:
+                    try:
+                        fetched.append(self._fetch_issue_details(key))
+                    except Exception:
+                        continue
+
+            for details in fetched:
+                results[details["key"].upper()] = details
+
+        if self.cache is not None:
+            for key in to_fetch:
+                if key in results:
+                    self.cache.put(key, results[key])
+
+        return results
+
+    def search_issue_details(self, jql: str, max_results: Optional[int] = None) -> List[Dict]:
+        """
+        Run a JQL search and return details for every matching issue, page by page.
+        Only the fields this service uses are requested.
+        """
+        details: List[Dict] = []
+        start_at = 0
+        try:
+            while max_results is None or len(details) < max_results:
+                page_size = SEARCH_PAGE_SIZE
+                if max_results is not None:
+                    page_size = min(page_size, max_results - len(details))
+
+                page = self.jira_client.search_issues(
+                    jql,
+                    startAt=start_at,
+                    maxResults=page_size,
+                    fields=ISSUE_FIELDS,
+                )
+                details.extend(self._issue_to_details(issue) for issue in page)
+                start_at += len(page)
+
+                total = getattr(page, "total", None)
+                if not page or (total is not None and start_at >= total):
+                    break
+        except Exception as e:
+            logger.error(f"Error searching JIRA issues ({jql}): {str(e)}")
+            raise Exception(f"Failed to search JIRA issues: {str(e)}")
+
+        return details
+
+    def get_epic_issue_details(self, epic_key: str) -> List[Dict]:
+        """
+        Fetch details for every issue in an epic.
+        """
+        return self.search_issue_details(f"parent = {normalize_issue_key(epic_key)} ORDER BY key ASC")
+
+    def get_sprint_issue_details(self, sprint_id: int) -> List[Dict]:
+        """
+        Fetch details for every issue in a sprint.
+        """
+        return self.search_issue_details(f"sprint = {int(sprint_id)} ORDER BY key ASC")
+
+    async def get_issues_details_async(self, issue_keys: List[str]) -> Dict[str, Dict]:
+        """
+        Non-blocking variant of get_issues_details for async request handlers.
+        """
+        return await self._run_in_executor(self.get_issues_details, issue_keys)
+
+    async def search_issue_details_async(self, jql: str, max_results: Optional[int] = None) -> List[Dict]:
+        """
+        Non-blocking variant of search_issue_details for async request handlers.
+        """
+        return await self._run_in_executor(self.search_issue_details, jql, max_results)
+
     def _extract_acceptance_criteria(self, issue) -> List[str]:
         """
         Extract acceptance criteria from JIRA issue.
@@ -80,6 +327,24 @@ class JiraService:
 
         return criteria if criteria else ["No acceptance criteria provided"]
 
+    async def create_test_case_issue_async(
+        self,
+        project_key: str,
+        test_case_summary: str,
+        test_case_description: str,
+        parent_issue_key: Optional[str] = None
+    ) -> str:
+        """
+        Non-blocking variant of create_test_case_issue for async request handlers.
+        """
+        return await self._run_in_executor(
+            self.create_test_case_issue,
+            project_key,
+            test_case_summary,
+            test_case_description,
+            parent_issue_key,
+        )
+
     def create_test_case_issue(
         self,
         project_key: str,
@@ -106,3 +371,70 @@ class JiraService:
         except Exception as e:
             logger.error(f"Error creating test case in JIRA: {str(e)}")
             raise Exception(f"Failed to create JIRA test case: {str(e)}")
+
+
+# Process-wide JiraService shared by all request handlers
+_shared_jira_service: Optional[JiraService] = None
+_shared_jira_fingerprint: Optional[tuple] = None
+_shared_jira_lock = threading.Lock()
+
+
+def _jira_settings_fingerprint(settings) -> tuple:
+    return (
+        settings.jira_url,
+        settings.jira_email,
+        settings.jira_api_token,
+        settings.jira_pool_size,
+        settings.jira_keep_alive,
+        settings.jira_timeout,
+        settings.jira_max_workers,
+        settings.jira_cache_enabled,
+        settings.jira_cache_max_entries,
+        settings.jira_cache_ttl_seconds,
+    )
+
+
+def get_shared_jira_service(settings) -> JiraService:
+    """
+    Return the process-wide JiraService, creating it on first use.
+
+    If the JIRA settings changed since it was built (e.g. after a settings
+    reload), a new service replaces it and the old one is closed once its
+    in-flight calls finish.
+    """
+    global _shared_jira_service, _shared_jira_fingerprint
+    fingerprint = _jira_settings_fingerprint(settings)
+    if _shared_jira_service is None or _shared_jira_fingerprint != fingerprint:
+        with _shared_jira_lock:
+            if _shared_jira_service is None or _shared_jira_fingerprint != fingerprint:
+                logger.info(f"Creating shared JIRA client (pool size {settings.jira_pool_size})")
+                previous = _shared_jira_service
+                _shared_jira_service = JiraService(
+                    jira_url=settings.jira_url,
+                    email=settings.jira_email,
+                    api_token=settings.jira_api_token,
+                    pool_size=settings.jira_pool_size,
+                    keep_alive=settings.jira_keep_alive,
+                    timeout=settings.jira_timeout,
+                    max_workers=settings.jira_max_workers,
+                    cache=IssueCache(
+                        max_entries=settings.jira_cache_max_entries,
+                        ttl_seconds=settings.jira_cache_ttl_seconds,
+                    ) if settings.jira_cache_enabled else None,
+                )
+                _shared_jira_fingerprint = fingerprint
+                if previous is not None:
+                    threading.Thread(target=previous.close, kwargs={"wait": True}, daemon=True).start()
+    return _shared_jira_service
+
+
+def close_shared_jira_service() -> None:
+    """
+    Close the process-wide JiraService, if one was created.
+    """
+    global _shared_jira_service, _shared_jira_fingerprint
+    with _shared_jira_lock:
+        if _shared_jira_service is not None:
+            _shared_jira_service.close()
+            _shared_jira_service = None
+            _shared_jira_fingerprint = None
@@ -0,0 +1,315 @@
+"""
+Persistent background job queue for long-running test case generation.
+
+Jobs are stored in a local SQLite database so queued (and interrupted)
+work survives a restart. A fixed number of asyncio workers pull job ids
+from an in-memory queue and run them through the configured handler.
+"""
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+# handler(payload, report_progress) -> result
+JobHandler = Callable[[Dict, Callable[[str], None]], Awaitable[Dict]]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    progress TEXT,
+    payload TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+)
+"""
+
+
+class _ProgressWriter:
+    """
+    Writes one job's progress on a worker thread. report() is synchronous
+    because handlers call it inline; a burst of reports becomes one write
+    of the latest value.
+    """
+
+    def __init__(self, queue: "JobQueue", job_id: str):
+        self.queue = queue
+        self.job_id = job_id
+        self._latest: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def report(self, progress: str) -> None:
+        self._latest = progress
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._write())
+
+    async def flush(self) -> None:
+        """
+        Wait for pending writes, so they cannot overwrite the final status.
+        """
+        if self._task is not None:
+            await self._task
+
+    def cancel(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _write(self) -> None:
+        while self._latest is not None:
+            progress, self._latest = self._latest, None
+            try:
+                await asyncio.to_thread(
+                    self.queue._execute, "UPDATE jobs SET progress = ? WHERE id = ?", (progress, self.job_id)
+                )
+            except Exception as e:
+                logger.warning(f"Failed to record progress for job {self.job_id}: {str(e)}")
+
+
+class JobQueue:
+    """
+    SQLite-backed job queue with a fixed-size asyncio worker pool.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        handler: JobHandler,
+        workers: int = 2,
+        retention_hours: float = 24.0,
+        max_attempts: int = 3,
+    ):
+        self.db_path = db_path
+        self.handler = handler
+        self.workers = workers
+        self.retention_hours = retention_hours
+        # Runs a job may start before it is failed instead of resumed on restart
+        self.max_attempts = max_attempts
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """
+        Open the database, re-enqueue unfinished jobs and start the workers.
+        """
+        directory = os.path.dirname(os.path.abspath(self.db_path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+
+        pending = await asyncio.to_thread(self._recover)
+        for job_id in pending:
+            self._queue.put_nowait(job_id)
+        if pending:
+            logger.info(f"Re-enqueued {len(pending)} unfinished jobs")
+
+        self._tasks = [asyncio.create_task(self._worker(n)) for n in range(self.workers)]
+        logger.info(f"Job queue started with {self.workers} workers ({self.db_path})")
+
+    async def stop(self) -> None:
+        """
+        Stop the workers. Jobs interrupted mid-run stay `running` in the
+        database and are re-enqueued on the next start.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # Writes already handed to a thread still hold _db_lock; close after them
+        await asyncio.to_thread(self._close)
+
+    async def submit(self, payload: Dict) -> Dict:
+        """
+        Persist a new job and enqueue it. Returns the stored job record.
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT INTO jobs (id, status, progress, payload, created_at) VALUES (?, ?, ?, ?, ?)",
+            (job_id, JOB_QUEUED, JOB_QUEUED, json.dumps(payload), now),
+        )
+        self._queue.put_nowait(job_id)
+        return await self.get(job_id)
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        """
+        Fetch a job record, or None if the id is unknown.
+        """
+        row = await asyncio.to_thread(self._fetch_one, "SELECT * FROM jobs WHERE id = ?", (job_id,))
+        if row is None:
+            return None
+        return {
+            "job_id": row["id"],
+            "status": row["status"],
+            "progress": row["progress"],
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+            "attempts": row["attempts"],
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"],
+            "queue_depth": self._queue.qsize(),
+        }
+
+    async def _worker(self, worker_id: int) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run_job(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job worker {worker_id} failed on job {job_id}: {str(e)}", exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    async def _run_job(self, job_id: str) -> None:
+        row = await asyncio.to_thread(self._fetch_one, "SELECT * FROM jobs WHERE id = ?", (job_id,))
+        if row is None or row["status"] in (JOB_SUCCEEDED, JOB_FAILED):
+            return
+
+        await asyncio.to_thread(
+            self._execute,
+            "UPDATE jobs SET status = ?, progress = ?, attempts = attempts + 1, started_at = ? WHERE id = ?",
+            (JOB_RUNNING, JOB_RUNNING, time.time(), job_id),
+        )
+        logger.info(f"Running job {job_id}")
+
+        progress = _ProgressWriter(self, job_id)
+        try:
+            result = await self.handler(json.loads(row["payload"]), progress.report)
+        except asyncio.CancelledError:
+            # Shutdown: leave the job `running` so it is recovered on restart
+            progress.cancel()
+            raise
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {str(e)}")
+            await progress.flush()
+            await asyncio.to_thread(
+                self._execute,
+                "UPDATE jobs SET status = ?, progress = ?, error = ?, finished_at = ? WHERE id = ?",
+                (JOB_FAILED, JOB_FAILED, str(e), time.time(), job_id),
+            )
+            return
+
+        await progress.flush()
+        await asyncio.to_thread(
+            self._execute,
+            "UPDATE jobs SET status = ?, progress = ?, result = ?, finished_at = ? WHERE id = ?",
+            (JOB_SUCCEEDED, JOB_SUCCEEDED, json.dumps(result, default=str), time.time(), job_id),
+        )
+        logger.info(f"Job {job_id} succeeded")
+
+    def _recover(self) -> List[str]:
+        """
+        Create the schema, purge old finished jobs and return unfinished job ids in submit order.
+        Interrupted jobs that already started `max_attempts` runs are failed instead of
+        resumed, so a job that crashes the process cannot do so on every restart.
+        """
+        with self._db_lock:
+            self._conn.execute(_SCHEMA)
+            now = time.time()
+            cutoff = now - self.retention_hours * 3600
+            self._conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+                (JOB_SUCCEEDED, JOB_FAILED, cutoff),
+            )
+            abandoned = self._conn.execute(
+                "UPDATE jobs SET status = ?, progress = ?, error = ?, finished_at = ? WHERE status = ? AND attempts >= ?",
+                (
+                    JOB_FAILED,
+                    JOB_FAILED,
+                    f"Interrupted after {self.max_attempts} attempts; not retried",
+                    now,
+                    JOB_RUNNING,
+                    self.max_attempts,
+                ),
+            ).rowcount
+            if abandoned:
+                logger.warning(f"Failed {abandoned} jobs interrupted {self.max_attempts} times")
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, progress = ? WHERE status = ?",
+                (JOB_QUEUED, JOB_QUEUED, JOB_RUNNING),
+            )
+            self._conn.commit()
+            rows = self._conn.execute(
+                "SELECT id FROM jobs WHERE status = ? ORDER BY created_at",
+                (JOB_QUEUED,),
+            ).fetchall()
+        return [row["id"] for row in rows]
+
+    def _execute(self, sql: str, params: tuple) -> None:
+        with self._db_lock:
+            conn = self._connection()
+            conn.execute(sql, params)
+            conn.commit()
+
+    def _fetch_one(self, sql: str, params: tuple) -> Optional[Any]:
+        with self._db_lock:
+            return self._connection().execute(sql, params).fetchone()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            raise Exception("Job queue is stopped")
+        return self._conn
+
+    def _close(self) -> None:
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# Process-wide job queue, started on first use or in the startup hook
+_shared_job_queue: Optional[JobQueue] = None
+_shared_job_queue_lock = asyncio.Lock()
+
+
+async def get_shared_job_queue(settings, handler: JobHandler) -> JobQueue:
+    """
+    Return the process-wide JobQueue, starting it on first use.
+    """
+    global _shared_job_queue
+    if _shared_job_queue is None:
+        async with _shared_job_queue_lock:
+            if _shared_job_queue is None:
+                queue = JobQueue(
+                    db_path=settings.job_db_path,
+                    handler=handler,
+                    workers=settings.job_workers,
+                    retention_hours=settings.job_retention_hours,
+                    max_attempts=settings.job_max_attempts,
+                )
+                await queue.start()
+                _shared_job_queue = queue
+    return _shared_job_queue
+
+
+async def close_shared_job_queue() -> None:
+    """
+    Stop the process-wide JobQueue, if one was started.
+    """
+    global _shared_job_queue
+    if _shared_job_queue is not None:
+        await _shared_job_queue.stop()
+        _shared_job_queue = None
@@ -0,0 +1,282 @@
+"""
+In-process metrics with a Prometheus text exposition endpoint.
+
+A deliberately small implementation (counters, gauges, fixed-bucket
+histograms with labels) so that recording a sample on the hot path is a
+dict lookup and a few additions under a lock, with no extra dependency.
+`render()` produces the text format served at /metrics.
+"""
+
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import abc
+import threading
+import time
+
+# Seconds; covers sub-millisecond local work up to multi-minute agent runs
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric(abc.ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    @abc.abstractmethod
+    def _samples(self) -> List[str]:
+        """Exposition lines for every label combination."""
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    @contextmanager
+    def track(self, **labels) -> Iterator[None]:
+        """
+        Increment for the duration of the block (e.g. in-flight requests).
+        """
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket..., +Inf count], sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = ([0] * (len(self.buckets) + 1), [0.0])
+                self._values[key] = entry
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+            return sum(entry[0]) if entry else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(counts), total[0]) for key, (counts, total) in self._values.items()]
+        lines = []
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, ("le", _format_value(float(bound))))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            cumulative += counts[-1]
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', '+Inf'))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Holds metrics and renders them in the Prometheus text format.
+    """
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+
+REGISTRY = MetricsRegistry()
+
+JIRA_FETCH_SECONDS = REGISTRY.histogram(
+    "testgen_jira_fetch_seconds", "Time to fetch issue details from JIRA", ["operation", "outcome"]
+)
+PROMPT_BUILD_SECONDS = REGISTRY.histogram(
+    "testgen_prompt_build_seconds", "Time to build the generation prompt", ["engine"]
+)
+AGENT_RUN_SECONDS = REGISTRY.histogram(
+    "testgen_agent_run_seconds", "Duration of one agent run or API completion", ["engine", "outcome"]
+)
+TIME_TO_FIRST_MESSAGE_SECONDS = REGISTRY.histogram(
+    "testgen_time_to_first_message_seconds", "Time from starting a run to its first message or token", ["engine"]
+)
+AGENT_TURNS = REGISTRY.histogram(
+    "testgen_agent_turns", "Model turns per agent run", ["engine"], buckets=COUNT_BUCKETS
+)
+TOOL_CALLS = REGISTRY.histogram(
+    "testgen_tool_calls", "Tool calls per agent run", ["engine"], buckets=COUNT_BUCKETS
+)
+PARSE_FAILURES = REGISTRY.counter(
+    "testgen_parse_failures_total", "Agent runs whose output could not be parsed into test cases", ["engine", "reason"]
+)
+TEST_CASES_GENERATED = REGISTRY.counter(
+    "testgen_test_cases_generated_total", "Test cases produced by agent runs", ["engine"]
+)
+REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    "testgen_requests_in_flight", "Generation requests currently being handled", ["endpoint"]
+)
+GENERATION_REQUESTS = REGISTRY.counter(
+    "testgen_generation_requests_total", "Generation requests by endpoint and outcome", ["endpoint", "outcome"]
+)
+
+
+class AgentRunMetrics:
+    """
+    Records the metrics of one agent run. Create it when the run starts,
+    call message()/tool_calls() as messages arrive and finish() at the end.
+    """
+
+    def __init__(self, engine: str):
+        self.engine = engine
+        self.started = time.perf_counter()
+        self.first_message_at: Optional[float] = None
+        self.tool_call_count = 0
+        self.turns: Optional[int] = None
+        self._finished = False
+
+    def message(self) -> None:
+        if self.first_message_at is None:
+            self.first_message_at = time.perf_counter()
+            TIME_TO_FIRST_MESSAGE_SECONDS.observe(self.first_message_at - self.started, engine=self.engine)
+
+    def tool_calls(self, count: int) -> None:
+        self.tool_call_count += count
+
+    def finish(self, outcome: Optional[str] = None, result: Optional[Dict] = None) -> None:
+        """
+        Record the run. Without an explicit outcome it is derived from the result.
+        """
+        if self._finished:
+            return
+        self._finished = True
+
+        if outcome is None:
+            outcome = self._outcome(result or {})
+        AGENT_RUN_SECONDS.observe(time.perf_counter() - self.started, engine=self.engine, outcome=outcome)
+        TOOL_CALLS.observe(self.tool_call_count, engine=self.engine)
+        if self.turns is not None:
+            AGENT_TURNS.observe(self.turns, engine=self.engine)
+        if result:
+            TEST_CASES_GENERATED.inc(len(result.get("test_cases", [])), engine=self.engine)
+
+    def _outcome(self, result: Dict) -> str:
+        if "error" in result:
+            PARSE_FAILURES.inc(engine=self.engine, reason="invalid_json")
+            return "parse_error"
+        if not result.get("test_cases"):
+            if "raw_output" in result:
+                PARSE_FAILURES.inc(engine=self.engine, reason="no_json")
+                return "parse_error"
+            return "empty"
+        return "success"
+
+
+def render() -> str:
+    return REGISTRY.render()
@@ -0,0 +1,268 @@
+"""
+Content-addressed cache of test case generation results.
+
+Results are keyed by a hash of the normalized generation input plus the
+model and prompt version, so identical requests (double-clicks, CI re-runs,
+the same story requested by different people) skip the agent loop. The
+in-memory LRU tier is always on; an optional SQLite tier lets results
+survive restarts and be shared between workers on the same host. The
+SQLite file is opened (and pruned) in a worker thread on first use, or
+ahead of time via open(); disk errors degrade to cache misses.
+"""
+
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _normalize_text(value: Optional[str]) -> str:
+    return _WHITESPACE.sub(" ", value or "").strip()
+
+
+def make_cache_key(
+    title: str,
+    description: str,
+    acceptance_criteria: List[str],
+    test_types: List[str],
+    include_edge_cases: bool,
+    include_negative_tests: bool,
+    model: str,
+    prompt_version: str,
+    **extra,
+) -> str:
+    """
+    Stable SHA-256 key for a generation input. Whitespace differences and
+    test_types ordering do not change the key; any other input does.
+    """
+    payload = {
+        "title": _normalize_text(title),
+        "description": _normalize_text(description),
+        "acceptance_criteria": [
+            text for text in (_normalize_text(ac) for ac in acceptance_criteria) if text
+        ],
+        "test_types": sorted(set(test_types)),
+        "include_edge_cases": include_edge_cases,
+        "include_negative_tests": include_negative_tests,
+        "model": model,
+        "prompt_version": prompt_version,
+        "extra": extra,
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Two-tier (memory LRU + optional SQLite) cache of generation results.
+    """
+
+    # Disk writes between prunes of expired and excess rows
+    prune_every = 100
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl_seconds: float = 86400.0,
+        db_path: Optional[str] = None,
+        max_disk_entries: int = 10000,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self.max_disk_entries = max_disk_entries
+        self._puts_since_prune = 0
+
+        self._entries: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._closed = False
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Tuple[Optional[Dict], Optional[str]]:
+        """
+        Return (result, tier) where tier is "memory" or "disk", or (None, None) on a miss.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return copy.deepcopy(entry[1]), "memory"
+            if entry is not None:
+                del self._entries[key]
+
+        if self._disk_enabled():
+            try:
+                row = await asyncio.to_thread(self._disk_get, key)
+            except Exception as e:
+                logger.warning(f"Failed to read result cache entry from disk: {str(e)}")
+                row = None
+            if row is not None and now - row[1] < self.ttl_seconds:
+                result = json.loads(row[0])
+                self._memory_put(key, result, row[1])
+                with self._lock:
+                    self.disk_hits += 1
+                return result, "disk"
+
+        with self._lock:
+            self.misses += 1
+        return None, None
+
+    async def put(self, key: str, result: Dict) -> None:
+        created_at = time.time()
+        self._memory_put(key, result, created_at)
+        if self._disk_enabled():
+            try:
+                await asyncio.to_thread(self._disk_put, key, json.dumps(result, default=str), created_at)
+            except Exception as e:
+                logger.warning(f"Failed to write result cache entry to disk: {str(e)}")
+
+    async def open(self) -> None:
+        """
+        Open and prune the SQLite tier now instead of on the first lookup.
+        """
+        if self._disk_enabled():
+            try:
+                await asyncio.to_thread(self._disk_open)
+            except Exception as e:
+                logger.warning(f"Failed to open result cache database {self.db_path}: {str(e)}")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "disk_enabled": self._disk_enabled(),
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            }
+
+    def close(self) -> None:
+        with self._db_lock:
+            self._closed = True
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _disk_enabled(self) -> bool:
+        return bool(self.db_path) and not self._closed
+
+    def _memory_put(self, key: str, result: Dict, created_at: float) -> None:
+        with self._lock:
+            self._entries[key] = (created_at, copy.deepcopy(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _disk_open(self) -> None:
+        with self._db_lock:
+            self._connection()
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        The SQLite connection, opened and pruned on first use. Callers hold _db_lock.
+        """
+        if self._closed:
+            raise Exception("Result cache is closed")
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            try:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS results_created_at ON results (created_at)")
+                removed = self._disk_prune(conn)
+                conn.commit()
+            except Exception:
+                conn.close()
+                raise
+            self._conn = conn
+            if removed:
+                logger.info(f"Pruned {removed} expired or excess result cache entries from {self.db_path}")
+        return self._conn
+
+    def _disk_get(self, key: str) -> Optional[Tuple[str, float]]:
+        with self._db_lock:
+            return self._connection().execute(
+                "SELECT value, created_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+
+    def _disk_put(self, key: str, value: str, created_at: float) -> None:
+        with self._db_lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, value, created_at) VALUES (?, ?, ?)",
+                (key, value, created_at),
+            )
+            self._puts_since_prune += 1
+            if self._puts_since_prune >= self.prune_every:
+                self._disk_prune(conn)
+            conn.commit()
+
+    def _disk_prune(self, conn: sqlite3.Connection) -> int:
+        """
+        Delete expired rows and the oldest rows beyond max_disk_entries.
+        Callers hold _db_lock and commit.
+        """
+        self._puts_since_prune = 0
+        cutoff = time.time() - self.ttl_seconds
+        removed = conn.execute("DELETE FROM results WHERE created_at < ?", (cutoff,)).rowcount
+        removed += conn.execute(
+            "DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,),
+        ).rowcount
+        return removed
+
+
+# Process-wide result cache
+_shared_result_cache: Optional[ResultCache] = None
+_shared_result_cache_lock = threading.Lock()
+
+
+def get_shared_result_cache(settings) -> Optional[ResultCache]:
+    """
+    Return the process-wide ResultCache, or None when caching is disabled.
+    """
+    global _shared_result_cache
+    if not settings.result_cache_enabled:
+        return None
+    if _shared_result_cache is None:
+        with _shared_result_cache_lock:
+            if _shared_result_cache is None:
+                _shared_result_cache = ResultCache(
+                    max_entries=settings.result_cache_max_entries,
+                    ttl_seconds=settings.result_cache_ttl_seconds,
+                    db_path=settings.result_cache_db_path,
+                    max_disk_entries=settings.result_cache_max_disk_entries,
+                )
+    return _shared_result_cache
+
+
+def close_shared_result_cache() -> None:
+    global _shared_result_cache
+    with _shared_result_cache_lock:
+        if _shared_result_cache is not None:
+            _shared_result_cache.close()
+            _shared_result_cache = None
@@ -0,0 +1,295 @@
+"""
+Lightweight span tracing for generation requests.
+
+Each generation request gets one trace: a root span with child spans for
+the JIRA fetch, the agent run, every assistant turn, every tool call and
+the final parse. Spans are always recorded in memory (a handful of small
+objects per request) so responses can carry a timing breakdown and a
+Server-Timing header; they are written to disk only when an exporter is
+configured. The JSONL exporter writes one span per line using OTLP field
+names (traceId, spanId, parentSpanId, startTimeUnixNano, ...).
+
+The current span is tracked in a ContextVar, so tasks started for a
+request (single-flight runs, fan-out shards) inherit it.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+import json
+import logging
+import os
+import queue
+import secrets
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Span names that make up the timing breakdown, in display order
+TIMING_SPANS = ("jira_fetch", "prompt_build", "agent_run", "assistant_turn", "tool", "parse")
+
+
+class Span:
+    """
+    One timed operation within a trace.
+    """
+
+    __slots__ = ("trace", "name", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(
+        self,
+        trace: "Trace",
+        name: str,
+        parent_id: Optional[str] = None,
+        start_ns: Optional[int] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+    ):
+        self.trace = trace
+        self.name = name
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.start_ns = start_ns if start_ns is not None else time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes or {}
+        self.error: Optional[str] = None
+
+    def child(self, name: str, start_ns: Optional[int] = None, **attributes) -> "Span":
+        """
+        Start a child span. Use end() to finish it.
+        """
+        return self.trace.start_span(name, parent_id=self.span_id, start_ns=start_ns, attributes=attributes)
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def fail(self, error: BaseException) -> None:
+        self.error = f"{type(error).__name__}: {str(error)}"
+
+    def end(self, end_ns: Optional[int] = None) -> None:
+        if self.end_ns is None:
+            self.end_ns = end_ns if end_ns is not None else time.time_ns()
+
+    @property
+    def duration_ms(self) -> float:
+        end_ns = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end_ns - self.start_ns) / 1_000_000
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "durationMs": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "status": {"code": "ERROR", "message": self.error} if self.error else {"code": "OK"},
+        }
+
+
+class Trace:
+    """
+    All spans recorded for one request.
+    """
+
+    def __init__(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        self.trace_id = secrets.token_hex(16)
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+        self.root = self.start_span(name, attributes=attributes)
+
+    def start_span(
+        self,
+        name: str,
+        parent_id: Optional[str] = None,
+        start_ns: Optional[int] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+    ) -> Span:
+        span = Span(self, name, parent_id=parent_id, start_ns=start_ns, attributes=attributes)
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    def timings(self) -> Dict[str, float]:
+        """
+        Milliseconds per stage (summed over spans of the same name), the total,
+        and the time not covered by the JIRA fetch or the agent run.
+        """
+        totals: Dict[str, float] = {}
+        with self._lock:
+            spans = list(self.spans)
+        for span in spans:
+            if span.name in TIMING_SPANS:
+                totals[span.name] = totals.get(span.name, 0.0) + span.duration_ms
+
+        timings = {f"{name}_ms": round(totals[name], 1) for name in TIMING_SPANS if name in totals}
+        total = self.root.duration_ms
+        timings["total_ms"] = round(total, 1)
+        timings["overhead_ms"] = round(max(0.0, total - totals.get("jira_fetch", 0.0) - totals.get("agent_run", 0.0)), 1)
+        return timings
+
+    def server_timing(self) -> str:
+        """
+        The timing breakdown as a Server-Timing header value.
+        """
+        return ", ".join(
+            f"{name[:-3]};dur={value}" for name, value in self.timings().items()
+        )
+
+
+class _NoopSpan:
+    """
+    Stand-in used when no trace is active, so callers need no checks.
+    """
+
+    def child(self, name: str, start_ns: Optional[int] = None, **attributes) -> "_NoopSpan":
+        return self
+
+    def set(self, **attributes) -> None:
+        pass
+
+    def fail(self, error: BaseException) -> None:
+        pass
+
+    def end(self, end_ns: Optional[int] = None) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class JsonlSpanExporter:
+    """
+    Appends finished spans to a JSONL file, one span per line.
+
+    export() only queues the trace; a daemon writer thread does the file
+    I/O so finishing a trace never blocks the event loop.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._writer = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._writer.start()
+
+    def export(self, trace: Trace) -> None:
+        self._queue.put("".join(json.dumps(span.to_dict(), default=str) + "\n" for span in trace.spans))
+
+    def close(self, timeout: float = 5.0) -> None:
+        """
+        Write out everything queued so far and stop the writer thread.
+        """
+        self._queue.put(None)
+        self._writer.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            lines = self._queue.get()
+            if lines is None:
+                return
+            try:
+                with open(self.path, "a", encoding="utf-8") as trace_file:
+                    trace_file.write(lines)
+            except Exception as e:
+                logger.warning(f"Failed to export spans to {self.path}: {str(e)}")
+
+
+_exporter: Optional[JsonlSpanExporter] = None
+
+
+def configure(enabled: bool, export_path: Optional[str] = None) -> None:
+    """
+    Turn the JSONL exporter on or off. Spans are recorded either way.
+    A previously configured exporter is flushed and closed.
+    """
+    global _exporter
+    previous = _exporter
+    _exporter = JsonlSpanExporter(export_path) if enabled and export_path else None
+    if previous is not None:
+        previous.close()
+
+
+def current_span():
+    """
+    The active span, or a no-op span when no trace is active.
+    """
+    return _current_span.get() or NOOP_SPAN
+
+
+def current_trace() -> Optional[Trace]:
+    span = _current_span.get()
+    return span.trace if span is not None else None
+
+
+def start_trace(name: str, **attributes) -> Trace:
+    """
+    Create a trace without activating it; see activate() and finish_trace().
+    """
+    return Trace(name, attributes)
+
+
+def finish_trace(trace: Trace) -> None:
+    trace.root.end()
+    if _exporter is not None:
+        try:
+            _exporter.export(trace)
+        except Exception as e:
+            logger.warning(f"Failed to export trace {trace.trace_id}: {str(e)}")
+
+
+@contextmanager
+def activate(span: Span) -> Iterator[Span]:
+    """
+    Make span the current span for the duration of the block.
+    """
+    token = _current_span.set(span)
+    try:
+        yield span
+    finally:
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            # Closed from another context (e.g. an abandoned async generator)
+            pass
+
+
+@contextmanager
+def trace(name: str, **attributes) -> Iterator[Trace]:
+    """
+    Record one request: creates the trace, activates its root span and
+    exports it when the block exits.
+    """
+    current = start_trace(name, **attributes)
+    try:
+        with activate(current.root):
+            yield current
+    except BaseException as e:
+        current.root.fail(e)
+        raise
+    finally:
+        finish_trace(current)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """
+    Record a child of the current span for the duration of the block.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        yield NOOP_SPAN
+        return
+    child = parent.child(name, **attributes)
+    try:
+        with activate(child):
+            yield child
+    except BaseException as e:
+        child.fail(e)
+        raise
+    finally:
+        child.end()
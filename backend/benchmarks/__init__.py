@@ -0,0 +1,39 @@
+"""
+Offline benchmark harness.
+
+Runs the service in-process against deterministic fakes of the Agent SDK,
+the Anthropic API and JIRA, drives it with a concurrent load generator and
+reports throughput, latency percentiles, event loop lag and memory.
+
+    python -m benchmarks --engine agent_sdk --requests 200 --concurrency 20
+
+Recorded agent sessions (AGENT_RECORD_DIR) can stand in for the fake agent
+with --replay, and benchmarks.micro times the individual pipeline stages.
+"""
+
+from importlib import import_module
+
+# The harness imports the service and the SDK fakes; load it on first use so
+# that `python -m benchmarks.import_time` measures a clean interpreter
+_EXPORTS = {
+    "FakeAnthropic": ".fakes",
+    "FakeJira": ".fakes",
+    "FakeQuery": ".fakes",
+    "offline_service": ".harness",
+    "run_benchmark": ".harness",
+    "run_load": ".load",
+    "format_report": ".load",
+    "manual_payload": ".load",
+    "jira_payload": ".load",
+}
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+__all__ = list(_EXPORTS)
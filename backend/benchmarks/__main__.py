@@ -0,0 +1,80 @@
+"""
+Command line entry point: python -m benchmarks --help
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+
+from app.agents.recording import ReplayQuery
+from . import FakeAnthropic, FakeJira, FakeQuery, format_report, run_benchmark
+
+
+def _settings(pairs):
+    settings = {}
+    for pair in pairs or []:
+        name, _, value = pair.partition("=")
+        settings[name.strip().lower()] = value.strip()
+    return settings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline load test of the test case generator service")
+    parser.add_argument("--engine", choices=["agent_sdk", "direct_api"], default="agent_sdk")
+    parser.add_argument("--mode", choices=["agentic", "fast"], default="agentic")
+    parser.add_argument("--requests", type=int, default=50, help="Total requests to send")
+    parser.add_argument("--concurrency", type=int, default=10, help="Requests in flight at once")
+    parser.add_argument("--stream", action="store_true", help="Use the SSE endpoint")
+    parser.add_argument("--jira", action="store_true", help="Request JIRA issues instead of manual input")
+    parser.add_argument("--turn-latency", type=float, default=0.5, help="Seconds per fake agent turn")
+    parser.add_argument("--tool-turns", type=int, default=1, help="Tool-use turns per fake agent run")
+    parser.add_argument("--first-token-latency", type=float, default=0.4, help="Seconds to the first fake API token")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0, help="Fake API streaming rate")
+    parser.add_argument("--jira-latency", type=float, default=0.15, help="Seconds per fake JIRA call")
+    parser.add_argument("--test-cases", type=int, default=6, help="Test cases per fake answer")
+    parser.add_argument("--replay", metavar="DIR", help="Replay recorded agent sessions instead of the fake agent")
+    parser.add_argument("--replay-speed", type=float, default=1.0, help="Replay speed factor; 0 = as fast as possible")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Relative latency jitter (0 = none)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--set", action="append", metavar="NAME=VALUE", help="Override a setting, e.g. admission_max_concurrent=16")
+    parser.add_argument("--trace-memory", action="store_true", help="Report peak Python allocations (slower)")
+    parser.add_argument("--json", metavar="PATH", help="Also write the report as JSON")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    report = asyncio.run(run_benchmark(
+        engine=args.engine,
+        total_requests=args.requests,
+        concurrency=args.concurrency,
+        use_jira=args.jira,
+        stream=args.stream,
+        mode=args.mode,
+        query=ReplayQuery.from_dir(args.replay, speed=args.replay_speed) if args.replay else FakeQuery(
+            turn_latency=args.turn_latency,
+            tool_turns=args.tool_turns,
+            test_cases=args.test_cases,
+            jitter=args.jitter,
+            seed=args.seed,
+        ),
+        anthropic=FakeAnthropic(
+            first_token_latency=args.first_token_latency,
+            tokens_per_second=args.tokens_per_second,
+            test_cases=args.test_cases,
+            jitter=args.jitter,
+            seed=args.seed,
+        ),
+        jira=FakeJira(latency=args.jira_latency, jitter=args.jitter, seed=args.seed),
+        settings=_settings(args.set),
+        trace_memory=args.trace_memory,
+    ))
+
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as report_file:
+            json.dump(report, report_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+"""
+Deterministic, latency-configurable stand-ins for the external backends.
+
+- FakeQuery replaces claude_agent_sdk.query(): it plays an agentic loop of
+  tool-use turns followed by a final JSON answer and a ResultMessage.
+- FakeAnthropic replaces AsyncAnthropic for the direct_api engine: it
+  streams the same JSON answer in chunks at a configurable token rate.
+- FakeJira replaces jira.JIRA: issues and JQL searches are generated from
+  the issue key, after a configurable delay (the call runs on JiraService's
+  thread pool, so a blocking sleep is what a real HTTP call looks like).
+
+Latencies are scaled by a seeded jitter, so two runs with the same seed
+see the same timings.
+"""
+
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, List, Optional
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+
+from claude_agent_sdk import (
+    AssistantMessage,
+    ResultMessage,
+    TextBlock,
+    ToolResultBlock,
+    ToolUseBlock,
+    UserMessage,
+)
+import requests
+
+from app.agents.recording import prompt_text
+
+FAKE_MODEL = "claude-sonnet-4-5-20250929"
+
+_TYPES = ["functional", "integration", "e2e", "api"]
+_PRIORITIES = ["high", "medium", "low"]
+
+
+def sample_test_cases(count: int, feature: str = "Feature") -> List[Dict]:
+    """
+    `count` valid test cases for a feature, identical for identical arguments.
+    """
+    return [
+        {
+            "title": f"{feature}: scenario {number}",
+            "description": f"Checks scenario {number} of {feature}",
+            "type": _TYPES[number % len(_TYPES)],
+            "priority": _PRIORITIES[number % len(_PRIORITIES)],
+            "preconditions": ["User account exists", "Feature flag is enabled"],
+            "steps": [
+                {"step_number": 1, "action": "Open the feature page", "expected_result": "Page is shown"},
+                {"step_number": 2, "action": f"Perform action {number}", "expected_result": f"Outcome {number} is shown"},
+            ],
+            "expected_outcome": f"Outcome {number} is shown",
+            "tags": ["benchmark", f"scenario-{number}"],
+        }
+        for number in range(1, count + 1)
+    ]
+
+
+def sample_answer(count: int, feature: str = "Feature") -> str:
+    """
+    The model's final answer: a JSON object with test cases and a coverage summary.
+    """
+    return json.dumps({
+        "test_cases": sample_test_cases(count, feature),
+        "coverage_summary": f"{count} scenarios covering {feature}",
+    }, indent=2)
+
+
+class _Jitter:
+    """
+    Seeded multiplier in [1 - spread, 1 + spread], safe to share across threads.
+    """
+
+    def __init__(self, spread: float, seed: int):
+        self.spread = spread
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def scale(self, seconds: float) -> float:
+        if seconds <= 0 or self.spread <= 0:
+            return max(seconds, 0.0)
+        with self._lock:
+            factor = 1 + self._random.uniform(-self.spread, self.spread)
+        return seconds * factor
+
+
+def _feature_from_prompt(prompt: str) -> str:
+    match = re.search(r"Feature Title:\**\s*(.+)", prompt)
+    return match.group(1).strip()[:60] if match else "Feature"
+
+
+class FakeQuery:
+    """
+    Drop-in for claude_agent_sdk.query(prompt=..., options=...).
+
+    Agentic runs (options with allowed tools) play `tool_turns` turns that call
+    validate_test_cases, then the final answer; runs without tools (fast mode)
+    answer in a single turn. Each turn takes `turn_latency` seconds.
+    """
+
+    def __init__(
+        self,
+        turn_latency: float = 0.5,
+        tool_turns: int = 1,
+        test_cases: int = 6,
+        jitter: float = 0.2,
+        seed: int = 0,
+    ):
+        self.turn_latency = turn_latency
+        self.tool_turns = tool_turns
+        self.test_cases = test_cases
+        self._jitter = _Jitter(jitter, seed)
+        self.calls = 0
+
+    async def __call__(self, prompt: Any, options: Any = None) -> AsyncIterator[Any]:
+        self.calls += 1
+        started = time.monotonic()
+        feature = _feature_from_prompt(await prompt_text(prompt))
+        tool_turns = self.tool_turns if getattr(options, "allowed_tools", None) else 0
+
+        api_seconds = 0.0
+        for turn in range(tool_turns):
+            api_seconds += await self._turn()
+            tool_use_id = f"toolu_bench_{self.calls}_{turn}"
+            yield AssistantMessage(
+                content=[
+                    TextBlock(text="Validating the drafted test cases."),
+                    ToolUseBlock(
+                        id=tool_use_id,
+                        name="mcp__test-case-tools__validate_test_cases",
+                        input={"test_cases": sample_test_cases(self.test_cases, feature)},
+                    ),
+                ],
+                model=FAKE_MODEL,
+            )
+            yield UserMessage(content=[
+                ToolResultBlock(
+                    tool_use_id=tool_use_id,
+                    content=json.dumps({"total": self.test_cases, "valid": self.test_cases, "issues": []}),
+                    is_error=False,
+                ),
+            ])
+
+        api_seconds += await self._turn()
+        yield AssistantMessage(content=[TextBlock(text=sample_answer(self.test_cases, feature))], model=FAKE_MODEL)
+        yield ResultMessage(
+            subtype="success",
+            duration_ms=int((time.monotonic() - started) * 1000),
+            duration_api_ms=int(api_seconds * 1000),
+            is_error=False,
+            num_turns=tool_turns + 1,
+            session_id=f"bench-{self.calls}",
+            total_cost_usd=0.0,
+            usage={
+                "input_tokens": 1200 * (tool_turns + 1),
+                "output_tokens": 180 * self.test_cases,
+                "cache_creation_input_tokens": 0,
+                "cache_read_input_tokens": 0,
+            },
+        )
+
+    async def _turn(self) -> float:
+        seconds = self._jitter.scale(self.turn_latency)
+        await asyncio.sleep(seconds)
+        return seconds
+
+
+class _FakeStream:
+    def __init__(self, owner: "FakeAnthropic", answer: str):
+        self._owner = owner
+        self._answer = answer
+        self.text_stream = self._text_stream()
+
+    async def __aenter__(self) -> "_FakeStream":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        return None
+
+    async def _text_stream(self) -> AsyncIterator[str]:
+        owner = self._owner
+        await asyncio.sleep(owner._jitter.scale(owner.first_token_latency))
+        chunk = owner.chunk_chars
+        for start in range(0, len(self._answer), chunk):
+            # ~4 characters per token
+            await asyncio.sleep(owner._jitter.scale(chunk / 4 / owner.tokens_per_second))
+            yield self._answer[start:start + chunk]
+
+    async def get_final_message(self) -> Any:
+        return SimpleNamespace(
+            stop_reason="end_turn",
+            usage=SimpleNamespace(
+                input_tokens=1500,
+                output_tokens=len(self._answer) // 4,
+                cache_creation_input_tokens=0,
+                cache_read_input_tokens=1200,
+            ),
+        )
+
+
+class _FakeMessages:
+    def __init__(self, owner: "FakeAnthropic"):
+        self._owner = owner
+
+    def stream(self, messages: List[Dict], **kwargs) -> _FakeStream:
+        self._owner.calls += 1
+        return _FakeStream(self._owner, sample_answer(self._owner.test_cases, _feature_from_prompt(messages[-1]["content"])))
+
+    async def create(self, messages: List[Dict], **kwargs) -> Any:
+        self._owner.calls += 1
+        await asyncio.sleep(self._owner._jitter.scale(self._owner.first_token_latency))
+        text = sample_answer(self._owner.test_cases, _feature_from_prompt(messages[-1]["content"]))
+        return SimpleNamespace(content=[SimpleNamespace(type="text", text=text)])
+
+
+class FakeAnthropic:
+    """
+    Drop-in for AsyncAnthropic(api_key=..., http_client=...) as used by the direct_api engine.
+    """
+
+    def __init__(
+        self,
+        first_token_latency: float = 0.4,
+        tokens_per_second: float = 200.0,
+        test_cases: int = 6,
+        chunk_chars: int = 64,
+        jitter: float = 0.2,
+        seed: int = 0,
+    ):
+        self.first_token_latency = first_token_latency
+        self.tokens_per_second = tokens_per_second
+        self.test_cases = test_cases
+        self.chunk_chars = chunk_chars
+        self._jitter = _Jitter(jitter, seed)
+        self.messages = _FakeMessages(self)
+        self.calls = 0
+
+    def __call__(self, *args, **kwargs) -> "FakeAnthropic":
+        # Stands in for the AsyncAnthropic class: "constructing" a client returns this fake
+        return self
+
+
+class FakeJira:
+    """
+    Drop-in for jira.JIRA(server=..., basic_auth=..., ...) as used by JiraService.
+    """
+
+    def __init__(self, latency: float = 0.15, criteria_per_issue: int = 4, jitter: float = 0.2, seed: int = 0):
+        self.latency = latency
+        self.criteria_per_issue = criteria_per_issue
+        self._jitter = _Jitter(jitter, seed)
+        self.calls = 0
+        # JiraService sizes the requests session's connection pool
+        self._session = requests.Session()
+
+    def __call__(self, *args, **kwargs) -> "FakeJira":
+        # Stands in for the JIRA class: "constructing" a client returns this fake
+        return self
+
+    def issue(self, issue_key: str, fields: Optional[str] = None) -> Any:
+        self._wait()
+        return self._issue(issue_key)
+
+    def search_issues(self, jql: str, startAt: int = 0, maxResults: int = 50, fields: Any = None) -> List[Any]:
+        self._wait()
+        keys = re.findall(r"[A-Z][A-Z0-9]+-\d+", jql)
+        page = _Page(self._issue(key) for key in keys[startAt:startAt + maxResults])
+        page.total = len(keys)
+        return page
+
+    def close(self) -> None:
+        self._session.close()
+
+    def _wait(self) -> None:
+        self.calls += 1
+        time.sleep(self._jitter.scale(self.latency))
+
+    def _issue(self, issue_key: str) -> Any:
+        criteria = "\n".join(f"- Criterion {number} of {issue_key}" for number in range(1, self.criteria_per_issue + 1))
+        return SimpleNamespace(
+            key=issue_key,
+            fields=SimpleNamespace(
+                summary=f"Feature {issue_key}",
+                description=f"Benchmark story {issue_key}.\n\nAcceptance Criteria:\n{criteria}",
+                issuetype=SimpleNamespace(name="Story"),
+                status=SimpleNamespace(name="To Do"),
+                priority=SimpleNamespace(name="Medium"),
+                updated="2025-01-01T00:00:00.000+0000",
+                customfield_10100=None,
+            ),
+        )
+
+
+class _Page(list):
+    total: Optional[int] = None
@@ -0,0 +1,122 @@
+"""
+Run the FastAPI app fully offline against the fakes in benchmarks.fakes.
+
+offline_service() points the settings at placeholder credentials, swaps
+claude_agent_sdk.query, AsyncAnthropic and jira.JIRA for fakes where the
+service looks them up, and resets the process-wide singletons (agent,
+JIRA client, result cache, admission controller) on entry and exit so each
+benchmark starts cold and leaves nothing behind.
+"""
+
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+from unittest import mock
+import os
+
+from app.agents import test_case_generator_agent, test_case_generator_agent_simple
+from app.agents.agent_provider import reset_shared_agent
+from app.agents.test_case_generator_agent_simple import close_shared_http_client
+from app.config import get_settings
+from app.services import (
+    close_shared_jira_service,
+    close_shared_result_cache,
+    jira_service,
+    reset_shared_admission_controller,
+)
+from .fakes import FakeAnthropic, FakeJira, FakeQuery
+from .load import GENERATE_PATH, STREAM_PATH, jira_payload, manual_payload, run_load
+
+# Settings every offline run needs; callers can override any of them
+OFFLINE_SETTINGS = {
+    "anthropic_api_key": "offline-benchmark",
+    "jira_url": "https://jira.invalid",
+    "jira_email": "bench@example.invalid",
+    "jira_api_token": "offline-benchmark",
+    "agent_pool_enabled": "false",  # Pooled sessions talk to the CLI directly, not through query()
+    "result_cache_db_path": "",
+    "agent_replay_dir": "",  # The harness supplies query(); pass a ReplayQuery to replay recordings
+}
+
+
+def _reset_shared_state() -> None:
+    get_settings.cache_clear()
+    reset_shared_agent()
+    close_shared_jira_service()
+    close_shared_result_cache()
+    reset_shared_admission_controller()
+
+
+@asynccontextmanager
+async def offline_service(
+    engine: str = "agent_sdk",
+    query: Optional[Any] = None,
+    anthropic: Optional[FakeAnthropic] = None,
+    jira: Optional[FakeJira] = None,
+    settings: Optional[Dict[str, Any]] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yield {"app", "query", "anthropic", "jira"} with the fakes installed.
+    `query` is a FakeQuery or a ReplayQuery of recorded sessions.
+    `settings` overrides Settings fields by name (e.g. {"admission_max_concurrent": 16}).
+    """
+    fakes = {
+        "query": query or FakeQuery(),
+        "anthropic": anthropic or FakeAnthropic(),
+        "jira": jira or FakeJira(),
+    }
+    values = {**OFFLINE_SETTINGS, "generation_engine": engine, **(settings or {})}
+    environment = {name.upper(): str(value) for name, value in values.items()}
+
+    with mock.patch.dict(os.environ, environment), \
+            mock.patch.object(test_case_generator_agent, "query", fakes["query"]), \
+            mock.patch.object(test_case_generator_agent_simple, "AsyncAnthropic", fakes["anthropic"]), \
+            mock.patch.object(jira_service, "JIRA", fakes["jira"]):
+        # Imported here so the app's startup state is built under the patched settings
+        from app.main import app
+
+        _reset_shared_state()
+        try:
+            yield {"app": app, **fakes}
+        finally:
+            await close_shared_http_client()
+            _reset_shared_state()
+
+
+async def run_benchmark(
+    engine: str = "agent_sdk",
+    total_requests: int = 50,
+    concurrency: int = 10,
+    use_jira: bool = False,
+    stream: bool = False,
+    mode: str = "agentic",
+    query: Optional[Any] = None,
+    anthropic: Optional[FakeAnthropic] = None,
+    jira: Optional[FakeJira] = None,
+    settings: Optional[Dict[str, Any]] = None,
+    trace_memory: bool = False,
+) -> Dict[str, Any]:
+    """
+    Run one load test against the offline service and return its report.
+    """
+    payload_factory = jira_payload if use_jira else manual_payload
+
+    def payload(index: int) -> Dict[str, Any]:
+        return payload_factory(index, mode=mode)
+
+    async with offline_service(engine, query=query, anthropic=anthropic, jira=jira, settings=settings) as service:
+        report = await run_load(
+            service["app"],
+            total_requests=total_requests,
+            concurrency=concurrency,
+            payload=payload,
+            path=STREAM_PATH if stream else GENERATE_PATH,
+            trace_memory=trace_memory,
+        )
+        report["engine"] = engine
+        report["mode"] = mode
+        report["backend_calls"] = {
+            "query": service["query"].calls,
+            "anthropic": service["anthropic"].calls,
+            "jira": service["jira"].calls,
+        }
+    return report
@@ -0,0 +1,84 @@
+"""
+Import-time benchmark: how long a fresh interpreter takes to import the app.
+
+Each run is a new subprocess, so nothing is cached in sys.modules. Reports
+the median and worst import time, and which heavy SDKs were imported along
+the way (they should all be deferred to first use or the startup warm-up).
+
+    python -m benchmarks.import_time --runs 5 --budget-ms 800
+"""
+
+from typing import Dict, List
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Loaded lazily by the service; importing app.main must not pull these in
+HEAVY_MODULES = ("claude_agent_sdk", "anthropic", "jira", "requests")
+
+# Median cold import of app.main. FastAPI alone takes a few hundred ms on a
+# slow runner; importing the SDKs eagerly roughly doubles the total.
+DEFAULT_BUDGET_MS = 2000.0
+
+_PROBE = """
+import importlib, json, sys, time
+started = time.perf_counter()
+importlib.import_module(sys.argv[1])
+seconds = time.perf_counter() - started
+heavy = [name for name in sys.argv[2:] if name in sys.modules]
+print(json.dumps({"seconds": seconds, "heavy_modules": heavy}))
+"""
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_import(module: str = "app.main") -> Dict:
+    """
+    Import `module` in a fresh interpreter; returns {"seconds", "heavy_modules"}.
+    """
+    completed = subprocess.run(
+        [sys.executable, "-c", _PROBE, module, *HEAVY_MODULES],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def run_import_benchmark(module: str = "app.main", runs: int = 5) -> Dict:
+    samples: List[Dict] = [measure_import(module) for _ in range(runs)]
+    seconds = [sample["seconds"] for sample in samples]
+    return {
+        "module": module,
+        "runs": runs,
+        "median_ms": round(statistics.median(seconds) * 1000, 1),
+        "max_ms": round(max(seconds) * 1000, 1),
+        "heavy_modules": sorted({name for sample in samples for name in sample["heavy_modules"]}),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure how long importing the app takes")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Exit non-zero when the median exceeds this (0 = no budget)")
+    args = parser.parse_args()
+
+    report = run_import_benchmark(args.module, args.runs)
+    print(json.dumps(report, indent=2))
+
+    failed = bool(report["heavy_modules"])
+    if args.budget_ms and report["median_ms"] > args.budget_ms:
+        print(f"Import time {report['median_ms']}ms is over the {args.budget_ms}ms budget", file=sys.stderr)
+        failed = True
+    if report["heavy_modules"]:
+        print(f"Imported eagerly: {', '.join(report['heavy_modules'])}", file=sys.stderr)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
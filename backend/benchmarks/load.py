@@ -0,0 +1,200 @@
+"""
+Load generator for the in-process app.
+
+Requests go through httpx's ASGITransport, so no socket or server process
+is involved and the numbers reflect the service's own overhead on top of
+the (fake) backend latency. ASGITransport buffers response bodies, so for
+the streaming endpoint latency is measured to the end of the stream.
+"""
+
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+import asyncio
+import math
+import resource
+import sys
+import time
+import tracemalloc
+
+import httpx
+
+GENERATE_PATH = "/api/v1/generate-test-cases"
+STREAM_PATH = "/api/v1/generate-test-cases/stream"
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(math.ceil(fraction * len(sorted_values))) - 1)
+    return sorted_values[max(index, 0)]
+
+
+def _summary_ms(values: List[float]) -> Dict[str, float]:
+    values = sorted(values)
+    return {
+        "p50": round(percentile(values, 0.50) * 1000, 2),
+        "p95": round(percentile(values, 0.95) * 1000, 2),
+        "p99": round(percentile(values, 0.99) * 1000, 2),
+        "max": round(values[-1] * 1000, 2) if values else 0.0,
+        "mean": round(sum(values) / len(values) * 1000, 2) if values else 0.0,
+    }
+
+
+def _max_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+class LoopLagMonitor:
+    """
+    Measures event loop lag: how late a sleep of `interval` seconds wakes up.
+    Sustained lag means something is blocking the loop.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - started - self.interval))
+
+
+def manual_payload(index: int, **options) -> Dict[str, Any]:
+    """
+    A manual-input request; titles differ per request so runs are not coalesced.
+    """
+    return {
+        "manual_input": {
+            "title": f"Benchmark feature {index}",
+            "description": "Users can reset their password from the login page",
+            "acceptance_criteria": [
+                "User can request a reset link by email",
+                "The link expires after 30 minutes",
+                "The new password must meet the password policy",
+                "User is logged in after a successful reset",
+            ],
+        },
+        "test_types": ["functional"],
+        "cache_policy": "bypass",
+        **options,
+    }
+
+
+def jira_payload(index: int, **options) -> Dict[str, Any]:
+    """
+    A JIRA-backed request for a distinct (fake) issue.
+    """
+    return {
+        "jira_issue": {"issue_key": f"BENCH-{index + 1}"},
+        "test_types": ["functional"],
+        "cache_policy": "bypass",
+        **options,
+    }
+
+
+async def run_load(
+    app: Any,
+    total_requests: int,
+    concurrency: int,
+    payload: Callable[[int], Dict[str, Any]] = manual_payload,
+    path: str = GENERATE_PATH,
+    trace_memory: bool = False,
+    timeout: float = 600.0,
+) -> Dict[str, Any]:
+    """
+    Send `total_requests` requests with at most `concurrency` in flight and
+    report throughput, latency percentiles, event loop lag and memory.
+    """
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    test_cases = 0
+    next_index = 0
+
+    lag = LoopLagMonitor()
+    if trace_memory:
+        tracemalloc.start()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=timeout) as client:
+
+        async def worker() -> None:
+            nonlocal next_index, test_cases
+            while next_index < total_requests:
+                index = next_index
+                next_index += 1
+                started = time.perf_counter()
+                try:
+                    response = await client.post(path, json=payload(index))
+                    status = str(response.status_code)
+                    if response.status_code == 200 and path == GENERATE_PATH:
+                        test_cases += len(response.json().get("test_cases", []))
+                    elif response.status_code == 200:
+                        test_cases += response.text.count("event: test_case")
+                except Exception as e:
+                    status = type(e).__name__
+                latencies.append(time.perf_counter() - started)
+                statuses[status] += 1
+
+        lag.start()
+        started = time.perf_counter()
+        await asyncio.gather(*[worker() for _ in range(max(1, min(concurrency, total_requests)))])
+        duration = time.perf_counter() - started
+        await lag.stop()
+
+    memory = {"max_rss_mb": _max_rss_mb()}
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        memory["peak_traced_mb"] = round(peak / (1024 * 1024), 1)
+
+    return {
+        "path": path,
+        "requests": total_requests,
+        "concurrency": concurrency,
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(total_requests / duration, 2) if duration > 0 else 0.0,
+        "status": dict(statuses),
+        "test_cases": test_cases,
+        "latency_ms": _summary_ms(latencies),
+        "event_loop_lag_ms": _summary_ms(lag.samples),
+        "memory": memory,
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """
+    Human-readable summary of a run_load() report.
+    """
+    latency = report["latency_ms"]
+    lag = report["event_loop_lag_ms"]
+    lines = [
+        f"{report['path']}: {report['requests']} requests at concurrency {report['concurrency']} "
+        f"in {report['duration_s']}s ({report['throughput_rps']} req/s)",
+        f"  status:          {report['status']}",
+        f"  test cases:      {report['test_cases']}",
+        f"  latency ms:      p50 {latency['p50']}  p95 {latency['p95']}  p99 {latency['p99']}  max {latency['max']}",
+        f"  loop lag ms:     p50 {lag['p50']}  p99 {lag['p99']}  max {lag['max']}",
+        f"  memory:          {report['memory']}",
+    ]
+    if "backend_calls" in report:
+        lines.append(f"  backend calls:   {report['backend_calls']}")
+    return "\n".join(lines)
@@ -0,0 +1,184 @@
+"""
+Micro-benchmarks of the non-LLM parts of the pipeline, driven by recorded
+agent sessions (see app.agents.recording).
+
+    python -m benchmarks.micro --recordings data/recordings
+
+Stages measured, per operation:
+- prompt_build: TestCaseGeneratorAgent._build_agent_task
+- message_handling: _message_events over a recorded message stream
+  (incremental parsing, tool bookkeeping, metrics, the final result)
+- parse: feeding the final assistant text to the streaming parser and
+  building the result with _parser_result
+- response_assembly: routes._build_response on the parsed result
+
+Without --recordings, sessions are first recorded from FakeQuery into a
+temporary directory, so the suite also runs on a machine with no traffic.
+"""
+
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+
+from app.agents.recording import ReplayQuery, SessionRecorder, message_from_dict
+from app.agents.streaming_parser import StreamingTestCaseParser
+from app.agents.test_case_generator_agent import (
+    AssistantMessage,
+    TextBlock,
+    TestCaseGeneratorAgent,
+    create_agent_options,
+)
+from app.api.routes import _build_response
+from app.models import GenerationOptions
+from .fakes import FakeQuery
+from .load import percentile
+
+SAMPLE_INPUT = {
+    "title": "Password reset",
+    "description": "Users can reset their password from the login page",
+    "acceptance_criteria": [
+        "User can request a reset link by email",
+        "The link expires after 30 minutes",
+        "The new password must meet the password policy",
+        "User is logged in after a successful reset",
+    ],
+    "test_types": ["functional", "api"],
+    "include_edge_cases": True,
+    "include_negative_tests": True,
+}
+
+
+async def record_fake_sessions(record_dir: str, count: int = 5, test_cases: int = 8) -> None:
+    """
+    Record `count` FakeQuery sessions into record_dir.
+    """
+    recorder = SessionRecorder(record_dir)
+    fake = FakeQuery(turn_latency=0, tool_turns=2, test_cases=test_cases, jitter=0)
+    options = create_agent_options()
+    for index in range(count):
+        prompt = f"**Feature Title:** Recorded feature {index}"
+        async for _ in recorder.record(prompt, options, fake(prompt, options)):
+            pass
+
+
+def _summary(samples: List[float]) -> Dict[str, float]:
+    samples = sorted(samples)
+    return {
+        "ops": len(samples),
+        "mean_us": round(sum(samples) / len(samples) * 1e6, 1),
+        "p50_us": round(percentile(samples, 0.50) * 1e6, 1),
+        "p95_us": round(percentile(samples, 0.95) * 1e6, 1),
+    }
+
+
+def _measure(operation: Callable[[], Any], iterations: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        operation()
+        samples.append(time.perf_counter() - started)
+    return _summary(samples)
+
+
+async def _measure_async(operation: Callable[[], Any], iterations: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await operation()
+        samples.append(time.perf_counter() - started)
+    return _summary(samples)
+
+
+async def _iterate(messages: List[Any]) -> AsyncIterator[Any]:
+    for message in messages:
+        yield message
+
+
+def _final_text(messages: List[Any]) -> str:
+    texts = [
+        block.text
+        for message in messages if isinstance(message, AssistantMessage)
+        for block in message.content if isinstance(block, TextBlock)
+    ]
+    return "\n".join(texts)
+
+
+async def run_micro_benchmarks(replay: ReplayQuery, iterations: int = 200) -> Dict[str, Dict[str, float]]:
+    """
+    Time each stage over the recorded sessions; returns per-stage summaries.
+    """
+    agent = TestCaseGeneratorAgent(api_key="offline-benchmark", replay=replay)
+    # Deserialize up front so only the pipeline's own work is timed
+    sessions = [[message_from_dict(data) for _, data in recording["messages"]] for recording in replay.recordings]
+    options = GenerationOptions(test_types=SAMPLE_INPUT["test_types"])
+    results: Dict[str, Dict[str, float]] = {}
+
+    results["prompt_build"] = _measure(
+        lambda: agent._build_agent_task(jira_issue_key=None, **SAMPLE_INPUT), iterations
+    )
+
+    session_cycle = iter(sessions * (iterations // len(sessions) + 1))
+    parsed: List[Dict] = []
+
+    async def handle_session() -> None:
+        async for event in agent._message_events(_iterate(next(session_cycle))):
+            if event["event"] == "complete":
+                parsed.append(event["data"])
+
+    results["message_handling"] = await _measure_async(handle_session, iterations)
+
+    texts = [_final_text(session) for session in sessions]
+    text_cycle = iter(texts * (iterations // len(texts) + 1))
+
+    def parse() -> None:
+        text = next(text_cycle)
+        parser = StreamingTestCaseParser()
+        parser.feed(text)
+        agent._parser_result(parser, text[:1000])
+
+    results["parse"] = _measure(parse, iterations)
+
+    result_cycle = iter(parsed * (iterations // max(len(parsed), 1) + 1))
+    results["response_assembly"] = _measure(
+        lambda: _build_response(options, SAMPLE_INPUT["title"], None, next(result_cycle), {"cache": {"status": "bypass"}}),
+        iterations,
+    )
+    return results
+
+
+def format_results(results: Dict[str, Dict[str, float]]) -> str:
+    lines = [f"{'stage':<20}{'ops':>8}{'mean us':>12}{'p50 us':>12}{'p95 us':>12}"]
+    for stage, summary in results.items():
+        lines.append(
+            f"{stage:<20}{summary['ops']:>8}{summary['mean_us']:>12}{summary['p50_us']:>12}{summary['p95_us']:>12}"
+        )
+    return "\n".join(lines)
+
+
+async def _main(recordings: Optional[str], iterations: int) -> Dict[str, Dict[str, float]]:
+    if recordings is None:
+        with tempfile.TemporaryDirectory() as record_dir:
+            await record_fake_sessions(record_dir)
+            return await run_micro_benchmarks(ReplayQuery.from_dir(record_dir, speed=None), iterations)
+    return await run_micro_benchmarks(ReplayQuery.from_dir(recordings, speed=None), iterations)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks of prompt building, message handling and parsing")
+    parser.add_argument("--recordings", help="Directory of recorded agent sessions (AGENT_RECORD_DIR)")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--json", metavar="PATH", help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(_main(args.recordings, args.iterations))
+    print(format_results(results))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as results_file:
+            json.dump(results, results_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
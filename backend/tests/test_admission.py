@@ -0,0 +1,142 @@
+import asyncio
+
+import pytest
+
+from app.services.admission import AdmissionController, AdmissionRejected
+
+
+async def hold(controller, seconds, running, bounded=True):
+    async with controller.slot(bounded=bounded):
+        running.append(1)
+        await asyncio.sleep(seconds)
+
+
+def test_limits_concurrent_runs():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=2, max_queue=10, max_wait=5)
+        peak = 0
+        active = 0
+
+        async def run():
+            nonlocal peak, active
+            async with controller.slot():
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.02)
+                active -= 1
+
+        await asyncio.gather(*[run() for _ in range(6)])
+        assert peak == 2
+        stats = controller.stats()
+        assert stats["admitted"] == 6
+        assert stats["running"] == 0
+        assert stats["queued"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_rejects_when_queue_is_full():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=1, max_wait=5)
+        running = []
+        first = asyncio.create_task(hold(controller, 0.1, running))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(hold(controller, 0.0, running))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            await controller.acquire()
+        assert rejected.value.retry_after >= 1
+        assert controller.stats()["rejected_queue_full"] == 1
+
+        await asyncio.gather(first, second)
+        assert len(running) == 2
+
+    asyncio.run(scenario())
+
+
+def test_rejects_after_max_wait():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=5, max_wait=0.02)
+        running = []
+        first = asyncio.create_task(hold(controller, 0.1, running))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected):
+            await controller.acquire()
+        stats = controller.stats()
+        assert stats["rejected_timeout"] == 1
+        assert stats["queued"] == 0
+
+        await first
+
+    asyncio.run(scenario())
+
+
+def test_unbounded_callers_wait_past_the_limits():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=0, max_wait=0.01)
+        running = []
+        await asyncio.gather(*[hold(controller, 0.02, running, bounded=False) for _ in range(3)])
+        assert len(running) == 3
+        assert controller.stats()["wait_seconds"]["max"] > 0.01
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_does_not_leak_a_slot():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queue=5, max_wait=5)
+        running = []
+        first = asyncio.create_task(hold(controller, 0.05, running))
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(controller.acquire())
+        await asyncio.sleep(0.01)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+
+        await first
+        assert controller.stats()["running"] == 0
+        await asyncio.wait_for(controller.acquire(), timeout=0.1)
+
+    asyncio.run(scenario())
+
+
+def test_interactive_lane_is_served_ahead_of_bulk_without_starving_it():
+    async def scenario():
+        controller = AdmissionController(
+            max_concurrent=1, max_queue=20, max_wait=5, lane_weights={"interactive": 4, "bulk": 1}
+        )
+        order = []
+
+        async def run(lane):
+            async with controller.slot(lane=lane, bounded=lane == "interactive"):
+                order.append(lane)
+                await asyncio.sleep(0.001)
+
+        await controller.acquire(lane="bulk")
+        tasks = [asyncio.create_task(run("bulk")) for _ in range(6)]
+        await asyncio.sleep(0)
+        tasks += [asyncio.create_task(run("interactive")) for _ in range(8)]
+        await asyncio.sleep(0)
+        controller.release()
+        await asyncio.gather(*tasks)
+
+        first_ten = order[:10]
+        assert first_ten.count("interactive") == 8
+        assert first_ten.count("bulk") == 2
+        lanes = controller.stats()["lanes"]
+        assert lanes["interactive"]["admitted"] == 8
+        assert lanes["bulk"]["admitted"] == 7  # including the slot held up front
+
+    asyncio.run(scenario())
+
+
+def test_unknown_lane_is_rejected():
+    async def scenario():
+        controller = AdmissionController()
+        with pytest.raises(ValueError):
+            await controller.acquire(lane="urgent")
+
+    asyncio.run(scenario())
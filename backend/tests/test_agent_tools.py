@@ -0,0 +1,115 @@
+import asyncio
+import json
+
+from app.agents.test_case_generator_agent import (
+    AssistantMessage,
+    ResultMessage,
+    TestCaseGeneratorAgent,
+    TextBlock,
+    ToolUseBlock,
+    structure_test_cases_tool,
+    validate_test_cases_tool,
+)
+
+MODEL = "claude-sonnet-4-5-20250929"
+
+
+def make_case(title, **overrides):
+    case = {
+        "title": title,
+        "description": "User can log in",
+        "type": "functional",
+        "priority": "high",
+        "steps": [{"step_number": 1, "action": "Submit the form", "expected_result": "Dashboard shown"}],
+        "expected_outcome": "User is logged in",
+    }
+    case.update(overrides)
+    return case
+
+
+def tool_text(response):
+    return json.loads(response["content"][0]["text"])
+
+
+def result_message():
+    return ResultMessage(
+        subtype="success",
+        duration_ms=10,
+        duration_api_ms=8,
+        is_error=False,
+        num_turns=2,
+        session_id="session",
+        usage={"input_tokens": 100, "output_tokens": 50},
+    )
+
+
+def run_events(messages):
+    async def stream():
+        for message in messages:
+            yield message
+
+    async def collect():
+        agent = TestCaseGeneratorAgent(api_key="offline")
+        return [event async for event in agent._message_events(stream())]
+
+    return asyncio.run(collect())
+
+
+def test_batch_validator_reports_only_bad_cases():
+    cases = [make_case("Valid"), make_case("No steps", steps=[]), "not a test case"]
+
+    report = tool_text(asyncio.run(validate_test_cases_tool.handler({"test_cases": cases})))
+
+    assert report["total"] == 3
+    assert report["valid"] == 1
+    assert report["issues"] == [
+        {"index": 1, "missing": ["steps"]},
+        {"index": 2, "missing": ["title", "description", "type", "priority", "steps", "expected_outcome"]},
+    ]
+
+
+def test_reply_with_a_result_handle_returns_the_stored_cases():
+    cases = [make_case("Login"), make_case("Logout")]
+    stored = tool_text(asyncio.run(structure_test_cases_tool.handler(
+        {"test_cases": cases, "coverage_summary": "Happy paths"}
+    )))
+
+    events = run_events([
+        AssistantMessage(content=[TextBlock(text=json.dumps({"result_handle": stored["result_handle"]}))], model=MODEL),
+        result_message(),
+    ])
+
+    complete = events[-1]["data"]
+    assert complete["test_cases"] == cases
+    assert complete["coverage_summary"] == "Happy paths"
+    assert complete["usage"]["input_tokens"] == 100
+    assert [event["data"]["title"] for event in events if event["event"] == "test_case"] == ["Login", "Logout"]
+
+
+def test_tool_arguments_are_used_when_the_handle_is_missing():
+    cases = [make_case("Login")]
+    events = run_events([
+        AssistantMessage(content=[ToolUseBlock(
+            id="tool-1",
+            name="mcp__test-case-tools__structure_test_cases",
+            input={"test_cases": cases, "coverage_summary": "From the tool call"},
+        )], model=MODEL),
+        AssistantMessage(content=[TextBlock(text="Done, the test cases are stored.")], model=MODEL),
+        result_message(),
+    ])
+
+    complete = events[-1]["data"]
+    assert complete["test_cases"] == cases
+    assert complete["coverage_summary"] == "From the tool call"
+    assert events[0]["data"]["tool_uses"] == ["mcp__test-case-tools__structure_test_cases"]
+
+
+def test_unknown_handle_without_tool_call_yields_no_test_cases():
+    events = run_events([
+        AssistantMessage(content=[TextBlock(text='{"result_handle": "tc_missing"}')], model=MODEL),
+        result_message(),
+    ])
+
+    complete = events[-1]["data"]
+    assert complete["test_cases"] == []
+    assert complete["raw_output"] == '{"result_handle": "tc_missing"}'
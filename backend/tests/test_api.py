@@ -1,6 +1,16 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
 import pytest
+from fastapi import Request
 from fastapi.testclient import TestClient
 from app.main import app
+from app.api.routes import generate_test_cases_stream, get_agent, get_jira_service
+from app.config import get_settings
+from app.models import ManualInput, TestCaseGenerationRequest
+from app.services import get_shared_admission_controller, reset_shared_admission_controller
+from app.services.metrics import GENERATION_REQUESTS, JIRA_FETCH_SECONDS, REQUESTS_IN_FLIGHT
 
 client = TestClient(app)
 
@@ -56,8 +66,327 @@ def test_generate_test_cases_with_manual_input():
     assert response.status_code in [200, 500]  # 500 if API key is missing
 
 
+def test_generate_test_cases_batch_empty():
+    """Test that a batch request without any items is rejected."""
+    response = client.post(
+        "/api/v1/generate-test-cases/batch",
+        json={
+            "jira_issue_keys": [],
+            "manual_inputs": [],
+        }
+    )
+    assert response.status_code == 400
+
+
 @pytest.mark.asyncio
 async def test_api_docs():
     """Test that API documentation is accessible."""
     response = client.get("/docs")
     assert response.status_code == 200
+
+
+def test_generate_test_cases_batch_rejects_malformed_issue_keys():
+    """Test that issue keys that could rewrite the JQL query are rejected."""
+    response = client.post(
+        "/api/v1/generate-test-cases/batch",
+        json={"jira_issue_keys": ["PROJ-1", "X-1) OR project = SECRET"]},
+    )
+    assert response.status_code == 400
+    assert "X-1) OR project = SECRET" in response.json()["detail"]
+
+
+def test_stream_releases_its_run_slot_when_the_body_is_never_read():
+    """Test that a client gone before streaming starts does not leak the run slot."""
+    async def scenario():
+        reset_shared_admission_controller()
+        request = TestCaseGenerationRequest(
+            manual_input=ManualInput(title="Login", description="User logs in", acceptance_criteria=["Works"]),
+            cache_policy="bypass",
+        )
+        agent = SimpleNamespace(model="offline", PROMPT_VERSION="test")
+        in_flight = REQUESTS_IN_FLIGHT.value(endpoint="stream")
+        disconnected = GENERATION_REQUESTS.value(endpoint="stream", outcome="disconnected")
+        response = await generate_test_cases_stream(request, http_request=None, jira_service=None, agent=agent)
+        admission = get_shared_admission_controller(get_settings())
+        assert admission.stats()["running"] == 1
+        assert REQUESTS_IN_FLIGHT.value(endpoint="stream") == in_flight + 1
+
+        async def receive():
+            await asyncio.sleep(0.01)
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            # A client that never reads: the response start never gets through
+            await asyncio.Event().wait()
+
+        await response({"type": "http"}, receive, send)
+        assert admission.stats()["running"] == 0
+        assert REQUESTS_IN_FLIGHT.value(endpoint="stream") == in_flight
+        assert GENERATION_REQUESTS.value(endpoint="stream", outcome="disconnected") == disconnected + 1
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        reset_shared_admission_controller()
+
+
+class StreamingAgent:
+    """Streaming agent stand-in; titles starting with "fail" error after the first test case."""
+
+    model = "offline"
+    PROMPT_VERSION = "test"
+
+    def __init__(self):
+        self.calls = 0
+        self.closed = False
+        self.running_slots = []
+
+    async def stream_test_cases(self, title, **kwargs):
+        self.calls += 1
+        self.running_slots.append(get_shared_admission_controller(get_settings()).stats()["running"])
+        try:
+            yield {"event": "progress", "data": {"stage": "generating"}}
+            cases = [{"title": f"{title} works"}, {"title": f"{title} rejects bad input"}]
+            for case in cases:
+                yield {"event": "test_case", "data": case}
+                if title.startswith("fail"):
+                    raise RuntimeError(f"agent failed on {title}")
+            yield {"event": "complete", "data": {"test_cases": cases, "coverage_summary": "Happy path"}}
+        finally:
+            self.closed = True
+
+
+def post_stream(agent, title, cache_policy="use"):
+    """POST to the SSE endpoint and return the response plus its parsed (event, data) pairs."""
+    app.dependency_overrides[get_agent] = lambda: agent
+    try:
+        response = client.post(
+            "/api/v1/generate-test-cases/stream",
+            json={"manual_input": manual(title), "cache_policy": cache_policy},
+        )
+    finally:
+        app.dependency_overrides.clear()
+    assert response.text.endswith("\n\n")
+    events = []
+    for frame in response.text[:-2].split("\n\n"):
+        event_line, data_line = frame.split("\n")
+        assert event_line.startswith("event: ") and data_line.startswith("data: ")
+        events.append((event_line[len("event: "):], json.loads(data_line[len("data: "):])))
+    return response, events
+
+
+def test_stream_emits_framed_events_and_serves_repeats_from_cache():
+    """Test SSE framing end to end, then the cache-hit path for the same input."""
+    reset_shared_admission_controller()
+    agent = StreamingAgent()
+    successes = GENERATION_REQUESTS.value(endpoint="stream", outcome="success")
+    try:
+        response, events = post_stream(agent, "Stream checkout")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert [name for name, _ in events] == ["progress", "test_case", "test_case", "complete"]
+        assert events[1][1] == {"title": "Stream checkout works"}
+        complete = events[-1][1]
+        assert [case["title"] for case in complete["test_cases"]] == ["Stream checkout works", "Stream checkout rejects bad input"]
+        assert complete["generation_metadata"]["cache"]["status"] == "miss"
+
+        # The run held a slot while streaming, and finish_stream gave it back
+        assert agent.running_slots == [1]
+        assert get_shared_admission_controller(get_settings()).stats()["running"] == 0
+
+        response, events = post_stream(agent, "Stream checkout")
+        assert agent.calls == 1
+        assert [name for name, _ in events] == ["test_case", "test_case", "complete"]
+        assert events[-1][1]["generation_metadata"]["cache"]["status"] == "hit"
+        assert GENERATION_REQUESTS.value(endpoint="stream", outcome="success") == successes + 2
+    finally:
+        reset_shared_admission_controller()
+
+
+def test_stream_reports_agent_errors_as_an_error_event():
+    """Test that a failure mid-stream ends with an error event and frees the run slot."""
+    reset_shared_admission_controller()
+    agent = StreamingAgent()
+    errors = GENERATION_REQUESTS.value(endpoint="stream", outcome="error")
+    try:
+        response, events = post_stream(agent, "fail export", cache_policy="bypass")
+        assert response.status_code == 200
+        assert [name for name, _ in events] == ["progress", "test_case", "error"]
+        assert events[-1][1] == {"detail": "agent failed on fail export"}
+        assert agent.closed
+        assert get_shared_admission_controller(get_settings()).stats()["running"] == 0
+        assert GENERATION_REQUESTS.value(endpoint="stream", outcome="error") == errors + 1
+    finally:
+        reset_shared_admission_controller()
+
+
+def test_stream_stops_the_agent_when_the_client_disconnects(monkeypatch):
+    """Test that a disconnect mid-stream closes the agent stream and frees the run slot."""
+    checks = []
+
+    async def is_disconnected(self):
+        # Connected for the first event, gone by the second
+        checks.append(True)
+        return len(checks) > 1
+
+    monkeypatch.setattr(Request, "is_disconnected", is_disconnected)
+    reset_shared_admission_controller()
+    agent = StreamingAgent()
+    disconnected = GENERATION_REQUESTS.value(endpoint="stream", outcome="disconnected")
+    try:
+        _, events = post_stream(agent, "Stream logout", cache_policy="bypass")
+        assert [name for name, _ in events] == ["progress"]
+        assert agent.closed
+        assert get_shared_admission_controller(get_settings()).stats()["running"] == 0
+        assert GENERATION_REQUESTS.value(endpoint="stream", outcome="disconnected") == disconnected + 1
+    finally:
+        reset_shared_admission_controller()
+
+
+def test_reload_settings_is_disabled_without_an_admin_token(monkeypatch):
+    """Test that the admin endpoint refuses every call until ADMIN_TOKEN is configured."""
+    monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+    get_settings.cache_clear()
+    try:
+        response = client.post("/api/v1/admin/reload-settings", headers={"X-Admin-Token": "anything"})
+    finally:
+        get_settings.cache_clear()
+    assert response.status_code == 403
+
+
+def test_reload_settings_requires_the_admin_token(monkeypatch):
+    """Test that the admin endpoint needs the configured token in X-Admin-Token."""
+    monkeypatch.setenv("ADMIN_TOKEN", "s3cret")
+    get_settings.cache_clear()
+    try:
+        assert client.post("/api/v1/admin/reload-settings").status_code == 401
+        assert client.post(
+            "/api/v1/admin/reload-settings", headers={"X-Admin-Token": "wrong"}
+        ).status_code == 401
+    finally:
+        get_settings.cache_clear()
+
+
+class StubAgent:
+    """Agent stand-in for batch tests; titles starting with "fail" raise."""
+
+    model = "offline"
+    PROMPT_VERSION = "test"
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.running = 0
+        self.peak = 0
+        self.titles = []
+
+    async def generate_test_cases(self, title, **kwargs):
+        self.titles.append(title)
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+            if title.startswith("fail"):
+                raise RuntimeError(f"agent failed on {title}")
+            return {"test_cases": [{"title": f"{title} works"}], "coverage_summary": "Happy path"}
+        finally:
+            self.running -= 1
+
+
+def post_batch(agent, payload, overrides=None):
+    app.dependency_overrides[get_agent] = lambda: agent
+    app.dependency_overrides.update(overrides or {})
+    try:
+        return client.post("/api/v1/generate-test-cases/batch", json={"cache_policy": "bypass", **payload})
+    finally:
+        app.dependency_overrides.clear()
+
+
+def manual(title):
+    return {"title": title, "description": f"{title} description", "acceptance_criteria": ["It works"]}
+
+
+def test_batch_metrics_outcome_reflects_failed_items():
+    """Test that a batch with failed items is not counted as a success."""
+    partial = GENERATION_REQUESTS.value(endpoint="batch", outcome="partial")
+    failed = GENERATION_REQUESTS.value(endpoint="batch", outcome="error")
+
+    assert post_batch(StubAgent(), {"manual_inputs": [manual("Login"), manual("fail logout")]}).status_code == 200
+    assert post_batch(StubAgent(), {"manual_inputs": [manual("fail login")]}).status_code == 200
+
+    assert GENERATION_REQUESTS.value(endpoint="batch", outcome="partial") == partial + 1
+    assert GENERATION_REQUESTS.value(endpoint="batch", outcome="error") == failed + 1
+
+
+class StubJira:
+    """JiraService stand-in that knows PROJ-1 and PROJ-2 only."""
+
+    async def get_issues_details_async(self, issue_keys):
+        known = {
+            key.upper(): {
+                "key": key.upper(),
+                "summary": f"Story {key.upper()}",
+                "description": "From JIRA",
+                "acceptance_criteria": ["It works"],
+            }
+            for key in issue_keys
+            if key.upper() in ("PROJ-1", "PROJ-2")
+        }
+        return known
+
+    async def get_issue_details_async(self, issue_key):
+        known = await self.get_issues_details_async([issue_key])
+        if not known:
+            raise Exception(f"Issue {issue_key} not found")
+        return known[issue_key.upper()]
+
+
+def test_jira_issue_endpoint_records_fetch_metrics():
+    """Test that the debug issue endpoint is timed like the other JIRA fetches."""
+    succeeded = JIRA_FETCH_SECONDS.count(operation="issue", outcome="success")
+    failed = JIRA_FETCH_SECONDS.count(operation="issue", outcome="error")
+    app.dependency_overrides[get_jira_service] = lambda: StubJira()
+    try:
+        assert client.get("/api/v1/jira/issue/PROJ-1").json()["key"] == "PROJ-1"
+        assert client.get("/api/v1/jira/issue/PROJ-404").status_code == 500
+    finally:
+        app.dependency_overrides.clear()
+
+    assert JIRA_FETCH_SECONDS.count(operation="issue", outcome="success") == succeeded + 1
+    assert JIRA_FETCH_SECONDS.count(operation="issue", outcome="error") == failed + 1
+
+
+def test_batch_runs_jira_and_manual_items_with_per_item_errors():
+    """Test a mixed batch: each item gets its own result and failures stay per item."""
+    agent = StubAgent()
+    response = post_batch(
+        agent,
+        {"jira_issue_keys": ["proj-1", "PROJ-2", "PROJ-404"], "manual_inputs": [manual("Search"), manual("fail export")]},
+        overrides={get_jira_service: lambda: StubJira()},
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["total"], body["succeeded"], body["failed"]) == (5, 3, 2)
+    results = body["results"]
+    assert [item["index"] for item in results] == [0, 1, 2, 3, 4]
+    assert [item["status"] for item in results] == ["success", "success", "error", "success", "error"]
+    assert results[0]["result"]["issue_key"] == "PROJ-1"
+    assert results[0]["result"]["test_cases"] == [{"title": "Story PROJ-1 works"}]
+    assert results[2]["error"] == "Failed to fetch JIRA issue: PROJ-404"
+    assert results[4]["error"] == "agent failed on fail export"
+    assert sorted(agent.titles) == ["Search", "Story PROJ-1", "Story PROJ-2", "fail export"]
+
+
+def test_batch_parallelism_is_bounded(monkeypatch):
+    """Test that no more than BATCH_MAX_PARALLELISM items run at once."""
+    monkeypatch.setenv("BATCH_MAX_PARALLELISM", "2")
+    get_settings.cache_clear()
+    agent = StubAgent(delay=0.02)
+    try:
+        response = post_batch(agent, {"manual_inputs": [manual(f"Feature {n}") for n in range(6)]})
+    finally:
+        get_settings.cache_clear()
+
+    assert response.status_code == 200
+    assert response.json()["succeeded"] == 6
+    assert agent.peak == 2
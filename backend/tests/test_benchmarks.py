@@ -0,0 +1,41 @@
+import asyncio
+
+from benchmarks import FakeAnthropic, FakeJira, FakeQuery, run_benchmark
+
+
+def fast_fakes(**overrides):
+    fakes = {
+        "query": FakeQuery(turn_latency=0, test_cases=3, jitter=0),
+        "anthropic": FakeAnthropic(first_token_latency=0, tokens_per_second=1e9, test_cases=3, jitter=0),
+        "jira": FakeJira(latency=0, jitter=0),
+    }
+    fakes.update(overrides)
+    return fakes
+
+
+def test_agent_sdk_engine_runs_offline():
+    report = asyncio.run(run_benchmark(engine="agent_sdk", total_requests=6, concurrency=3, **fast_fakes()))
+
+    assert report["status"] == {"200": 6}
+    assert report["test_cases"] == 18
+    assert report["backend_calls"]["query"] == 6
+    assert report["latency_ms"]["p99"] >= report["latency_ms"]["p50"]
+
+
+def test_direct_api_engine_with_jira_input():
+    report = asyncio.run(run_benchmark(
+        engine="direct_api", total_requests=4, concurrency=2, use_jira=True, **fast_fakes()
+    ))
+
+    assert report["status"] == {"200": 4}
+    assert report["backend_calls"]["anthropic"] == 4
+    assert report["backend_calls"]["jira"] == 4
+
+
+def test_stream_endpoint_in_fast_mode():
+    report = asyncio.run(run_benchmark(
+        engine="agent_sdk", total_requests=2, concurrency=2, stream=True, mode="fast", **fast_fakes()
+    ))
+
+    assert report["status"] == {"200": 2}
+    assert report["test_cases"] == 6
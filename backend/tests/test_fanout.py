@@ -0,0 +1,161 @@
+import asyncio
+
+import pytest
+
+from app.agents.fanout import FanOutGenerator, MergedTestCases, shard_criteria
+from app.services.admission import AdmissionController, AdmissionRejected
+
+
+class FakeGenerator:
+    model = "test-model"
+    PROMPT_VERSION = "1"
+    ENGINE = "fake"
+
+    def __init__(self, delay=0.05, fail_on=None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+
+    async def stream_test_cases(self, acceptance_criteria, **kwargs):
+        self.calls.append(list(acceptance_criteria))
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.fail_on in acceptance_criteria:
+                raise RuntimeError("boom")
+            cases = [
+                {
+                    "id": "TC-001",
+                    "title": f"Verify {ac}",
+                    "steps": [{"step_number": 1, "action": f"Check {ac}", "expected_result": "ok"}],
+                }
+                for ac in acceptance_criteria
+            ]
+            # Every shard also repeats the same happy path case
+            cases.append({
+                "id": "TC-099",
+                "title": "Happy path login",
+                "steps": [{"step_number": 1, "action": "Log in", "expected_result": "ok"}],
+            })
+            for case in cases:
+                yield {"event": "test_case", "data": case}
+            yield {
+                "event": "complete",
+                "data": {
+                    "test_cases": cases,
+                    "coverage_summary": f"Covers {', '.join(acceptance_criteria)}",
+                    "usage": {"input_tokens": 10, "output_tokens": 5},
+                },
+            }
+        finally:
+            self.active -= 1
+
+
+def generate(generator, criteria):
+    return asyncio.run(generator.generate_test_cases(
+        title="Login",
+        description="User logs in",
+        acceptance_criteria=criteria,
+        test_types=["functional"],
+    ))
+
+
+def test_shard_criteria():
+    assert shard_criteria(["a", "b", "c", "d", "e"], 2) == [["a", "b"], ["c", "d"], ["e"]]
+    assert shard_criteria([], 3) == []
+
+
+def test_merge_drops_near_duplicates_and_renumbers():
+    merger = MergedTestCases(similarity_threshold=0.9)
+    first = merger.add({"id": "TC-007", "title": "Login with valid password", "steps": ["Enter password"]})
+    duplicate = merger.add({"id": "TC-003", "title": "Login with valid password.", "steps": ["Enter password"]})
+    second = merger.add({"id": "TC-003", "title": "Login with expired password", "steps": ["Enter old password"]})
+
+    assert first["id"] == "TC-001"
+    assert duplicate is None
+    assert second["id"] == "TC-002"
+    assert merger.duplicates == 1
+
+
+def test_fanout_merges_shards_concurrently():
+    fake = FakeGenerator()
+    generator = FanOutGenerator(fake, shard_size=2, max_concurrency=2)
+    criteria = ["password reset", "account lockout", "remember me", "session timeout", "logout"]
+
+    result = generate(generator, criteria)
+
+    assert sorted(ac for call in fake.calls for ac in call) == sorted(criteria)
+    assert fake.max_active == 2
+    titles = [case["title"] for case in result["test_cases"]]
+    assert titles.count("Happy path login") == 1
+    assert len(titles) == 6
+    assert [case["id"] for case in result["test_cases"]] == [f"TC-00{i}" for i in range(1, 7)]
+    assert result["usage"] == {"input_tokens": 30, "output_tokens": 15}
+    assert result["fanout"] == {"shards": 3, "shard_size": 2, "duplicates_removed": 2}
+
+
+def test_fanout_passes_through_small_inputs():
+    fake = FakeGenerator()
+    result = generate(FanOutGenerator(fake, shard_size=5), ["AC1", "AC2"])
+
+    assert fake.calls == [["AC1", "AC2"]]
+    assert "fanout" not in result
+
+
+def test_fanout_fails_when_a_shard_fails():
+    generator = FanOutGenerator(FakeGenerator(fail_on="AC3"), shard_size=1)
+
+    with pytest.raises(Exception, match="Shard 3/3 failed"):
+        generate(generator, ["AC1", "AC2", "AC3"])
+
+
+def test_fanout_merges_validation_summaries():
+    class ValidatingGenerator(FakeGenerator):
+        async def stream_test_cases(self, acceptance_criteria, **kwargs):
+            async for event in super().stream_test_cases(acceptance_criteria, **kwargs):
+                if event["event"] == "complete":
+                    event["data"]["validation"] = {
+                        "checked": 2,
+                        "repaired": 1,
+                        "dropped": 1,
+                        "errors": [[f"{acceptance_criteria[0]}: missing steps"]],
+                    }
+                yield event
+
+    result = generate(FanOutGenerator(ValidatingGenerator(), shard_size=1), ["AC1", "AC2", "AC3"])
+
+    validation = result["validation"]
+    assert validation["checked"] == 6
+    assert validation["repaired"] == 3
+    assert validation["dropped"] == 3
+    assert sorted(validation["errors"]) == [["AC1: missing steps"], ["AC2: missing steps"], ["AC3: missing steps"]]
+
+
+def test_fanout_charges_each_shard_an_admission_slot():
+    fake = FakeGenerator()
+    admission = AdmissionController(max_concurrent=2, max_queue=10, max_wait=5)
+    generator = FanOutGenerator(fake, shard_size=1, max_concurrency=4, admission=admission)
+
+    result = generate(generator, ["AC1", "AC2", "AC3", "AC4", "AC5", "AC6"])
+
+    assert len(fake.calls) == 6
+    assert fake.max_active == 2
+    assert result["fanout"]["shards"] == 6
+    assert admission.stats()["running"] == 0
+
+
+def test_fanout_surfaces_admission_rejection():
+    admission = AdmissionController(max_concurrent=1, max_queue=0, max_wait=5)
+    generator = FanOutGenerator(FakeGenerator(), shard_size=1, max_concurrency=2, admission=admission)
+
+    with pytest.raises(AdmissionRejected):
+        generate(generator, ["AC1", "AC2"])
+    assert admission.stats()["running"] == 0
+
+
+def test_fanout_results_are_cached_separately():
+    fake = FakeGenerator()
+    assert FanOutGenerator(fake, shard_size=3).PROMPT_VERSION != fake.PROMPT_VERSION
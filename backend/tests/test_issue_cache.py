@@ -0,0 +1,46 @@
+from app.services.issue_cache import IssueCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_fresh_entry_is_a_hit():
+    cache = IssueCache(max_entries=10, ttl_seconds=60, clock=FakeClock())
+    cache.put("PROJ-1", {"key": "PROJ-1", "updated": "t1"})
+
+    details, fresh = cache.lookup("proj-1")
+    assert fresh
+    assert details["key"] == "PROJ-1"
+    assert cache.stats()["hits"] == 1
+
+
+def test_expired_entry_needs_revalidation():
+    clock = FakeClock()
+    cache = IssueCache(max_entries=10, ttl_seconds=60, clock=clock)
+    cache.put("PROJ-1", {"key": "PROJ-1", "updated": "t1"})
+
+    clock.now = 61
+    details, fresh = cache.lookup("PROJ-1")
+    assert details is not None and not fresh
+
+    cache.mark_revalidated("PROJ-1")
+    _, fresh = cache.lookup("PROJ-1")
+    assert fresh
+    assert cache.stats()["revalidations"] == 1
+
+
+def test_lru_eviction():
+    cache = IssueCache(max_entries=2, ttl_seconds=60, clock=FakeClock())
+    cache.put("A-1", {"key": "A-1"})
+    cache.put("A-2", {"key": "A-2"})
+    cache.lookup("A-1")
+    cache.put("A-3", {"key": "A-3"})
+
+    assert cache.lookup("A-2") == (None, False)
+    assert cache.lookup("A-1")[0] is not None
+    assert cache.stats()["evictions"] == 1
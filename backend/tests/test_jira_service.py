@@ -0,0 +1,91 @@
+from unittest import mock
+
+import pytest
+
+from app.services import jira_service
+from app.services.jira_service import JiraService
+from benchmarks.fakes import FakeJira
+
+
+class RecordingJira(FakeJira):
+    """
+    FakeJira that records searches, caps page sizes like JIRA Cloud and
+    rejects bulk searches naming an unknown issue.
+    """
+
+    def __init__(self, page_cap=100, unknown=()):
+        super().__init__(latency=0, jitter=0)
+        self.page_cap = page_cap
+        self.unknown = set(unknown)
+        self.searches = []
+        self.issues = []
+
+    def search_issues(self, jql, startAt=0, maxResults=50, fields=None):
+        self.searches.append((jql, startAt, maxResults))
+        if any(key in jql for key in self.unknown):
+            raise Exception("An issue with key 'X' does not exist")
+        return super().search_issues(jql, startAt, min(maxResults, self.page_cap), fields)
+
+    def issue(self, issue_key, fields=None):
+        self.issues.append(issue_key)
+        if issue_key in self.unknown:
+            raise Exception("Issue does not exist")
+        return super().issue(issue_key, fields)
+
+
+def make_service(client):
+    with mock.patch.object(jira_service, "JIRA", client):
+        return JiraService("https://jira.invalid", "bench@example.invalid", "token")
+
+
+def test_bulk_fetch_searches_in_chunks_of_one_page():
+    client = RecordingJira()
+    service = make_service(client)
+    keys = [f"PROJ-{number}" for number in range(1, 251)]
+
+    results = service.get_issues_details(keys)
+
+    assert len(results) == 250
+    assert [jql.count("PROJ-") for jql, _, _ in client.searches] == [100, 100, 50]
+
+
+def test_search_follows_pages_until_total():
+    client = RecordingJira(page_cap=2)
+    service = make_service(client)
+
+    details = service.search_issue_details("key in (PROJ-1, PROJ-2, PROJ-3, PROJ-4, PROJ-5)")
+
+    assert [issue["key"] for issue in details] == ["PROJ-1", "PROJ-2", "PROJ-3", "PROJ-4", "PROJ-5"]
+    assert [start for _, start, _ in client.searches] == [0, 2, 4]
+
+
+def test_search_stops_at_max_results():
+    client = RecordingJira(page_cap=2)
+    service = make_service(client)
+
+    details = service.search_issue_details("key in (PROJ-1, PROJ-2, PROJ-3, PROJ-4, PROJ-5)", max_results=3)
+
+    assert len(details) == 3
+    assert [size for _, _, size in client.searches] == [3, 1]
+
+
+def test_unknown_key_falls_back_to_single_fetches():
+    client = RecordingJira(unknown={"PROJ-2"})
+    service = make_service(client)
+
+    results = service.get_issues_details(["proj-1", "PROJ-2", "PROJ-3"])
+
+    assert set(results) == {"PROJ-1", "PROJ-3"}
+    assert client.issues == ["PROJ-1", "PROJ-2", "PROJ-3"]
+
+
+@pytest.mark.parametrize("key", ["X-1) OR project = SECRET", "PROJ-1 OR 1=1", "PROJ", "-1", "1PROJ-1"])
+def test_malformed_keys_never_reach_jql(key):
+    client = RecordingJira()
+    service = make_service(client)
+
+    with pytest.raises(ValueError):
+        service.get_issues_details(["PROJ-1", key])
+    with pytest.raises(ValueError):
+        service.get_epic_issue_details(key)
+    assert client.searches == []
@@ -0,0 +1,195 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+
+from app.services.job_queue import JobQueue
+
+
+async def _wait_for(queue, job_id, status, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = await queue.get(job_id)
+        if job["status"] == status:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} never reached {status}")
+
+
+def test_submit_runs_job_and_stores_result(tmp_path):
+    async def handler(payload, report_progress):
+        report_progress("generating")
+        return {"echo": payload["value"]}
+
+    async def scenario():
+        queue = JobQueue(str(tmp_path / "jobs.db"), handler, workers=1)
+        await queue.start()
+        try:
+            job = await queue.submit({"value": 42})
+            assert job["status"] in ("queued", "running", "succeeded")
+            done = await _wait_for(queue, job["job_id"], "succeeded")
+            assert done["result"] == {"echo": 42}
+        finally:
+            await queue.stop()
+
+    asyncio.run(scenario())
+
+
+def test_failed_job_records_error(tmp_path):
+    async def handler(payload, report_progress):
+        raise RuntimeError("boom")
+
+    async def scenario():
+        queue = JobQueue(str(tmp_path / "jobs.db"), handler, workers=1)
+        await queue.start()
+        try:
+            job = await queue.submit({})
+            failed = await _wait_for(queue, job["job_id"], "failed")
+            assert failed["error"] == "boom"
+        finally:
+            await queue.stop()
+
+    asyncio.run(scenario())
+
+
+def test_unfinished_jobs_survive_restart(tmp_path):
+    db_path = str(tmp_path / "jobs.db")
+
+    async def handler(payload, report_progress):
+        return {"ok": True}
+
+    async def scenario():
+        # Create the schema, then simulate a job left running by a crashed process
+        queue = JobQueue(db_path, handler, workers=0)
+        await queue.start()
+        await queue.stop()
+
+        conn = sqlite3.connect(db_path)
+        conn.execute(
+            "INSERT INTO jobs (id, status, progress, payload, created_at) VALUES (?, ?, ?, ?, ?)",
+            ("stale", "running", "running", json.dumps({}), time.time()),
+        )
+        conn.commit()
+        conn.close()
+
+        queue = JobQueue(db_path, handler, workers=1)
+        await queue.start()
+        try:
+            done = await _wait_for(queue, "stale", "succeeded")
+            assert done["attempts"] == 1
+        finally:
+            await queue.stop()
+
+    asyncio.run(scenario())
+
+
+def test_progress_is_written_off_the_event_loop(tmp_path):
+    release = None
+    writer_threads = []
+
+    async def handler(payload, report_progress):
+        report_progress("fetching")
+        report_progress("generating")
+        await release.wait()
+        return {"ok": True}
+
+    async def scenario():
+        nonlocal release
+        release = asyncio.Event()
+        queue = JobQueue(str(tmp_path / "jobs.db"), handler, workers=1)
+        execute = queue._execute
+
+        def recording_execute(sql, params):
+            if sql.startswith("UPDATE jobs SET progress = ? WHERE"):
+                writer_threads.append(threading.current_thread())
+            execute(sql, params)
+
+        queue._execute = recording_execute
+        await queue.start()
+        try:
+            job = await queue.submit({})
+            deadline = time.monotonic() + 2
+            while (await queue.get(job["job_id"]))["progress"] != "generating" and time.monotonic() < deadline:
+                await asyncio.sleep(0.01)
+            assert (await queue.get(job["job_id"]))["progress"] == "generating"
+
+            release.set()
+            done = await _wait_for(queue, job["job_id"], "succeeded")
+            assert done["progress"] == "succeeded"
+        finally:
+            await queue.stop()
+
+    asyncio.run(scenario())
+    assert writer_threads
+    assert threading.main_thread() not in writer_threads
+
+
+def test_jobs_interrupted_too_often_are_failed_on_restart(tmp_path):
+    db_path = str(tmp_path / "jobs.db")
+    calls = []
+
+    async def handler(payload, report_progress):
+        calls.append(payload)
+        return {"ok": True}
+
+    async def scenario():
+        queue = JobQueue(db_path, handler, workers=0)
+        await queue.start()
+        await queue.stop()
+
+        conn = sqlite3.connect(db_path)
+        conn.execute(
+            "INSERT INTO jobs (id, status, progress, payload, attempts, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            ("crashy", "running", "running", json.dumps({}), 3, time.time()),
+        )
+        conn.commit()
+        conn.close()
+
+        queue = JobQueue(db_path, handler, workers=1, max_attempts=3)
+        await queue.start()
+        try:
+            await asyncio.sleep(0.05)
+            job = await queue.get("crashy")
+            assert job["status"] == "failed"
+            assert "3 attempts" in job["error"]
+        finally:
+            await queue.stop()
+
+    asyncio.run(scenario())
+    assert calls == []
+
+
+def test_stop_waits_for_writes_in_flight(tmp_path):
+    async def handler(payload, report_progress):
+        return {}
+
+    async def scenario():
+        queue = JobQueue(str(tmp_path / "jobs.db"), handler, workers=1)
+        await queue.start()
+        job = await queue.submit({})
+        await _wait_for(queue, job["job_id"], "succeeded")
+
+        # A write that already holds the database lock when stop() is called
+        holding = threading.Event()
+        release = threading.Event()
+
+        def slow_write():
+            with queue._db_lock:
+                holding.set()
+                release.wait(2)
+                queue._conn.execute("UPDATE jobs SET progress = ? WHERE id = ?", ("late", job["job_id"]))
+                queue._conn.commit()
+
+        write = asyncio.create_task(asyncio.to_thread(slow_write))
+        await asyncio.to_thread(holding.wait, 2)
+        stop = asyncio.create_task(queue.stop())
+        await asyncio.sleep(0.05)
+        assert not stop.done()
+
+        release.set()
+        await write
+        await stop
+        assert queue._conn is None
+
+    asyncio.run(scenario())
@@ -0,0 +1,68 @@
+import pytest
+
+from app.services.metrics import AgentRunMetrics, MetricsRegistry, PARSE_FAILURES, REGISTRY, _Metric
+
+
+def test_counter_and_gauge_render():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests", ["outcome"])
+    in_flight = registry.gauge("in_flight", "In flight", ["endpoint"])
+
+    requests.inc(outcome="success")
+    requests.inc(2, outcome="error")
+    with in_flight.track(endpoint="generate"):
+        assert in_flight.value(endpoint="generate") == 1
+
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{outcome="success"} 1' in text
+    assert 'requests_total{outcome="error"} 2' in text
+    assert 'in_flight{endpoint="generate"} 0' in text
+
+
+def test_metric_kinds_must_render_samples():
+    class Incomplete(_Metric):
+        kind = "gauge"
+
+    with pytest.raises(TypeError):
+        Incomplete("incomplete", "Missing _samples")
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency", ["engine"], buckets=(0.1, 1, 10))
+
+    for value in (0.05, 0.1, 0.5, 20):
+        latency.observe(value, engine="direct_api")
+
+    text = registry.render()
+    assert 'latency_seconds_bucket{engine="direct_api",le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{engine="direct_api",le="1"} 3' in text
+    assert 'latency_seconds_bucket{engine="direct_api",le="10"} 3' in text
+    assert 'latency_seconds_bucket{engine="direct_api",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{engine="direct_api"} 4' in text
+    assert latency.count(engine="direct_api") == 4
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    counter = registry.counter("errors_total", "Errors", ["reason"])
+    counter.inc(reason='bad "quote"')
+
+    assert 'errors_total{reason="bad \\"quote\\""} 1' in registry.render()
+
+
+def test_agent_run_outcome_from_result():
+    before = PARSE_FAILURES.value(engine="test", reason="invalid_json")
+
+    run = AgentRunMetrics("test")
+    run.message()
+    run.tool_calls(2)
+    run.turns = 3
+    run.finish(result={"test_cases": [], "error": "Expecting value"})
+    run.finish(outcome="success")  # Only the first finish counts
+
+    assert PARSE_FAILURES.value(engine="test", reason="invalid_json") == before + 1
+    text = REGISTRY.render()
+    assert 'testgen_agent_run_seconds_count{engine="test",outcome="parse_error"} 1' in text
+    assert 'testgen_agent_run_seconds_count{engine="test",outcome="success"}' not in text
@@ -0,0 +1,158 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from app.agents.test_case_generator_agent_simple import TestCaseGeneratorAgent
+
+
+RESPONSE = json.dumps({
+    "test_cases": [{"title": "Login works", "steps": []}],
+    "coverage_summary": "Happy path",
+})
+
+
+class FakeStream:
+    def __init__(self, usage, response=RESPONSE):
+        self.usage = usage
+        self.response = response
+        self.chunks_sent = 0
+        self.exited = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.exited = True
+        return False
+
+    @property
+    def text_stream(self):
+        async def chunks():
+            for i in range(0, len(self.response), 7):
+                self.chunks_sent += 1
+                yield self.response[i:i + 7]
+        return chunks()
+
+    async def get_final_message(self):
+        return SimpleNamespace(stop_reason="end_turn", usage=self.usage)
+
+
+class FakeMessages:
+    def __init__(self, usage, response=RESPONSE):
+        self.usage = usage
+        self.response = response
+        self.calls = []
+        self.streams = []
+
+    def stream(self, **kwargs):
+        self.calls.append(kwargs)
+        self.streams.append(FakeStream(self.usage, self.response))
+        return self.streams[-1]
+
+
+def make_generator(usage, response=RESPONSE):
+    generator = TestCaseGeneratorAgent.__new__(TestCaseGeneratorAgent)
+    generator.model = "test-model"
+    generator.jira_service = None
+    generator.client = SimpleNamespace(messages=FakeMessages(usage, response))
+    return generator
+
+
+def generate(generator, title):
+    return asyncio.run(generator.generate_test_cases(
+        title=title,
+        description="User logs in",
+        acceptance_criteria=["Valid credentials log the user in"],
+        test_types=["functional"],
+    ))
+
+
+def test_system_prompt_is_cache_marked_and_identical_across_requests():
+    usage = SimpleNamespace(input_tokens=10, output_tokens=20)
+    generator = make_generator(usage)
+
+    generate(generator, "Login")
+    generate(generator, "Logout")
+
+    first, second = generator.client.messages.calls
+    assert first["system"] == second["system"]
+    assert first["system"][-1]["cache_control"] == {"type": "ephemeral"}
+    assert first["messages"] != second["messages"]
+
+
+def test_usage_reports_cache_tokens():
+    usage = SimpleNamespace(
+        input_tokens=10,
+        output_tokens=20,
+        cache_creation_input_tokens=0,
+        cache_read_input_tokens=1500,
+    )
+    result = generate(make_generator(usage), "Login")
+
+    assert len(result["test_cases"]) == 1
+    assert result["usage"] == {
+        "input_tokens": 10,
+        "output_tokens": 20,
+        "cache_creation_input_tokens": 0,
+        "cache_read_input_tokens": 1500,
+    }
+
+
+def test_usage_without_cache_fields_defaults_to_zero():
+    usage = SimpleNamespace(input_tokens=10, output_tokens=20)
+    result = generate(make_generator(usage), "Login")
+
+    assert result["usage"]["cache_read_input_tokens"] == 0
+    assert result["usage"]["cache_creation_input_tokens"] == 0
+
+
+LONG_RESPONSE = json.dumps({
+    "test_cases": [{"title": f"Case {n}", "steps": [f"Step {n}"]} for n in range(1, 4)],
+    "coverage_summary": "Three cases",
+})
+
+
+def stream(generator, title="Login"):
+    return generator.stream_test_cases(
+        title=title,
+        description="User logs in",
+        acceptance_criteria=["Valid credentials log the user in"],
+        test_types=["functional"],
+    )
+
+
+def test_stream_yields_test_cases_as_they_arrive():
+    generator = make_generator(SimpleNamespace(input_tokens=10, output_tokens=20), LONG_RESPONSE)
+
+    async def scenario():
+        seen = []
+        async for event in stream(generator):
+            fake = generator.client.messages.streams[-1]
+            seen.append((event["event"], fake.chunks_sent))
+        return seen
+
+    seen = asyncio.run(scenario())
+    total_chunks = generator.client.messages.streams[-1].chunks_sent
+    test_cases = [chunks for name, chunks in seen if name == "test_case"]
+    assert len(test_cases) == 3
+    # Each case is emitted mid-stream, before the rest of the message has arrived
+    assert test_cases == sorted(test_cases)
+    assert test_cases[-1] < total_chunks
+    assert seen[-1][0] == "complete"
+
+
+def test_closing_the_stream_early_exits_the_http_stream():
+    generator = make_generator(SimpleNamespace(input_tokens=10, output_tokens=20), LONG_RESPONSE)
+
+    async def scenario():
+        events = stream(generator)
+        first = await events.__anext__()
+        fake = generator.client.messages.streams[-1]
+        assert not fake.exited
+        await events.aclose()
+        return first, fake
+
+    first, fake = asyncio.run(scenario())
+    assert first == {"event": "test_case", "data": {"title": "Case 1", "steps": ["Step 1"]}}
+    assert fake.exited
+    assert fake.chunks_sent < len(LONG_RESPONSE) // 7
@@ -0,0 +1,87 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.agents.recording import ReplayQuery, SessionRecorder
+from app.agents.test_case_generator_agent import AssistantMessage, ResultMessage, TestCaseGeneratorAgent
+from benchmarks.fakes import FakeQuery
+from benchmarks.micro import run_micro_benchmarks
+
+TOOLS = SimpleNamespace(allowed_tools=["mcp__test-case-tools__validate_test_cases"])
+NO_TOOLS = SimpleNamespace(allowed_tools=[])
+
+
+def record(record_dir, prompts, options=TOOLS):
+    async def run():
+        recorder = SessionRecorder(str(record_dir))
+        fake = FakeQuery(turn_latency=0, tool_turns=1, test_cases=2, jitter=0)
+        recorded = []
+        for prompt in prompts:
+            recorded.append([message async for message in recorder.record(prompt, options, fake(prompt, options))])
+        return recorded
+    return asyncio.run(run())
+
+
+def replay(replay_query, prompt, options=TOOLS):
+    async def run():
+        return [message async for message in replay_query(prompt=prompt, options=options)]
+    return asyncio.run(run())
+
+
+def test_replay_returns_the_recorded_messages(tmp_path):
+    recorded = record(tmp_path, ["**Feature Title:** Login", "**Feature Title:** Logout"])
+
+    replay_query = ReplayQuery.from_dir(str(tmp_path), speed=None)
+    replayed = replay(replay_query, "**Feature Title:** Logout")
+
+    assert replayed == recorded[1]
+    assert isinstance(replayed[0], AssistantMessage)
+    assert isinstance(replayed[-1], ResultMessage)
+    assert replay_query.exact_matches == 1
+
+
+def test_unknown_prompts_cycle_through_recordings(tmp_path):
+    record(tmp_path, ["**Feature Title:** Login"])
+
+    replay_query = ReplayQuery.from_dir(str(tmp_path), speed=None)
+    replayed = replay(replay_query, "**Feature Title:** Something else")
+
+    assert replayed[-1].num_turns == 2
+    assert replay_query.exact_matches == 0
+
+
+def test_abandoned_runs_are_not_replayed(tmp_path):
+    async def run():
+        recorder = SessionRecorder(str(tmp_path))
+        fake = FakeQuery(turn_latency=0, jitter=0)
+        messages = recorder.record("prompt", TOOLS, fake("prompt", TOOLS))
+        await messages.__anext__()
+        await messages.aclose()
+
+    asyncio.run(run())
+    record(tmp_path, ["**Feature Title:** Login"])
+
+    assert len(ReplayQuery.from_dir(str(tmp_path)).recordings) == 1
+
+
+def test_agent_generates_from_a_replayed_session(tmp_path):
+    record(tmp_path, ["**Feature Title:** Login"])
+    agent = TestCaseGeneratorAgent(api_key="offline", replay=ReplayQuery.from_dir(str(tmp_path), speed=None))
+
+    result = asyncio.run(agent.generate_test_cases(
+        title="Login",
+        description="User logs in",
+        acceptance_criteria=["Valid credentials log the user in"],
+        test_types=["functional"],
+    ))
+
+    assert len(result["test_cases"]) == 2
+    assert result["usage"]["input_tokens"] == 2400
+
+
+def test_micro_benchmarks_cover_every_stage(tmp_path):
+    record(tmp_path, ["**Feature Title:** Login", "**Feature Title:** Logout"])
+
+    results = asyncio.run(run_micro_benchmarks(ReplayQuery.from_dir(str(tmp_path), speed=None), iterations=3))
+
+    assert set(results) == {"prompt_build", "message_handling", "parse", "response_assembly"}
+    assert all(summary["ops"] == 3 for summary in results.values())
@@ -0,0 +1,111 @@
+import asyncio
+import json
+import sqlite3
+import time
+
+from app.services.result_cache import ResultCache, make_cache_key
+
+
+def _key(**overrides):
+    params = dict(
+        title="User login",
+        description="Users log in with email and password",
+        acceptance_criteria=["Valid credentials log in", "Invalid credentials show an error"],
+        test_types=["functional", "api"],
+        include_edge_cases=True,
+        include_negative_tests=True,
+        model="model-a",
+        prompt_version="1",
+    )
+    params.update(overrides)
+    return make_cache_key(**params)
+
+
+def test_cache_key_ignores_whitespace_and_test_type_order():
+    assert _key() == _key(title="  User   login ", test_types=["api", "functional"])
+
+
+def test_cache_key_changes_with_input_and_model():
+    assert _key() != _key(include_edge_cases=False)
+    assert _key() != _key(model="model-b")
+    assert _key() != _key(prompt_version="2")
+
+
+def test_memory_and_disk_tiers(tmp_path):
+    db_path = str(tmp_path / "results.db")
+    result = {"test_cases": [{"title": "t"}], "coverage_summary": "s"}
+
+    async def scenario():
+        cache = ResultCache(max_entries=4, db_path=db_path)
+        assert await cache.get("k") == (None, None)
+        await cache.put("k", result)
+        assert await cache.get("k") == (result, "memory")
+        cache.close()
+
+        # A fresh process only has the disk tier
+        cache = ResultCache(max_entries=4, db_path=db_path)
+        assert await cache.get("k") == (result, "disk")
+        assert await cache.get("k") == (result, "memory")
+        cache.close()
+
+    asyncio.run(scenario())
+
+
+def test_disk_tier_is_pruned_to_capacity(tmp_path):
+    db_path = str(tmp_path / "results.db")
+
+    async def scenario():
+        cache = ResultCache(max_entries=10, db_path=db_path, max_disk_entries=3)
+        cache.prune_every = 1
+        for n in range(5):
+            await cache.put(f"k{n}", {"n": n})
+        cache.close()
+
+        # Only the newest rows are left for a fresh process
+        cache = ResultCache(max_entries=10, db_path=db_path, max_disk_entries=3)
+        assert [await cache.get(f"k{n}") for n in range(2)] == [(None, None), (None, None)]
+        assert await cache.get("k4") == ({"n": 4}, "disk")
+        cache.close()
+
+    asyncio.run(scenario())
+
+
+def test_expired_disk_entries_are_pruned_on_open(tmp_path):
+    db_path = str(tmp_path / "results.db")
+    cache = ResultCache(db_path=db_path)
+    cache._disk_put("old", json.dumps({"n": 1}), time.time() - 120)
+    cache._disk_put("new", json.dumps({"n": 2}), time.time())
+    cache.close()
+
+    cache = ResultCache(db_path=db_path, ttl_seconds=60)
+    asyncio.run(cache.open())
+    cache.close()
+
+    conn = sqlite3.connect(db_path)
+    assert [row[0] for row in conn.execute("SELECT key FROM results")] == ["new"]
+    conn.close()
+
+
+def test_opening_the_database_is_deferred(tmp_path):
+    db_path = tmp_path / "results.db"
+    cache = ResultCache(db_path=str(db_path))
+    assert not db_path.exists()
+
+    asyncio.run(cache.open())
+    assert db_path.exists()
+    cache.close()
+
+
+def test_disk_read_errors_are_misses(tmp_path):
+    db_path = tmp_path / "results.db"
+    db_path.write_text("not a database")
+
+    async def scenario():
+        cache = ResultCache(db_path=str(db_path))
+        assert await cache.get("k") == (None, None)
+        await cache.put("k", {"n": 1})
+        assert await cache.get("k") == ({"n": 1}, "memory")
+        assert cache.stats()["misses"] == 1
+        cache.close()
+
+    asyncio.run(scenario())
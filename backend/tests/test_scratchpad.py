@@ -0,0 +1,41 @@
+from app.agents.scratchpad import ResultScratchpad
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_put_and_pop_round_trip():
+    scratchpad = ResultScratchpad()
+    result = {"test_cases": [{"title": "Login"}], "coverage_summary": "Happy path"}
+    handle = scratchpad.put(result)
+
+    result["test_cases"].append({"title": "mutated after storing"})
+
+    assert handle.startswith("tc_")
+    assert scratchpad.pop(handle) == {"test_cases": [{"title": "Login"}], "coverage_summary": "Happy path"}
+    assert scratchpad.pop(handle) is None
+
+
+def test_evicts_oldest_beyond_max_entries():
+    scratchpad = ResultScratchpad(max_entries=2)
+    first = scratchpad.put({"n": 1})
+    scratchpad.put({"n": 2})
+    scratchpad.put({"n": 3})
+
+    assert len(scratchpad) == 2
+    assert scratchpad.pop(first) is None
+
+
+def test_entries_expire():
+    clock = FakeClock()
+    scratchpad = ResultScratchpad(ttl_seconds=60, clock=clock)
+    handle = scratchpad.put({"n": 1})
+
+    clock.now += 61
+
+    assert scratchpad.pop(handle) is None
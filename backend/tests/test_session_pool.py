@@ -0,0 +1,156 @@
+import asyncio
+from unittest import mock
+
+import claude_agent_sdk
+import pytest
+
+from app.agents.session_pool import AgentPoolExhausted, AgentSessionPool
+
+
+class FakeClient:
+    """
+    Stands in for ClaudeSDKClient: answers each prompt with one message.
+    """
+
+    instances = []
+
+    def __init__(self, options=None):
+        self.prompts = []
+        self.connected = False
+        self.disconnected = False
+        self.unresponsive = False
+        FakeClient.instances.append(self)
+
+    async def connect(self):
+        await FakeClient.connect_gate.wait()
+        self.connected = True
+
+    async def query(self, prompt):
+        self.prompts.append(prompt)
+
+    async def receive_response(self):
+        if self.prompts[-1] == "block" or self.unresponsive:
+            await FakeClient.unblock.wait()
+        yield f"reply to {self.prompts[-1]}"
+
+    async def interrupt(self):
+        pass
+
+    async def disconnect(self):
+        self.disconnected = True
+
+
+def run_with_pool(scenario, **pool_options):
+    async def run():
+        FakeClient.instances = []
+        FakeClient.connect_gate = asyncio.Event()
+        FakeClient.connect_gate.set()
+        FakeClient.unblock = asyncio.Event()
+        pool = AgentSessionPool(options_factory=lambda: None, **pool_options)
+        try:
+            await scenario(pool)
+        finally:
+            FakeClient.connect_gate.set()
+            FakeClient.unblock.set()
+            await pool.close()
+
+    with mock.patch.object(claude_agent_sdk, "ClaudeSDKClient", FakeClient):
+        asyncio.run(run())
+
+
+async def collect(pool, prompt):
+    return [message async for message in pool.run(prompt)]
+
+
+def test_sessions_are_reused_and_cleared_between_requests():
+    async def scenario(pool):
+        await pool.start()
+        assert await collect(pool, "first") == ["reply to first"]
+        assert await collect(pool, "second") == ["reply to second"]
+
+        assert pool.sessions_created == 1
+        assert FakeClient.instances[0].prompts == ["first", "/clear", "second"]
+
+    run_with_pool(scenario, min_size=1, max_size=1)
+
+
+def test_sessions_are_recycled_after_max_uses():
+    async def scenario(pool):
+        for prompt in ["one", "two", "three"]:
+            await collect(pool, prompt)
+
+        assert pool.sessions_created == 2
+        first, second = FakeClient.instances
+        assert first.prompts == ["one", "/clear", "two"]
+        assert first.disconnected
+        assert second.prompts == ["three"]
+
+    run_with_pool(scenario, min_size=0, max_size=1, max_uses=2)
+
+
+def test_idle_session_that_stops_answering_is_replaced():
+    async def scenario(pool):
+        await pool.start()
+        stale = FakeClient.instances[0]
+        # The CLI process is still up but no longer answers
+        stale.unresponsive = True
+
+        assert await collect(pool, "after") == ["reply to after"]
+
+        assert pool.stats()["probes_failed"] == 1
+        assert stale.disconnected
+        assert "after" not in stale.prompts
+        assert FakeClient.instances[-1].prompts[-1] == "after"
+
+    run_with_pool(scenario, min_size=1, max_size=1, probe_after=0, probe_timeout=0.05)
+
+
+def test_acquire_times_out_when_every_session_is_busy():
+    async def scenario(pool):
+        busy = asyncio.create_task(collect(pool, "block"))
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(AgentPoolExhausted):
+            await collect(pool, "next")
+        assert pool.stats()["in_use"] == 1
+
+        FakeClient.unblock.set()
+        assert await busy == ["reply to block"]
+
+    run_with_pool(scenario, min_size=0, max_size=1, acquire_timeout=0.05)
+
+
+def test_cancelled_acquire_does_not_strand_the_new_session():
+    async def scenario(pool):
+        FakeClient.connect_gate.clear()
+        acquiring = asyncio.create_task(pool._acquire())
+        await asyncio.sleep(0.01)
+        acquiring.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await acquiring
+
+        # The session finishes connecting after its caller is gone and is stopped
+        FakeClient.connect_gate.set()
+        await asyncio.sleep(0.01)
+        assert pool.stats()["size"] == 0
+
+        assert await collect(pool, "after") == ["reply to after"]
+        assert pool.sessions_created == 2
+
+    run_with_pool(scenario, min_size=0, max_size=1, acquire_timeout=0.5)
+
+
+def test_cancel_after_connect_returns_the_session_to_the_pool():
+    async def scenario(pool):
+        acquiring = asyncio.create_task(pool._acquire())
+        await asyncio.sleep(0)
+        acquiring.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await acquiring
+        await asyncio.sleep(0.01)
+
+        assert pool.stats()["idle"] == 1
+        assert await collect(pool, "after") == ["reply to after"]
+        assert pool.sessions_created == 1
+
+    run_with_pool(scenario, min_size=0, max_size=1, acquire_timeout=0.5)
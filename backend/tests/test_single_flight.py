@@ -0,0 +1,161 @@
+import asyncio
+
+import pytest
+
+from app.api.routes import _run_generation
+from app.config import get_settings
+from app.models import TestCaseGenerationRequest
+from app.services import close_shared_result_cache, get_shared_result_cache, reset_shared_admission_controller, tracing
+from app.services.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_run():
+    calls = 0
+
+    async def work():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"value": calls}
+
+    async def scenario():
+        flights = SingleFlight()
+        results = await asyncio.gather(*[flights.do("k", work) for _ in range(5)])
+        assert calls == 1
+        assert [shared for _, shared in results].count(False) == 1
+        assert all(result == {"value": 1} for result, _ in results)
+        assert flights.in_flight() == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_does_not_cancel_shared_run():
+    async def work():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def scenario():
+        flights = SingleFlight()
+        first = asyncio.create_task(flights.do("k", work))
+        second = asyncio.create_task(flights.do("k", work))
+        await asyncio.sleep(0.01)
+
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        assert await second == ("done", True)
+
+    asyncio.run(scenario())
+
+
+def test_run_is_cancelled_when_every_waiter_leaves():
+    cancelled = False
+
+    async def work():
+        nonlocal cancelled
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+
+    async def scenario():
+        flights = SingleFlight()
+        waiter = asyncio.create_task(flights.do("k", work))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        await asyncio.sleep(0)
+        assert cancelled
+        assert flights.in_flight() == 0
+
+    asyncio.run(scenario())
+
+
+def test_errors_reach_every_waiter():
+    async def work():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def scenario():
+        flights = SingleFlight()
+        results = await asyncio.gather(flights.do("k", work), flights.do("k", work), return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    asyncio.run(scenario())
+
+
+class SlowAgent:
+    model = "offline"
+    PROMPT_VERSION = "test"
+
+    def __init__(self):
+        self.release = asyncio.Event()
+        self.calls = 0
+
+    async def generate_test_cases(self, **kwargs):
+        self.calls += 1
+        await self.release.wait()
+        return {"test_cases": [{"title": "Login works"}], "coverage_summary": "Happy path"}
+
+
+def test_shared_run_is_cached_when_the_leading_request_is_cancelled():
+    async def scenario():
+        agent = SlowAgent()
+        options = TestCaseGenerationRequest()
+        resolved = {"title": "Login", "description": "User logs in", "acceptance_criteria": ["Works"], "issue_key": None}
+
+        leader = asyncio.create_task(_run_generation(agent, options, **resolved))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(_run_generation(agent, options, **resolved))
+        await asyncio.sleep(0.01)
+
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        agent.release.set()
+        response = await follower
+
+        assert agent.calls == 1
+        assert response["generation_metadata"]["coalesced"] is True
+        assert get_shared_result_cache(get_settings()).stats()["size"] == 1
+
+    get_settings.cache_clear()
+    close_shared_result_cache()
+    reset_shared_admission_controller()
+    try:
+        asyncio.run(scenario())
+    finally:
+        close_shared_result_cache()
+        reset_shared_admission_controller()
+
+
+def test_joined_run_trace_points_at_the_leader():
+    async def traced(agent, options, resolved):
+        with tracing.trace("generate_test_cases") as current:
+            await _run_generation(agent, options, **resolved)
+        return current
+
+    async def scenario():
+        agent = SlowAgent()
+        options = TestCaseGenerationRequest(cache_policy="bypass")
+        resolved = {"title": "Login", "description": "User logs in", "acceptance_criteria": ["Works"], "issue_key": None}
+
+        leader = asyncio.create_task(traced(agent, options, resolved))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(traced(agent, options, resolved))
+        await asyncio.sleep(0.01)
+        agent.release.set()
+        leader_trace, follower_trace = await leader, await follower
+
+        assert agent.calls == 1
+        assert "coalesced" not in leader_trace.root.attributes
+        assert follower_trace.root.attributes["coalesced"] is True
+        assert follower_trace.root.attributes["leader_trace_id"] == leader_trace.trace_id
+
+    reset_shared_admission_controller()
+    try:
+        asyncio.run(scenario())
+    finally:
+        reset_shared_admission_controller()
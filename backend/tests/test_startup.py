@@ -0,0 +1,20 @@
+from benchmarks.import_time import DEFAULT_BUDGET_MS, measure_import
+
+
+def test_importing_the_app_defers_heavy_sdks():
+    result = measure_import("app.main")
+
+    assert result["heavy_modules"] == []
+
+
+def test_importing_the_app_stays_within_budget():
+    # Best of three, so one slow run on a busy machine does not fail the build
+    fastest = min(measure_import("app.main")["seconds"] for _ in range(3))
+
+    assert fastest * 1000 < DEFAULT_BUDGET_MS
+
+
+def test_agents_package_loads_generators_on_first_use():
+    result = measure_import("app.agents")
+
+    assert "claude_agent_sdk" not in result["heavy_modules"]
@@ -0,0 +1,74 @@
+import json
+
+from app.agents.streaming_parser import StreamingTestCaseParser
+
+
+RESULT = {
+    "test_cases": [
+        {"title": "Login succeeds", "steps": [{"step_number": 1, "action": "Click {login}"}]},
+        {"title": "Login fails", "steps": []},
+    ],
+    "coverage_summary": "Happy path and \"invalid\" credentials",
+}
+
+
+def _agent_output():
+    return (
+        "I'll analyze the {feature} first.\n"
+        "```json\n" + json.dumps(RESULT, indent=2) + "\n```\n"
+        "Done } with some trailing prose {."
+    )
+
+
+def test_parses_result_surrounded_by_prose():
+    parser = StreamingTestCaseParser()
+    parser.feed(_agent_output())
+
+    assert parser.result() == RESULT
+    assert parser.errors == []
+
+
+def test_emits_each_test_case_as_soon_as_it_closes():
+    text = _agent_output()
+    first_case_end = text.index("Login fails")
+
+    parser = StreamingTestCaseParser()
+    emitted = parser.feed(text[:first_case_end])
+    assert [tc["title"] for tc in emitted] == ["Login succeeds"]
+
+    emitted = parser.feed(text[first_case_end:])
+    assert [tc["title"] for tc in emitted] == ["Login fails"]
+
+
+def test_character_by_character_feed():
+    parser = StreamingTestCaseParser()
+    emitted = []
+    for c in _agent_output():
+        emitted.extend(parser.feed(c))
+
+    assert emitted == RESULT["test_cases"]
+    assert parser.coverage_summary == RESULT["coverage_summary"]
+
+
+def test_repeated_output_is_not_duplicated():
+    parser = StreamingTestCaseParser()
+    parser.feed(_agent_output())
+    parser.feed(_agent_output())
+
+    assert len(parser.result()["test_cases"]) == 2
+
+
+def test_oversized_test_case_is_dropped():
+    parser = StreamingTestCaseParser(max_element_chars=20)
+    parser.feed(_agent_output())
+
+    assert parser.found_test_cases
+    assert parser.test_cases == []
+    assert len(parser.errors) == 2
+
+
+def test_no_test_cases_key():
+    parser = StreamingTestCaseParser()
+    parser.feed("Just prose with {braces} and no result.")
+
+    assert not parser.found_test_cases
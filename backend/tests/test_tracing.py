@@ -0,0 +1,82 @@
+import asyncio
+import json
+
+from app.services import tracing
+
+
+def test_spans_nest_under_the_current_span():
+    with tracing.trace("generate_test_cases", endpoint="generate") as current:
+        with tracing.span("jira_fetch", operation="issue") as fetch:
+            pass
+        run = tracing.current_span().child("agent_run", engine="fake")
+        run.child("assistant_turn").end()
+        run.child("tool", tool="validate_test_cases").end()
+        run.end()
+
+    names = {span.name: span for span in current.spans}
+    assert fetch.parent_id == current.root.span_id
+    assert names["assistant_turn"].parent_id == names["agent_run"].span_id
+    assert names["tool"].attributes == {"tool": "validate_test_cases"}
+    assert all(span.end_ns is not None for span in current.spans)
+    assert tracing.current_trace() is None
+
+
+def test_timings_and_server_timing():
+    current = tracing.start_trace("generate_test_cases")
+    start = current.root.start_ns
+    current.root.child("jira_fetch", start_ns=start).end(start + 20_000_000)
+    run = current.root.child("agent_run", start_ns=start + 20_000_000)
+    run.child("tool", start_ns=start + 30_000_000).end(start + 35_000_000)
+    run.child("tool", start_ns=start + 40_000_000).end(start + 45_000_000)
+    run.end(start + 90_000_000)
+    current.root.end(start + 100_000_000)
+
+    timings = current.timings()
+    assert timings == {
+        "jira_fetch_ms": 20.0,
+        "agent_run_ms": 70.0,
+        "tool_ms": 10.0,
+        "total_ms": 100.0,
+        "overhead_ms": 10.0,
+    }
+    assert current.server_timing().startswith("jira_fetch;dur=20.0, agent_run;dur=70.0")
+
+
+def test_span_without_trace_is_a_noop():
+    with tracing.span("jira_fetch") as span:
+        span.set(outcome="success")
+    assert span is tracing.NOOP_SPAN
+    assert tracing.current_span().child("agent_run") is tracing.NOOP_SPAN
+
+
+def test_tasks_inherit_the_current_span():
+    async def run():
+        with tracing.trace("generate_test_cases") as current:
+            async def shard():
+                tracing.current_span().child("agent_run").end()
+            await asyncio.gather(shard(), shard())
+        return current
+
+    current = asyncio.run(run())
+    assert [span.name for span in current.spans].count("agent_run") == 2
+
+
+def test_exporter_writes_one_span_per_line(tmp_path):
+    path = tmp_path / "traces" / "spans.jsonl"
+    tracing.configure(True, str(path))
+    try:
+        try:
+            with tracing.trace("generate_test_cases") as current:
+                with tracing.span("jira_fetch"):
+                    raise ValueError("JIRA unavailable")
+        except ValueError:
+            pass
+    finally:
+        tracing.configure(False)
+
+    spans = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [span["name"] for span in spans] == ["generate_test_cases", "jira_fetch"]
+    assert all(span["traceId"] == current.trace_id for span in spans)
+    assert spans[1]["parentSpanId"] == spans[0]["spanId"]
+    assert spans[1]["status"] == {"code": "ERROR", "message": "ValueError: JIRA unavailable"}
+    assert spans[0]["endTimeUnixNano"] >= spans[1]["endTimeUnixNano"]
@@ -0,0 +1,116 @@
+import asyncio
+import json
+
+from app.agents.validation import check_test_case, repair_test_case, validated_events
+
+
+def make_case(**overrides):
+    case = {
+        "title": "Login with valid credentials",
+        "description": "User can log in",
+        "type": "functional",
+        "priority": "high",
+        "preconditions": ["User exists"],
+        "steps": [{"step_number": 1, "action": "Submit the form", "expected_result": "Dashboard shown"}],
+        "expected_outcome": "User is logged in",
+        "tags": ["login"],
+    }
+    case.update(overrides)
+    return case
+
+
+def test_repair_normalizes_enums_and_renumbers_steps():
+    repaired = repair_test_case(make_case(
+        type="End-to-End",
+        priority="Critical",
+        tags="login",
+        steps=[
+            {"step_number": 3, "action": "Open page", "expected_result": "Page shown"},
+            {"step_number": 3, "action": "Submit", "expected_result": "Dashboard shown"},
+        ],
+    ))
+
+    assert repaired["type"] == "e2e"
+    assert repaired["priority"] == "high"
+    assert repaired["tags"] == ["login"]
+    assert [step["step_number"] for step in repaired["steps"]] == [1, 2]
+
+
+def test_check_accepts_repairable_case():
+    test_case, errors = check_test_case(make_case(priority="P2", expected_outcome=""), default_type="api")
+
+    assert errors == []
+    assert test_case["priority"] == "medium"
+    assert test_case["expected_outcome"] == "Dashboard shown"
+
+
+def test_check_reports_unrepairable_case():
+    _, errors = check_test_case(make_case(title="", steps=[]))
+
+    assert any(error.startswith("title") for error in errors)
+    assert any(error.startswith("steps") for error in errors)
+
+
+def events_for(cases):
+    async def events():
+        for case in cases:
+            yield {"event": "test_case", "data": case}
+        yield {"event": "complete", "data": {"test_cases": cases, "coverage_summary": "Login"}}
+    return events()
+
+
+def collect(events):
+    async def run():
+        return [event async for event in events]
+    return asyncio.run(run())
+
+
+def test_only_failing_cases_are_reasked():
+    broken = make_case(title="Lockout after failed attempts", description=None)
+    prompts = []
+
+    async def reask(prompt):
+        prompts.append(prompt)
+        fixed = make_case(title="Lockout after failed attempts", description="Account locks")
+        return json.dumps({"test_cases": [fixed]})
+
+    events = collect(validated_events(events_for([make_case(), broken]), "functional", reask))
+
+    assert len(prompts) == 1
+    assert "Lockout after failed attempts" in prompts[0]
+    assert "Login with valid credentials" not in prompts[0]
+    complete = events[-1]["data"]
+    assert [case["title"] for case in complete["test_cases"]] == [
+        "Login with valid credentials",
+        "Lockout after failed attempts",
+    ]
+    assert complete["validation"]["reasked"] == 1
+    assert complete["validation"]["fixed_by_reask"] == 1
+    assert complete["validation"]["dropped"] == 0
+
+
+def test_cases_still_failing_after_reask_are_dropped():
+    async def reask(prompt):
+        return "no json here"
+
+    events = collect(validated_events(events_for([make_case(steps=[])]), "functional", reask))
+
+    complete = events[-1]["data"]
+    assert complete["test_cases"] == []
+    assert complete["validation"]["dropped"] == 1
+    assert complete["coverage_summary"] == "Login"
+
+
+def test_fast_mode_options_switch_off_every_tool():
+    from claude_agent_sdk._internal.transport.subprocess_cli import SubprocessCLITransport
+
+    from app.agents.test_case_generator_agent import create_fast_agent_options
+
+    options = create_fast_agent_options()
+    command = SubprocessCLITransport(prompt="", options=options)._build_command()
+
+    assert options.permission_mode is None
+    assert not options.mcp_servers
+    disallowed = command[command.index("--disallowedTools") + 1].split(",")
+    assert {"Bash", "Write", "Edit", "Skill"} <= set(disallowed)
+    assert "--allowedTools" not in command